@@ -0,0 +1,200 @@
+"""CLI untuk mengubah dump password bocor (format HIBP `HASH:COUNT`) menjadi index biner.
+
+Contoh:
+    python -m app.cli.build_breach_index pwned-passwords-sha1.txt breached.idx
+    python -m app.cli.build_breach_index pwned-passwords-ntlm.txt breached.idx --kind ntlm --min-count 5
+
+Dump di-sort dengan external merge sort (run terurut di file sementara lalu heapq.merge),
+sehingga memory build dibatasi --chunk-records, bukan ukuran dump.
+"""
+import argparse
+import heapq
+import logging
+import math
+import mmap
+import os
+import sys
+import tempfile
+import time
+from typing import BinaryIO, Iterator, Optional
+
+from app.common.breached_passwords import (
+    BLOOM_HEADER,
+    BLOOM_MAGIC,
+    FORMAT_VERSION,
+    HASH_HEX_LENGTHS,
+    HEADER,
+    INDEX_MAGIC,
+    KINDS,
+    bloom_positions
+)
+
+logger = logging.getLogger("app.cli.build_breach_index")
+
+READ_BLOCK_RECORDS = 65536
+
+
+def parse_dump(path: str, hex_length: int, prefix_length: int, min_count: int, stats: dict) -> Iterator[bytes]:
+    """Membaca dump baris per baris, menghasilkan prefix biner setiap hash yang valid."""
+    with open(path, "r", encoding="ascii", errors="replace") as f:
+        for line in f:
+            hash_hex, _, count = line.strip().partition(":")
+            if len(hash_hex) != hex_length:
+                stats["invalid"] += bool(hash_hex)
+                continue
+            try:
+                if min_count > 1 and count and int(count) < min_count:
+                    stats["below_min_count"] += 1
+                    continue
+                yield bytes.fromhex(hash_hex)[:prefix_length]
+            except ValueError:
+                stats["invalid"] += 1
+
+
+def write_runs(records: Iterator[bytes], chunk_records: int, tmp_dir: str) -> list[str]:
+    """Tahap 1: sort chunk di memory dan tulis sebagai run biner terurut."""
+    runs = []
+    chunk: list[bytes] = []
+
+    def flush() -> None:
+        chunk.sort()
+        fd, run_path = tempfile.mkstemp(prefix="breach-run-", dir=tmp_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"".join(chunk))
+        runs.append(run_path)
+        logger.info(f"run {len(runs)}: {len(chunk)} records")
+        chunk.clear()
+
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_records:
+            flush()
+    if chunk:
+        flush()
+    return runs
+
+
+def read_run(f: BinaryIO, record_length: int) -> Iterator[bytes]:
+    """Membaca run per blok dan menghasilkan record satu per satu."""
+    while True:
+        block = f.read(record_length * READ_BLOCK_RECORDS)
+        if not block:
+            return
+        for offset in range(0, len(block), record_length):
+            yield block[offset:offset + record_length]
+
+
+def merge_runs(runs: list[str], out: BinaryIO, prefix_length: int) -> int:
+    """Tahap 2: k-way merge semua run dengan heapq.merge, membuang duplikat."""
+    files = [open(run, "rb") for run in runs]
+    try:
+        count = 0
+        previous = None
+        buffer = []
+        for record in heapq.merge(*(read_run(f, prefix_length) for f in files)):
+            if record == previous:
+                continue
+            previous = record
+            buffer.append(record)
+            count += 1
+            if len(buffer) >= READ_BLOCK_RECORDS:
+                out.write(b"".join(buffer))
+                buffer.clear()
+        out.write(b"".join(buffer))
+        return count
+    finally:
+        for f in files:
+            f.close()
+
+
+def build_bloom(index_path: str, bloom_path: str, count: int, prefix_length: int, fpr: float) -> None:
+    """Mengisi Bloom filter langsung di file mmap agar RAM proses tidak ikut sebesar filter."""
+    num_bits = max(8, math.ceil(-max(count, 1) * math.log(fpr) / math.log(2) ** 2))
+    num_bits = (num_bits + 7) // 8 * 8
+    num_hashes = max(1, round(num_bits / max(count, 1) * math.log(2)))
+    with open(bloom_path, "wb") as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, FORMAT_VERSION, num_hashes, 0, num_bits))
+        f.truncate(BLOOM_HEADER.size + num_bits // 8)
+    with open(bloom_path, "r+b") as bloom_file, open(index_path, "rb") as index_file:
+        bits = mmap.mmap(bloom_file.fileno(), 0)
+        try:
+            index_file.seek(HEADER.size)
+            base = BLOOM_HEADER.size
+            for record in read_run(index_file, prefix_length):
+                for position in bloom_positions(record, num_hashes, num_bits):
+                    bits[base + (position >> 3)] |= 1 << (position & 7)
+            bits.flush()
+        finally:
+            bits.close()
+    logger.info(f"bloom filter: {num_bits // 8} bytes, k={num_hashes}, target fpr={fpr}")
+
+
+def detect_kind(path: str) -> str:
+    """Menentukan jenis hash dari panjang hash di baris pertama."""
+    with open(path, "r", encoding="ascii", errors="replace") as f:
+        hash_hex = f.readline().strip().partition(":")[0]
+    for name, kind in KINDS.items():
+        if len(hash_hex) == HASH_HEX_LENGTHS[kind]:
+            return name
+    raise ValueError(f"Cannot detect hash kind from first line of {path}; use --kind")
+
+
+def build_index(args: argparse.Namespace) -> int:
+    """Menjalankan seluruh proses build."""
+    started = time.monotonic()
+    kind_name = args.kind or detect_kind(args.input)
+    kind = KINDS[kind_name]
+    if not 8 <= args.prefix_bytes <= HASH_HEX_LENGTHS[kind] // 2:
+        raise ValueError("--prefix-bytes must be between 8 and the full hash length")
+    stats = {"invalid": 0, "below_min_count": 0}
+    records = parse_dump(args.input, HASH_HEX_LENGTHS[kind], args.prefix_bytes, args.min_count, stats)
+    tmp_dir = args.tmp_dir or os.path.dirname(os.path.abspath(args.output))
+    runs = write_runs(records, args.chunk_records, tmp_dir)
+    partial = f"{args.output}.partial"
+    try:
+        with open(partial, "wb") as out:
+            out.write(HEADER.pack(INDEX_MAGIC, FORMAT_VERSION, kind, args.prefix_bytes, 0, 0))
+            count = merge_runs(runs, out, args.prefix_bytes)
+            out.seek(0)
+            out.write(HEADER.pack(INDEX_MAGIC, FORMAT_VERSION, kind, args.prefix_bytes, 0, count))
+    finally:
+        for run in runs:
+            os.remove(run)
+    os.replace(partial, args.output)
+    logger.info(
+        f"index {args.output}: kind={kind_name} records={count} "
+        f"invalid={stats['invalid']} below_min_count={stats['below_min_count']}"
+    )
+
+    bloom_path = f"{args.output}.bloom"
+    if args.bloom_fpr > 0:
+        build_bloom(args.output, f"{bloom_path}.partial", count, args.prefix_bytes, args.bloom_fpr)
+        os.replace(f"{bloom_path}.partial", bloom_path)
+    elif os.path.exists(bloom_path):
+        # Bloom lama tidak cocok dengan index baru
+        os.remove(bloom_path)
+    logger.info(f"Build finished in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build breached-password index from a HIBP-style dump")
+    parser.add_argument("input", help="Path ke dump teks (satu `HASH` atau `HASH:COUNT` per baris)")
+    parser.add_argument("output", help="Path file index biner")
+    parser.add_argument("--kind", choices=list(KINDS), help="Jenis hash (default: dari panjang hash)")
+    parser.add_argument("--prefix-bytes", type=int, default=8, help="Panjang prefix hash yang disimpan")
+    parser.add_argument("--min-count", type=int, default=1, help="Abaikan hash dengan COUNT di bawah nilai ini")
+    parser.add_argument("--chunk-records", type=int, default=5_000_000, help="Record per run sort di memory")
+    parser.add_argument("--bloom-fpr", type=float, default=0.001, help="False positive rate Bloom filter (0 = tanpa)")
+    parser.add_argument("--tmp-dir", help="Direktori run sementara (default: direktori output)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    return build_index(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""CLI untuk import user secara massal dari file CSV/JSONL.
+
+Contoh:
+    python -m app.cli.import_users users.csv --rejects rejects.jsonl
+    python -m app.cli.import_users users.jsonl --batch-size 2000 --workers 8
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+from pydantic import BaseModel, EmailStr, Field, ValidationError, field_validator
+
+from app.config.database import connect_db, disconnect_db, get_storage
+from app.config.security import get_password_hash
+import app.modules.auth
+from app.modules.auth.auth.storage import AuthStorage  # type: ignore
+
+logger = logging.getLogger("app.cli.import_users")
+
+# Hash bcrypt yang sudah ada diterima apa adanya ($2a$, $2b$, $2y$)
+BCRYPT_HASH_PATTERN = re.compile(r"^\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}$")
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+
+
+class ImportUserRow(BaseModel):
+    """Satu baris input import (password plain text atau password_hash bcrypt)."""
+    email: EmailStr
+    username: str = Field(..., min_length=3, max_length=50)
+    password: Optional[str] = Field(None, min_length=8, max_length=100)
+    password_hash: Optional[str] = None
+    google_id: Optional[str] = None
+    is_active: bool = True
+
+    @field_validator('username')
+    @classmethod
+    def validate_username(cls, v: str) -> str:
+        # Aturan sama dengan RegisterRequest
+        if not all(c.isalnum() or c == '_' for c in v):
+            raise ValueError('Username must contain only letters, numbers, and underscores')
+        return v
+
+    @field_validator('password_hash')
+    @classmethod
+    def validate_password_hash(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None and not BCRYPT_HASH_PATTERN.match(v):
+            raise ValueError('password_hash must be a bcrypt hash')
+        return v
+
+    @field_validator('is_active', mode='before')
+    @classmethod
+    def parse_is_active(cls, v):
+        if isinstance(v, str):
+            return v.strip().lower() in TRUE_VALUES
+        return v
+
+
+def read_rows(path: Path, fmt: str) -> Iterator[tuple[int, dict]]:
+    """Membaca file input secara streaming, menghasilkan (nomor baris, row)."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                # Kolom kosong di CSV dianggap tidak diisi
+                yield reader.line_num, {k: v for k, v in row.items() if v not in (None, "")}
+        else:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, {"__error__": f"Invalid JSON: {e.msg}"}
+
+
+def batched(rows: Iterator[tuple[int, dict]], size: int) -> Iterator[list[tuple[int, dict]]]:
+    """Mengelompokkan row menjadi batch berukuran tetap."""
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class UserImporter:
+    """Menjalankan pipeline import: validasi, dedupe, hashing paralel, lalu create_many per chunk."""
+
+    def __init__(
+        self,
+        repo: AuthStorage,
+        pool: ProcessPoolExecutor,
+        rejects: Optional[TextIO] = None,
+        dry_run: bool = False
+    ):
+        self.repo = repo
+        self.pool = pool
+        self.rejects = rejects
+        self.dry_run = dry_run
+        self.seen_emails: set[str] = set()
+        self.seen_usernames: set[str] = set()
+        self.processed = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.started_at = time.monotonic()
+
+    def reject(self, line_no: int, row: dict, reason: str) -> None:
+        """Mencatat row yang ditolak ke reject file (tanpa password plain text)."""
+        self.rejected += 1
+        if self.rejects is None:
+            return
+        safe_row = {k: v for k, v in row.items() if k not in ("password", "password_hash", "__error__")}
+        self.rejects.write(json.dumps({"line": line_no, "reason": reason, "row": safe_row}) + "\n")
+
+    def validate_batch(self, batch: list[tuple[int, dict]]) -> list[tuple[int, dict, ImportUserRow]]:
+        """Validasi schema dan dedupe di dalam file (case-insensitive, mengikuti collation MySQL)."""
+        valid = []
+        for line_no, row in batch:
+            if "__error__" in row:
+                self.reject(line_no, row, row["__error__"])
+                continue
+            try:
+                user = ImportUserRow.model_validate(row)
+            except ValidationError as e:
+                errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                self.reject(line_no, row, errors)
+                continue
+            if user.password is None and user.password_hash is None and user.google_id is None:
+                self.reject(line_no, row, "password, password_hash or google_id is required")
+                continue
+            email_key = user.email.lower()
+            username_key = user.username.lower()
+            if email_key in self.seen_emails:
+                self.reject(line_no, row, "Duplicate email in input")
+                continue
+            if username_key in self.seen_usernames:
+                self.reject(line_no, row, "Duplicate username in input")
+                continue
+            self.seen_emails.add(email_key)
+            self.seen_usernames.add(username_key)
+            valid.append((line_no, row, user))
+        return valid
+
+    async def dedupe_existing(
+        self,
+        valid: list[tuple[int, dict, ImportUserRow]]
+    ) -> list[tuple[int, dict, ImportUserRow]]:
+        """Membuang row yang email/username-nya sudah ada di database (dua query per batch)."""
+        existing_emails = {
+            e.lower() for e in await self.repo.get_existing_emails([u.email for _, _, u in valid])
+        }
+        existing_usernames = {
+            u.lower() for u in await self.repo.get_existing_usernames([u.username for _, _, u in valid])
+        }
+        fresh = []
+        for line_no, row, user in valid:
+            if user.email.lower() in existing_emails:
+                self.reject(line_no, row, "User with this email already exists")
+            elif user.username.lower() in existing_usernames:
+                self.reject(line_no, row, "User with this username already exists")
+            else:
+                fresh.append((line_no, row, user))
+        return fresh
+
+    async def hash_passwords(self, users: list[ImportUserRow]) -> list[Optional[str]]:
+        """Hash password plain text secara paralel di process pool; hash bcrypt dipakai apa adanya."""
+        loop = asyncio.get_running_loop()
+        pending = {
+            i: loop.run_in_executor(self.pool, get_password_hash, user.password)
+            for i, user in enumerate(users)
+            if user.password_hash is None and user.password is not None
+        }
+        hashed = dict(zip(pending.keys(), await asyncio.gather(*pending.values())))
+        return [user.password_hash or hashed.get(i) for i, user in enumerate(users)]
+
+    async def import_batch(self, batch: list[tuple[int, dict]]) -> None:
+        """Memproses satu batch sampai insert."""
+        self.processed += len(batch)
+        valid = self.validate_batch(batch)
+        if not valid:
+            return
+        fresh = await self.dedupe_existing(valid)
+        if not fresh:
+            return
+        users = [user for _, _, user in fresh]
+        password_hashes = await self.hash_passwords(users)
+        data = [
+            {
+                "email": user.email,
+                "username": user.username,
+                "passwordHash": password_hash,
+                "googleId": user.google_id,
+                "isActive": user.is_active,
+            }
+            for user, password_hash in zip(users, password_hashes)
+        ]
+        if self.dry_run:
+            self.inserted += len(data)
+            return
+        created = await self.repo.create_users_bulk(data)
+        self.inserted += created
+        if created < len(data):
+            # Row yang bentrok dengan insert lain di antara dedupe dan create_many
+            logger.warning(f"{len(data) - created} rows skipped as concurrent duplicates")
+
+    def log_progress(self) -> None:
+        """Menampilkan progress import."""
+        elapsed = time.monotonic() - self.started_at
+        rate = self.processed / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"processed={self.processed} inserted={self.inserted} "
+            f"rejected={self.rejected} rate={rate:.0f} rows/s"
+        )
+
+
+def detect_format(path: Path, fmt: Optional[str]) -> str:
+    """Menentukan format input dari argumen atau ekstensi file."""
+    if fmt:
+        return fmt
+    return "csv" if path.suffix.lower() == ".csv" else "jsonl"
+
+
+async def run_import(args: argparse.Namespace) -> int:
+    """Entry point async untuk proses import."""
+    path = Path(args.input)
+    fmt = detect_format(path, args.format)
+    rejects = open(args.rejects, "w", encoding="utf-8") if args.rejects else None
+    await connect_db()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            importer = UserImporter(get_storage(), pool, rejects, args.dry_run)
+            for batch in batched(read_rows(path, fmt), args.batch_size):
+                await importer.import_batch(batch)
+                importer.log_progress()
+        logger.info("Import finished")
+        importer.log_progress()
+    finally:
+        if rejects is not None:
+            rejects.close()
+        await disconnect_db()
+    return 0 if importer.rejected == 0 else 2
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import users from CSV or JSONL")
+    parser.add_argument("input", help="Path ke file CSV/JSONL")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Format input (default: dari ekstensi)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Jumlah row per create_many")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Jumlah proses untuk bcrypt")
+    parser.add_argument("--rejects", help="Path file JSONL untuk row yang ditolak")
+    parser.add_argument("--dry-run", action="store_true", help="Validasi dan hash tanpa insert")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    return asyncio.run(run_import(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Audit log terstruktur untuk event authentication (JSONL append-only dengan rotasi).
+
+Service hanya memasukkan record ke queue lewat QueueHandler; serialisasi dan I/O file
+dilakukan per batch oleh thread background, di luar jalur request.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Iterator, Optional, TextIO
+from app.config.env import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AuthEvent:
+    """Satu event authentication di audit log."""
+    event: str
+    outcome: str
+    user_id: Optional[int]
+    ip: Optional[str]
+    latency_ms: float
+    ts: str
+    detail: Optional[str] = None
+
+
+class AuditContext:
+    """Field event yang baru diketahui di tengah method (user_id, detail)."""
+
+    def __init__(self, user_id: Optional[int] = None):
+        self.user_id = user_id
+        self.detail: Optional[str] = None
+        self.outcome = "success"
+
+
+class AuditFileWriter:
+    """Thread background yang menguras queue audit dan menulis JSONL per batch, dengan rotasi ukuran."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        backup_count: int,
+        batch_size: int,
+        interval: float,
+        queue_size: int
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.interval = interval
+        # Dibatasi: jika writer/disk stall, event baru dibuang (dihitung di dropped) alih-alih memenuhi memory
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._file: Optional[TextIO] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    record = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+            if batch:
+                self._write(batch)
+            if stop:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write(self, batch: list[logging.LogRecord]) -> None:
+        data = "".join(
+            json.dumps(asdict(record.auth_event), separators=(",", ":")) + "\n"
+            for record in batch
+        )
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            if self.max_bytes > 0 and self._file.tell() > 0 and self._file.tell() + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self.written += len(batch)
+        except OSError as e:
+            self.dropped += len(batch)
+            logger.error(f"Failed to write {len(batch)} audit events: {e}")
+
+    def _rotate(self) -> None:
+        """audit.jsonl -> audit.jsonl.1 -> ... -> audit.jsonl.<backup_count> (yang tertua dibuang)."""
+        self._file.close()
+        self._file = None
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def shutdown(self) -> None:
+        """Flush event yang tersisa lalu hentikan thread."""
+        if self._thread is not None:
+            try:
+                self.queue.put(None, timeout=self.interval + 5)
+            except queue.Full:
+                logger.error("Audit queue still full at shutdown, remaining events are dropped")
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+    def stats(self) -> dict[str, int]:
+        return {"written": self.written, "dropped": self.dropped}
+
+
+class _EventQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler tanpa format/copy record: writer hanya membaca record.auth_event."""
+
+    def __init__(self, writer: AuditFileWriter):
+        super().__init__(writer.queue)
+        self.writer = writer
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.writer.dropped += 1
+
+
+class AuditLog:
+    """Mengirim AuthEvent ke logger `app.audit` yang hanya punya QueueHandler."""
+
+    def __init__(self, enabled: bool, writer: AuditFileWriter):
+        self.enabled = enabled
+        self.writer = writer
+        self._logger = logging.getLogger("app.audit")
+        # Tidak diteruskan ke root handler (basicConfig) agar tidak ada write sinkron di jalur request
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._handler = _EventQueueHandler(writer)
+        self._logger.addHandler(self._handler)
+
+    def emit(self, event: AuthEvent) -> None:
+        if not self.enabled:
+            return
+        self.writer.start()
+        self._logger.info(event.event, extra={"auth_event": event})
+
+    @contextmanager
+    def record(self, event: str, ip: Optional[str], user_id: Optional[int] = None) -> Iterator[AuditContext]:
+        """Mencatat satu event dengan latency; exception dicatat sebagai outcome failure lalu diteruskan."""
+        context = AuditContext(user_id)
+        started = time.perf_counter()
+        try:
+            yield context
+        except Exception as e:
+            context.outcome = "failure"
+            context.detail = context.detail or type(e).__name__
+            raise
+        finally:
+            self.emit(AuthEvent(
+                event=event,
+                outcome=context.outcome,
+                user_id=context.user_id,
+                ip=ip,
+                latency_ms=round((time.perf_counter() - started) * 1000, 3),
+                ts=datetime.now(timezone.utc).isoformat(),
+                detail=context.detail
+            ))
+
+    def shutdown(self) -> None:
+        self.writer.shutdown()
+
+    def close(self) -> None:
+        """Melepas handler dari logger `app.audit` (instance selain global, mis. di test)."""
+        self._logger.removeHandler(self._handler)
+
+
+audit_log = AuditLog(
+    settings.AUDIT_LOG_ENABLED,
+    AuditFileWriter(
+        settings.AUDIT_LOG_PATH,
+        settings.AUDIT_LOG_MAX_BYTES,
+        settings.AUDIT_LOG_BACKUP_COUNT,
+        settings.AUDIT_LOG_BATCH_SIZE,
+        settings.AUDIT_LOG_FLUSH_INTERVAL_SECONDS,
+        settings.AUDIT_LOG_QUEUE_SIZE
+    )
+)
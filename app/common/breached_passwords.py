@@ -0,0 +1,191 @@
+"""Pengecekan password bocor secara offline dari index biner hasil dump HIBP.
+
+Format index (dibuat oleh `python -m app.cli.build_breach_index`):
+    header 16 byte: magic b"BRPW", versi (u8), kind (u8: 0=sha1, 1=ntlm),
+    panjang prefix (u8), reserved (u8), jumlah record (u64 little-endian)
+    diikuti record prefix hash berukuran tetap, terurut dan unik.
+
+File Bloom filter opsional (`<index>.bloom`):
+    header 16 byte: magic b"BRBL", versi (u8), jumlah hash k (u8), reserved (u16),
+    jumlah bit m (u64 little-endian), diikuti bit array.
+
+Kedua file di-mmap, jadi lookup hanya menyentuh beberapa page tanpa memuat file ke RAM.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from typing import Callable, Optional
+from app.config.env import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b"BRPW"
+BLOOM_MAGIC = b"BRBL"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBBBQ")
+BLOOM_HEADER = struct.Struct("<4sBBHQ")
+
+KIND_SHA1 = 0
+KIND_NTLM = 1
+KINDS = {"sha1": KIND_SHA1, "ntlm": KIND_NTLM}
+HASH_HEX_LENGTHS = {KIND_SHA1: 40, KIND_NTLM: 32}
+
+
+class BreachedIndexError(Exception):
+    """File index/Bloom filter tidak bisa dibuka atau rusak (error internal, bukan error validasi input)."""
+
+
+def _md4(data: bytes) -> bytes:
+    """MD4 murni Python (RFC 1320) untuk OpenSSL 3 yang tidak lagi menyediakan md4."""
+    mask = 0xFFFFFFFF
+
+    def rotl(x: int, s: int) -> int:
+        x &= mask
+        return ((x << s) | (x >> (32 - s))) & mask
+
+    rounds = (
+        (lambda x, y, z: (x & y) | (~x & z), 0, (0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15), (3, 7, 11, 19)),
+        (lambda x, y, z: (x & y) | (x & z) | (y & z), 0x5A827999,
+         (0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15), (3, 5, 9, 13)),
+        (lambda x, y, z: x ^ y ^ z, 0x6ED9EBA1, (0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15), (3, 9, 11, 15)),
+    )
+    message = data + b"\x80" + b"\x00" * ((55 - len(data)) % 64) + struct.pack("<Q", len(data) * 8)
+    state = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476]
+    for offset in range(0, len(message), 64):
+        words = struct.unpack("<16I", message[offset:offset + 64])
+        a, b, c, d = state
+        for fn, constant, order, shifts in rounds:
+            for i, k in enumerate(order):
+                a = rotl(a + fn(b, c, d) + words[k] + constant, shifts[i % 4])
+                a, b, c, d = d, a, b, c
+        state = [(s + v) & mask for s, v in zip(state, (a, b, c, d))]
+    return struct.pack("<4I", *state)
+
+
+def _ntlm(password: str) -> bytes:
+    data = password.encode("utf-16-le", "surrogatepass")
+    try:
+        return hashlib.new("md4", data).digest()
+    except ValueError:
+        return _md4(data)
+
+
+HASHERS: dict[int, Callable[[str], bytes]] = {
+    KIND_SHA1: lambda password: hashlib.sha1(password.encode("utf-8", "surrogatepass")).digest(),
+    KIND_NTLM: _ntlm,
+}
+
+
+def bloom_positions(prefix: bytes, num_hashes: int, num_bits: int) -> list[int]:
+    """Posisi bit untuk satu prefix (double hashing; prefix sudah berupa hash kriptografis)."""
+    h1 = int.from_bytes(prefix[:4], "little")
+    h2 = int.from_bytes(prefix[4:8], "little") | 1
+    return [(h1 + i * h2) % num_bits for i in range(num_hashes)]
+
+
+def _open_mmap(path: str, header: struct.Struct) -> tuple[mmap.mmap, tuple]:
+    """Membuka file read-only dan membaca header-nya; semua kegagalan menjadi BreachedIndexError."""
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        # ValueError: mmap menolak file kosong
+        raise BreachedIndexError(f"Cannot open {path}: {e}") from e
+    if len(mm) < header.size:
+        mm.close()
+        raise BreachedIndexError(f"{path} is truncated")
+    return mm, header.unpack_from(mm)
+
+
+class BloomFilter:
+    """Bloom filter read-only di atas file mmap."""
+
+    def __init__(self, path: str):
+        self._mm, (magic, version, self.num_hashes, _, self.num_bits) = _open_mmap(path, BLOOM_HEADER)
+        if magic != BLOOM_MAGIC or version != FORMAT_VERSION or not self.num_hashes or not self.num_bits:
+            self.close()
+            raise BreachedIndexError(f"{path} is not a breached-password bloom filter")
+        if len(self._mm) < BLOOM_HEADER.size + (self.num_bits + 7) // 8:
+            self.close()
+            raise BreachedIndexError(f"{path} is truncated")
+
+    def might_contain(self, prefix: bytes) -> bool:
+        mm = self._mm
+        base = BLOOM_HEADER.size
+        for position in bloom_positions(prefix, self.num_hashes, self.num_bits):
+            if not mm[base + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+class BreachedPasswordIndex:
+    """Binary search prefix hash di file index yang di-mmap, dengan Bloom filter opsional di depannya."""
+
+    def __init__(self, path: str, bloom_path: Optional[str] = None):
+        self.path = path
+        self.bloom: Optional[BloomFilter] = None
+        self._mm, (magic, version, self.kind, self.prefix_length, _, self.count) = _open_mmap(path, HEADER)
+        if magic != INDEX_MAGIC or version != FORMAT_VERSION or self.kind not in HASHERS or not self.prefix_length:
+            self.close()
+            raise BreachedIndexError(f"{path} is not a breached-password index")
+        if len(self._mm) != HEADER.size + self.count * self.prefix_length:
+            self.close()
+            raise BreachedIndexError(f"{path} is truncated")
+        self._hash = HASHERS[self.kind]
+        if bloom_path:
+            try:
+                self.bloom = BloomFilter(bloom_path)
+            except BreachedIndexError:
+                self.close()
+                raise
+
+    def contains_prefix(self, prefix: bytes) -> bool:
+        """Apakah prefix hash ada di index."""
+        if self.bloom is not None and not self.bloom.might_contain(prefix):
+            return False
+        mm = self._mm
+        size = self.prefix_length
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * size
+            record = mm[offset:offset + size]
+            if record < prefix:
+                lo = mid + 1
+            elif record > prefix:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, password: str) -> bool:
+        return self.contains_prefix(self._hash(password)[:self.prefix_length])
+
+    def close(self) -> None:
+        self._mm.close()
+        if self.bloom is not None:
+            self.bloom.close()
+
+
+_index: Optional[BreachedPasswordIndex] = None
+
+
+def load_breached_password_index() -> Optional[BreachedPasswordIndex]:
+    """Membuka dan memvalidasi index BREACHED_PASSWORDS_PATH sekali (startup); BreachedIndexError jika rusak."""
+    global _index
+    path = settings.BREACHED_PASSWORDS_PATH
+    if _index is None and path:
+        bloom_path = f"{path}.bloom"
+        _index = BreachedPasswordIndex(path, bloom_path if os.path.exists(bloom_path) else None)
+        logger.info(f"Loaded breached-password index with {_index.count} records")
+    return _index
+
+
+def is_breached_password(password: str) -> bool:
+    """True jika password ada di corpus password bocor (index yang dimuat saat startup; tanpa I/O file di request)."""
+    return _index is not None and password in _index
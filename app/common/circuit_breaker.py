@@ -0,0 +1,189 @@
+"""Deadline per operasi dan circuit breaker untuk dependency yang bisa stall (database)."""
+import asyncio
+import functools
+import inspect
+import math
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from app.config.env import settings
+from app.common.exceptions import ServiceUnavailableException
+
+T = TypeVar('T')
+
+
+class CircuitBreaker:
+    """Breaker tiga state: closed -> open (fail fast) -> half_open (probe) -> closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self.reset_timeout - (time.monotonic() - self.opened_at)))
+
+    def _before_call(self) -> bool:
+        """Mengembalikan True jika call ini adalah probe half-open."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise ServiceUnavailableException(retry_after=self._retry_after())
+            self.state = self.HALF_OPEN
+            self._probes = 0
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                self.rejected += 1
+                raise ServiceUnavailableException(retry_after=1)
+            self._probes += 1
+            return True
+        return False
+
+    def _on_success(self, probe: bool) -> None:
+        self.consecutive_failures = 0
+        if probe:
+            self._probes -= 1
+            self.state = self.CLOSED
+
+    def _on_failure(self, probe: bool) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        if probe:
+            self._probes -= 1
+        if probe or (self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.opened += 1
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None,
+        ignored: tuple[type[BaseException], ...] = (),
+        on_timeout: Optional[Callable[[], None]] = None
+    ) -> T:
+        """Menjalankan fn dengan deadline; error selain `ignored` dihitung sebagai kegagalan.
+
+        Timeout hanya membatalkan coroutine yang menunggu; `on_timeout` dipanggil untuk menghentikan
+        pekerjaan yang masih berjalan di luar event loop (mis. query di thread worker).
+        """
+        probe = self._before_call()
+        self.calls += 1
+        try:
+            result = await asyncio.wait_for(fn(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._on_failure(probe)
+            if on_timeout is not None:
+                on_timeout()
+            raise ServiceUnavailableException(f"{self.name} timed out")
+        except ignored:
+            # Error domain (mis. unique violation) berarti dependency sehat
+            self._on_success(probe)
+            raise
+        except Exception:
+            self._on_failure(probe)
+            raise
+        except BaseException:
+            # Dibatalkan (client disconnect): bukan sinyal kesehatan dependency
+            if probe:
+                self._probes -= 1
+            raise
+        self._on_success(probe)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Statistik untuk monitoring."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Mendapatkan (atau membuat) breaker global berdasarkan nama."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(
+            name,
+            settings.DB_BREAKER_FAILURE_THRESHOLD,
+            settings.DB_BREAKER_RESET_SECONDS
+        )
+    return breaker
+
+
+def breaker_stats() -> dict[str, dict[str, Any]]:
+    """Statistik semua breaker."""
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
+
+
+def guarded_class(breaker_name: str, ignored: tuple[type[BaseException], ...] = ()) -> Callable[[type], type]:
+    """Class decorator: setiap method async publik lewat breaker dengan deadline per operasi.
+
+    Deadline diambil dari DB_OPERATION_TIMEOUTS[nama method], default DB_QUERY_TIMEOUT_SECONDS.
+    Untuk async generator (iter_users) deadline berlaku per item, jadi per batch yang di-fetch.
+    Jika class punya method `_interrupt`, method itu dipanggil saat timeout untuk membatalkan query
+    yang masih berjalan. Write yang timeout tetap berstatus tidak diketahui (bisa saja sudah commit
+    tepat sebelum dibatalkan), jadi tidak aman di-retry otomatis kecuali operasinya idempotent.
+    """
+    def decorator(cls: type) -> type:
+        breaker = get_breaker(breaker_name)
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or attr in ("connect", "disconnect"):
+                continue
+            timeout = settings.DB_OPERATION_TIMEOUTS.get(attr, settings.DB_QUERY_TIMEOUT_SECONDS)
+
+            def wrap(fn: Callable, timeout: float) -> Callable:
+                @functools.wraps(fn)
+                async def wrapper(self, *args, **kwargs):
+                    return await breaker.call(
+                        lambda: fn(self, *args, **kwargs), timeout, ignored, getattr(self, "_interrupt", None)
+                    )
+                return wrapper
+
+            def wrap_generator(fn: Callable, timeout: float) -> Callable:
+                @functools.wraps(fn)
+                async def wrapper(self, *args, **kwargs):
+                    items = fn(self, *args, **kwargs)
+                    try:
+                        while True:
+                            try:
+                                # StopAsyncIteration = iterasi selesai normal, bukan kegagalan dependency
+                                item = await breaker.call(
+                                    items.__anext__, timeout, ignored + (StopAsyncIteration,),
+                                    getattr(self, "_interrupt", None)
+                                )
+                            except StopAsyncIteration:
+                                return
+                            yield item
+                    finally:
+                        await items.aclose()
+                return wrapper
+
+            if inspect.iscoroutinefunction(value):
+                setattr(cls, attr, wrap(value, timeout))
+            elif inspect.isasyncgenfunction(value):
+                setattr(cls, attr, wrap_generator(value, timeout))
+        return cls
+    return decorator
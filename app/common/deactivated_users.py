@@ -0,0 +1,92 @@
+"""Set ringkas user ID yang dinonaktifkan untuk pengecekan access token tanpa I/O."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Overlap polling untuk menutup selisih jam antara app dan database
+POLL_OVERLAP = timedelta(seconds=60)
+
+
+class DeactivatedUserSet:
+    """Bitmap user ID (1 bit per ID autoincrement) dengan lookup O(1)."""
+
+    def __init__(self):
+        self._bits = bytearray()
+        self._count = 0
+        self.watermark: Optional[datetime] = None
+        self.loaded = False
+
+    def __contains__(self, user_id: int) -> bool:
+        if user_id < 0:
+            return False
+        index = user_id >> 3
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (user_id & 7)))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def mark(self, user_id: int, is_active: bool) -> None:
+        """Change hook: update status satu user (dipanggil saat status berubah)."""
+        if user_id < 0:
+            raise ValueError(f"Invalid user id: {user_id}")
+        index = user_id >> 3
+        mask = 1 << (user_id & 7)
+        if is_active:
+            if index < len(self._bits) and self._bits[index] & mask:
+                self._bits[index] &= ~mask
+                self._count -= 1
+            return
+        if index >= len(self._bits):
+            # Tumbuh secara geometris agar mark berurutan tidak realokasi terus
+            self._bits.extend(bytes(max(index + 1, len(self._bits) * 2) - len(self._bits)))
+        if not self._bits[index] & mask:
+            self._bits[index] |= mask
+            self._count += 1
+
+    async def load(self, repo) -> None:
+        """Memuat seluruh user nonaktif (dipanggil saat startup)."""
+        started_at = datetime.now(timezone.utc)
+        bits = DeactivatedUserSet()
+        for user_id in await repo.get_inactive_user_ids():
+            bits.mark(user_id, False)
+        self._bits, self._count = bits._bits, bits._count
+        self.watermark = started_at
+        self.loaded = True
+        logger.info(f"Loaded {self._count} deactivated users")
+
+    async def refresh(self, repo) -> int:
+        """Update inkremental dari user yang updatedAt-nya berubah sejak polling terakhir."""
+        if not self.loaded:
+            await self.load(repo)
+            return self._count
+        users = await repo.get_users_updated_since(self.watermark - POLL_OVERLAP)
+        for user in users:
+            self.mark(user.id, user.isActive)
+            if user.updatedAt > self.watermark:
+                self.watermark = user.updatedAt
+        return len(users)
+
+    async def run_polling(self, repo_factory: Callable[[], Any], interval: float) -> None:
+        """Loop background yang memanggil refresh setiap interval detik."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh(repo_factory())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to refresh deactivated users: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        """Statistik untuk monitoring."""
+        return {
+            "count": self._count,
+            "bitmap_bytes": len(self._bits),
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+        }
+
+
+deactivated_users = DeactivatedUserSet()
@@ -1,9 +1,12 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.config.database import get_prisma
-from prisma import Prisma
+from app.config.database import get_storage
 from app.config.security import verify_token
+from app.config.env import settings
+from app.common.deactivated_users import deactivated_users
+from app.common.exceptions import InactiveUserException
 from typing import Optional
+import secrets
 
 security = HTTPBearer()
 
@@ -29,10 +32,34 @@ async def get_current_user_id(
             detail="Invalid token payload"
         )
     
-    return int(user_id)
+    user_id = int(user_id)
+    # Cek in-memory, tanpa query database per request
+    if user_id in deactivated_users:
+        raise InactiveUserException()
+    
+    return user_id
+
 
+async def get_db():
+    """Dependency untuk mendapatkan storage backend (AuthStorage) yang aktif."""
+    return get_storage()
 
-async def get_db() -> Prisma:
-    """Dependency untuk mendapatkan database client."""
-    return get_prisma()
 
+async def require_admin(
+    x_admin_key: Optional[str] = Header(None, alias="X-Admin-Key")
+) -> None:
+    """Memastikan request membawa admin API key yang valid."""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    # Bandingkan bytes: compare_digest pada str menolak karakter non-ASCII dengan TypeError (500).
+    # Header di-decode latin-1 oleh Starlette, jadi encode latin-1 mengembalikan bytes aslinya.
+    if x_admin_key is None or not secrets.compare_digest(
+        x_admin_key.encode("latin-1"), settings.ADMIN_API_KEY.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin key"
+        )
@@ -1,5 +1,6 @@
 """Custom exceptions untuk authentication service."""
 from fastapi import HTTPException, status
+from typing import Optional
 
 
 class AuthException(HTTPException):
@@ -60,3 +61,21 @@ class GoogleOAuthException(AuthException):
             detail=message
         )
 
+
+class IdempotencyKeyConflictException(AuthException):
+    """Exception untuk Idempotency-Key yang dipakai ulang dengan body request berbeda."""
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Idempotency-Key was already used with a different request"
+        )
+
+
+class ServiceUnavailableException(AuthException):
+    """Exception untuk dependency (database) yang timeout atau sedang di-circuit-break."""
+    def __init__(self, message: str = "Service temporarily unavailable", retry_after: Optional[int] = None):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=message,
+            headers={"Retry-After": str(retry_after)} if retry_after else None
+        )
@@ -0,0 +1,148 @@
+"""Idempotency-Key support: request ulang mengembalikan hasil yang sudah tersimpan."""
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+from pydantic import BaseModel
+from app.config.env import settings
+from app.common.exceptions import IdempotencyKeyConflictException
+
+
+class IdempotencyBackend:
+    """Interface penyimpanan hasil request idempotent."""
+
+    async def get(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def set(self, key: str, record: dict, ttl: int) -> None:
+        raise NotImplementedError
+
+
+class MemoryIdempotencyBackend(IdempotencyBackend):
+    """Penyimpanan in-process berbentuk LRU dengan batas jumlah entry dan TTL."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return record
+
+    async def set(self, key: str, record: dict, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, record)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisIdempotencyBackend(IdempotencyBackend):
+    """Penyimpanan bersama antar worker menggunakan Redis (butuh package `redis`)."""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("IDEMPOTENCY_BACKEND_URL requires the 'redis' package") from e
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[dict]:
+        value = await self._client.get(f"idempotency:{key}")
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, record: dict, ttl: int) -> None:
+        await self._client.set(f"idempotency:{key}", json.dumps(record), ex=ttl)
+
+
+class IdempotencyStore:
+    """Menjalankan operasi sekali per Idempotency-Key; request yang sedang berjalan ditunggu, bukan diulang."""
+
+    def __init__(self, backend: IdempotencyBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: dict[str, tuple[str, asyncio.Future]] = {}
+        self.executed = 0
+        self.replayed = 0
+        self.joined = 0
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Menjalankan fn, atau mengembalikan hasil tersimpan untuk key yang sama."""
+        full_key = f"{scope}:{key}"
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            inflight_fingerprint, task = inflight
+            if inflight_fingerprint != fingerprint:
+                raise IdempotencyKeyConflictException()
+            self.joined += 1
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(self._execute(full_key, fingerprint, fn))
+        self._inflight[full_key] = (fingerprint, task)
+        task.add_done_callback(lambda _: self._inflight.pop(full_key, None))
+        return await asyncio.shield(task)
+
+    async def _execute(
+        self,
+        full_key: str,
+        fingerprint: str,
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        record = await self.backend.get(full_key)
+        if record is not None:
+            if record["fingerprint"] != fingerprint:
+                raise IdempotencyKeyConflictException()
+            self.replayed += 1
+            return record["result"]
+        # Error tidak disimpan supaya retry berikutnya bisa berhasil
+        result = await fn()
+        self.executed += 1
+        await self.backend.set(full_key, {"fingerprint": fingerprint, "result": result}, self.ttl)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Statistik untuk monitoring."""
+        stats = {
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "joined": self.joined,
+            "inflight": len(self._inflight),
+        }
+        if isinstance(self.backend, MemoryIdempotencyBackend):
+            stats["entries"] = len(self.backend)
+        return stats
+
+
+def request_fingerprint(payload: BaseModel) -> str:
+    """Fingerprint body request (HMAC, karena body bisa berisi password)."""
+    return hmac.new(
+        settings.JWT_SECRET_KEY.encode('utf-8'),
+        payload.model_dump_json().encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
+
+def _create_backend() -> IdempotencyBackend:
+    if settings.IDEMPOTENCY_BACKEND_URL:
+        return RedisIdempotencyBackend(settings.IDEMPOTENCY_BACKEND_URL)
+    return MemoryIdempotencyBackend(settings.IDEMPOTENCY_MAX_ENTRIES)
+
+
+idempotency_store = IdempotencyStore(_create_backend(), settings.IDEMPOTENCY_TTL_SECONDS)
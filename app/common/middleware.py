@@ -0,0 +1,323 @@
+"""Middleware pure ASGI: CORS dengan preflight cache, rate limit, metrics, dan error handling.
+
+Semua konfigurasi dihitung sekali saat konstruksi; per request hanya lookup set/dict.
+"""
+import json
+import logging
+import math
+import re
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def _get_header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+async def _send_json(send, status: int, body: dict, headers: Iterable[tuple[bytes, bytes]] = ()) -> None:
+    payload = json.dumps(body).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode("latin-1")),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+class CORSMiddleware:
+    """CORS dengan origin set/regex yang sudah dikompilasi dan header preflight yang sudah dihitung."""
+
+    def __init__(
+        self,
+        app,
+        allow_origins: Iterable[str] = (),
+        allow_origin_regex: Optional[str] = None,
+        allow_methods: Iterable[str] = ("GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"),
+        allow_headers: Iterable[str] = ("*",),
+        allow_credentials: bool = False,
+        max_age: int = 600
+    ):
+        self.app = app
+        origins = {origin.strip() for origin in allow_origins if origin.strip()}
+        self.allow_all_origins = "*" in origins
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in origins)
+        self.allow_origin_regex = re.compile(allow_origin_regex) if allow_origin_regex else None
+        self.allow_credentials = allow_credentials
+        methods = {method.upper() for method in allow_methods}
+        self.allow_all_methods = "*" in methods
+        self.allow_methods = frozenset(m.encode("latin-1") for m in methods)
+        headers = {header.lower() for header in allow_headers}
+        self.allow_all_headers = "*" in headers
+        self.allow_headers = frozenset(h.encode("latin-1") for h in headers)
+
+        # Header tetap untuk preflight, dihitung sekali
+        all_methods = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+        self._preflight_headers = [
+            (b"access-control-allow-methods", all_methods if self.allow_all_methods
+             else ", ".join(sorted(methods)).encode("latin-1")),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"vary", b"Origin"),
+        ]
+        if not self.allow_all_headers:
+            self._preflight_headers.append(
+                (b"access-control-allow-headers", ", ".join(sorted(headers)).encode("latin-1"))
+            )
+        if allow_credentials:
+            self._preflight_headers.append((b"access-control-allow-credentials", b"true"))
+        # Tanpa credentials dan origin "*": header "*" statis, tidak perlu echo origin
+        self._static_origin = b"*" if self.allow_all_origins and not allow_credentials else None
+
+    def _is_allowed(self, origin: bytes) -> bool:
+        if self.allow_all_origins or origin in self.allow_origins:
+            return True
+        return self.allow_origin_regex is not None and \
+            self.allow_origin_regex.fullmatch(origin.decode("latin-1")) is not None
+
+    def _origin_headers(self, origin: bytes) -> list[tuple[bytes, bytes]]:
+        if self._static_origin is not None:
+            return [(b"access-control-allow-origin", self._static_origin)]
+        headers = [(b"access-control-allow-origin", origin), (b"vary", b"Origin")]
+        if self.allow_credentials:
+            headers.append((b"access-control-allow-credentials", b"true"))
+        return headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        origin = _get_header(scope, b"origin")
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] == "OPTIONS":
+            request_method = _get_header(scope, b"access-control-request-method")
+            if request_method is not None:
+                await self._preflight(scope, send, origin, request_method)
+                return
+        if not self._is_allowed(origin):
+            await self.app(scope, receive, send)
+            return
+        extra = self._origin_headers(origin)
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *extra]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight(self, scope, send, origin: bytes, request_method: bytes) -> None:
+        if not self._is_allowed(origin):
+            await _send_json(send, 400, {"detail": "Disallowed CORS origin"})
+            return
+        if not self.allow_all_methods and request_method.upper() not in self.allow_methods:
+            await _send_json(send, 400, {"detail": "Disallowed CORS method"})
+            return
+        headers = [*self._preflight_headers, *self._origin_headers(origin)]
+        requested = _get_header(scope, b"access-control-request-headers")
+        if requested is not None:
+            if self.allow_all_headers:
+                headers.append((b"access-control-allow-headers", requested))
+            elif any(h.strip().lower() not in self.allow_headers for h in requested.split(b",") if h.strip()):
+                await _send_json(send, 400, {"detail": "Disallowed CORS headers"})
+                return
+        headers.append((b"content-length", b"0"))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def parse_rate_limit(limit: str) -> tuple[int, int]:
+    """Parse '5/minute' atau '100/hour' menjadi (jumlah, detik window)."""
+    count, _, period = limit.partition("/")
+    return int(count), PERIODS[period.strip().rstrip("s")]
+
+
+class FixedWindowLimiter:
+    """Counter fixed-window per (IP, path); window kedaluwarsa dibersihkan agar memory tidak tumbuh."""
+
+    def __init__(self, sweep_interval: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.sweep_interval = sweep_interval
+        # Bisa diganti clock simulasi lewat use_clock (benchmarks/soak_memory.py)
+        self.clock = clock
+        self._windows: dict[tuple[str, str], list] = {}
+        self._next_sweep = clock() + sweep_interval
+        self.rejected = 0
+
+    def hit(self, key: tuple[str, str], max_requests: int, window: int) -> Optional[int]:
+        """Mencatat satu hit; mengembalikan detik Retry-After jika limit terlampaui, None jika lolos."""
+        now = self.clock()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        entry = self._windows.get(key)
+        if entry is None or entry[0] <= now:
+            entry = self._windows[key] = [now + window, 0]
+        entry[1] += 1
+        if entry[1] > max_requests:
+            self.rejected += 1
+            return max(1, math.ceil(entry[0] - now))
+        return None
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, (reset_at, _) in self._windows.items() if reset_at <= now]
+        for key in expired:
+            del self._windows[key]
+        self._next_sweep = now + self.sweep_interval
+
+    def use_clock(self, clock: Callable[[], float]) -> None:
+        """Mengganti clock; window lama dan jadwal sweep diukur dengan clock lama, jadi ikut di-reset."""
+        self.clock = clock
+        self._windows.clear()
+        self._next_sweep = clock() + self.sweep_interval
+
+    def stats(self) -> dict[str, Any]:
+        return {"tracked_keys": len(self._windows), "rejected": self.rejected}
+
+
+rate_limiter = FixedWindowLimiter()
+
+
+class RateLimitMiddleware:
+    """Rate limit berdasarkan tabel path -> limit (mis. {"/auth/login": "5/minute"})."""
+
+    def __init__(self, app, limits: dict[str, str], limiter: FixedWindowLimiter = rate_limiter, enabled: bool = True):
+        self.app = app
+        self.enabled = enabled
+        self.limiter = limiter
+        self.limits = {path: (*parse_rate_limit(limit), limit) for path, limit in limits.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        limit = self.limits.get(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        max_requests, window, description = limit
+        client = scope.get("client")
+        retry_after = self.limiter.hit((client[0] if client else "unknown", scope["path"]), max_requests, window)
+        if retry_after is not None:
+            await _send_json(
+                send,
+                429,
+                {"error": f"Rate limit exceeded: {description}"},
+                [(b"retry-after", str(retry_after).encode("latin-1"))]
+            )
+            return
+        await self.app(scope, receive, send)
+
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class RequestMetrics:
+    """Hitungan request dan histogram latency per route."""
+
+    def __init__(self):
+        self._routes: dict[str, dict[str, Any]] = {}
+
+    def record(self, route: str, status_code: int, elapsed_ms: float) -> None:
+        metrics = self._routes.get(route)
+        if metrics is None:
+            metrics = self._routes[route] = {
+                "count": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            }
+        metrics["count"] += 1
+        metrics["total_ms"] += elapsed_ms
+        if status_code >= 500:
+            metrics["errors"] += 1
+        metrics["buckets"][bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def stats(self) -> dict[str, Any]:
+        labels = [f"le_{bucket}ms" for bucket in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            route: {
+                "count": m["count"],
+                "errors": m["errors"],
+                "avg_ms": round(m["total_ms"] / m["count"], 3),
+                "buckets": dict(zip(labels, m["buckets"])),
+            }
+            for route, m in self._routes.items()
+        }
+
+
+request_metrics = RequestMetrics()
+
+
+def _route_label(scope) -> str:
+    # Router Starlette mengisi scope["endpoint"] jika path cocok; path lain digabung
+    # agar request scanner (404) tidak membuat jumlah key tumbuh tanpa batas
+    if "endpoint" not in scope:
+        return "unmatched"
+    path = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        path = path.replace(str(value), "{" + name + "}")
+    return f"{scope['method']} {path}"
+
+
+class MetricsMiddleware:
+    """Mencatat status dan latency setiap request HTTP ke RequestMetrics."""
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.record(_route_label(scope), status_code, (time.perf_counter() - started) * 1000)
+
+
+class ErrorHandlingMiddleware:
+    """Mengubah exception yang tidak tertangani menjadi response JSON 500."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        response_started = False
+
+        async def send_tracking(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking)
+        except Exception:
+            logger.exception(f"Unhandled error on {scope['method']} {scope['path']}")
+            if response_started:
+                raise
+            await _send_json(send, 500, {"detail": "Internal Server Error"})
@@ -0,0 +1,177 @@
+"""Profiling on-demand untuk request live: sampling stack event loop, output collapsed-stack."""
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Optional
+from app.config.env import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = "/".join(code.co_filename.replace("\\", "/").rsplit("/", 2)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Thread yang mengambil sampel stack satu thread target secara berkala."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class ProfileRecord:
+    """Hasil profiling satu request."""
+
+    def __init__(self, method: str, path: str, duration_ms: float, samples: Counter, filename: str):
+        self.id = secrets.token_hex(8)
+        self.method = method
+        self.path = path
+        self.duration_ms = duration_ms
+        self.samples = samples
+        self.filename = filename
+        self.created_at = datetime.now(timezone.utc)
+
+    def collapsed(self) -> str:
+        """Format collapsed-stack (bisa dibuka di speedscope atau flamegraph.pl)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": sum(self.samples.values()),
+            "file": self.filename,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+class ProfileStore:
+    """Menyimpan K profile paling lambat di memory (file di PROFILE_DIR mengikuti isi store)."""
+
+    def __init__(self, keep: int):
+        self.keep = keep
+        self._heap: list[tuple[float, int, ProfileRecord]] = []
+        self._seq = itertools.count()
+
+    def add(self, record: ProfileRecord) -> tuple[bool, Optional[ProfileRecord]]:
+        """Menambah record; mengembalikan (record disimpan?, record yang tergeser keluar)."""
+        item = (record.duration_ms, next(self._seq), record)
+        if len(self._heap) < self.keep:
+            heapq.heappush(self._heap, item)
+            return True, None
+        if self._heap and item[0] > self._heap[0][0]:
+            return True, heapq.heapreplace(self._heap, item)[2]
+        return False, None
+
+    def slowest(self) -> list[ProfileRecord]:
+        return [record for _, _, record in sorted(self._heap, reverse=True)]
+
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        return next((record for _, _, record in self._heap if record.id == profile_id), None)
+
+
+profile_store = ProfileStore(settings.PROFILE_KEEP_SLOWEST)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware: profile request jika header X-Profile = ADMIN_API_KEY atau setiap request ke-N."""
+
+    def __init__(self, app, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+        self.sample_every = settings.PROFILE_SAMPLE_EVERY
+        self.interval = settings.PROFILE_INTERVAL_MS / 1000
+        self.output_dir = settings.PROFILE_DIR
+        self._counter = itertools.count(1)
+        # Satu profile aktif dalam satu waktu agar overhead sampling tetap terbatas
+        self._active = False
+
+    def _should_profile(self, scope) -> bool:
+        if self._active:
+            return False
+        if settings.ADMIN_API_KEY:
+            for key, value in scope["headers"]:
+                if key == b"x-profile":
+                    # Bytes mentah header: compare_digest pada str non-ASCII melempar TypeError (500)
+                    return secrets.compare_digest(value, settings.ADMIN_API_KEY.encode("utf-8"))
+        return self.sample_every > 0 and next(self._counter) % self.sample_every == 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        self._active = True
+        # Sampel diambil dari thread event loop, jadi request lain yang berjalan bersamaan ikut terlihat
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            samples = sampler.stop()
+            duration_ms = (time.perf_counter() - started) * 1000
+            try:
+                await self._save(scope["method"], scope["path"], duration_ms, samples)
+            finally:
+                # Baru dilepas setelah file ditulis/dihapus agar operasi file antar profile tidak saling mendahului
+                self._active = False
+
+    async def _save(self, method: str, path: str, duration_ms: float, samples: Counter) -> None:
+        route = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        filename = os.path.join(self.output_dir, f"{timestamp}_{method}_{route}_{duration_ms:.0f}ms.collapsed")
+        record = ProfileRecord(method, path, duration_ms, samples, filename)
+        # Hanya profile yang masuk K paling lambat yang ditulis; file profile yang tergeser dihapus
+        kept, evicted = self.store.add(record)
+        if not kept:
+            return
+        try:
+            await asyncio.to_thread(self._write, filename, record.collapsed(), evicted.filename if evicted else None)
+        except OSError as e:
+            logger.error(f"Failed to write profile {filename}: {e}")
+
+    @staticmethod
+    def _write(filename: str, content: str, evicted: Optional[str]) -> None:
+        if evicted is not None:
+            try:
+                os.remove(evicted)
+            except FileNotFoundError:
+                pass
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(content)
@@ -0,0 +1,64 @@
+"""Warm-up saat startup dan readiness probe dengan hasil yang di-cache."""
+import inspect
+import time
+from typing import Any, Awaitable, Callable
+from app.config.env import settings
+from app.common.singleflight import get_singleflight
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Status warm-up per worker dan hasil probe database yang di-cache singkat."""
+
+    def __init__(self, cache_seconds: float):
+        self.cache_seconds = cache_seconds
+        self.warmed_up = False
+        self.warmup_steps: dict[str, dict[str, Any]] = {}
+        self._probe_result: tuple[bool, str] = (False, "not checked")
+        self._probe_at = 0.0
+        # Probe concurrent (banyak health checker) digabung jadi satu query
+        self._probes = get_singleflight("readiness")
+
+    async def warm_up(self, steps: dict[str, Callable[[], Any]]) -> None:
+        """Menjalankan setiap langkah warm-up; kegagalan dicatat tapi tidak menghentikan langkah lain."""
+        for name, step in steps.items():
+            started = time.perf_counter()
+            try:
+                result = step()
+                if inspect.isawaitable(result):
+                    await result
+                self.warmup_steps[name] = {"ok": True}
+            except Exception as e:
+                logger.warning(f"Warm-up step {name} failed: {e}")
+                self.warmup_steps[name] = {"ok": False, "error": str(e)}
+            self.warmup_steps[name]["ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self.warmed_up = True
+        logger.info(f"Warm-up finished: {self.warmup_steps}")
+
+    async def _probe(self, ping: Callable[[], Awaitable[None]]) -> tuple[bool, str]:
+        try:
+            await ping()
+            result = (True, "ok")
+        except Exception as e:
+            result = (False, str(e) or type(e).__name__)
+        self._probe_result = result
+        self._probe_at = time.monotonic()
+        return result
+
+    async def check(self, ping: Callable[[], Awaitable[None]]) -> dict[str, Any]:
+        """Ready jika warm-up selesai dan database menjawab (hasil probe di-cache)."""
+        if time.monotonic() - self._probe_at < self.cache_seconds:
+            db_ok, db_detail = self._probe_result
+        else:
+            db_ok, db_detail = await self._probes.do("database", lambda: self._probe(ping))
+        return {
+            "ready": self.warmed_up and db_ok,
+            "warmed_up": self.warmed_up,
+            "database": db_detail,
+            "warmup": self.warmup_steps,
+        }
+
+
+readiness = Readiness(settings.READINESS_CACHE_SECONDS)
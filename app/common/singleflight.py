@@ -0,0 +1,57 @@
+"""Single-flight: panggilan identik yang berjalan bersamaan berbagi satu hasil."""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """Menggabungkan panggilan async concurrent dengan key yang sama menjadi satu eksekusi."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+
+    @property
+    def collapsed(self) -> int:
+        """Jumlah panggilan yang tidak perlu dieksekusi ulang."""
+        return self.calls - self.executions
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Menjalankan fn sekali per key; pemanggil lain menunggu hasil yang sama."""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: pembatalan satu pemanggil tidak membatalkan pemanggil lain
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, Any]:
+        """Statistik untuk monitoring."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "inflight": len(self._inflight),
+        }
+
+
+_groups: dict[str, SingleFlight] = {}
+
+
+def get_singleflight(name: str) -> SingleFlight:
+    """Mendapatkan (atau membuat) grup single-flight global berdasarkan nama."""
+    group = _groups.get(name)
+    if group is None:
+        group = _groups[name] = SingleFlight(name)
+    return group
+
+
+def singleflight_stats() -> dict[str, dict[str, Any]]:
+    """Statistik semua grup single-flight."""
+    return {name: group.stats() for name, group in _groups.items()}
@@ -0,0 +1,352 @@
+"""Tracing ringan: span bersarang per request, propagasi W3C traceparent, export batch ke file OTLP-JSON."""
+import functools
+import inspect
+import ipaddress
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+from app.config.env import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """Satu unit kerja dalam trace."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "sampled",
+                 "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        """Header W3C traceparent untuk span ini."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 2 if self.parent_id is None else 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    """Parse header traceparent menjadi (trace_id, parent_span_id, sampled)."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    try:
+        int(trace_id, 16), int(span_id, 16)
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, sampled
+
+
+class FileSpanExporter:
+    """Menulis span ke file JSONL format OTLP (satu ExportTraceServiceRequest per baris) dari thread background."""
+
+    def __init__(self, path: str, batch_size: int, interval: float):
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.exported = 0
+
+    def export(self, span: Span) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(span)
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stop = True
+                    break
+                batch.append(span)
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: list[Span]) -> None:
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": settings.APP_NAME}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.common.tracing"},
+                    "spans": [span.to_otlp() for span in batch],
+                }],
+            }]
+        }
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(request, separators=(",", ":")) + "\n")
+            self.exported += len(batch)
+        except OSError as e:
+            logger.error(f"Failed to export {len(batch)} spans: {e}")
+
+    def shutdown(self) -> None:
+        """Flush span yang tersisa lalu hentikan thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+
+Network = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+def parse_trusted_proxies(value: str) -> list[Network]:
+    """Daftar IP/CIDR dipisah koma menjadi network (IP tunggal = /32 atau /128)."""
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+
+class Tracer:
+    """Membuat span root/child dan mengirim span yang di-sample ke exporter."""
+
+    def __init__(
+        self,
+        enabled: bool,
+        sample_rate: float,
+        exporter: FileSpanExporter,
+        trusted_proxies: Optional[list[Network]] = None
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.trusted_proxies = trusted_proxies or []
+
+    def is_trusted(self, client_ip: Optional[str]) -> bool:
+        """Apakah flag sampled dari peer ini boleh dipercaya (proxy/service internal yang dikonfigurasi)."""
+        if not client_ip or not self.trusted_proxies:
+            return False
+        try:
+            address = ipaddress.ip_address(client_ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_proxies)
+
+    def start_root(self, name: str, traceparent: Optional[str] = None, trust_sampled: bool = False) -> Span:
+        """Membuat root span request, melanjutkan trace upstream jika ada traceparent.
+
+        Flag sampled upstream hanya dipakai jika `trust_sampled`; selain itu sampler lokal yang memutuskan
+        agar client tidak bisa memaksa 100% sampling (trace ID tetap dilanjutkan untuk korelasi).
+        """
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+            if not trust_sampled:
+                sampled = random.random() < self.sample_rate
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            sampled = random.random() < self.sample_rate
+        return Span(name, trace_id, parent_id, sampled)
+
+    def finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        if span.sampled:
+            self.exporter.export(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """Child span dari span aktif; no-op jika tidak ada trace yang di-sample."""
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            yield None
+            return
+        span = Span(name, parent.trace_id, parent.span_id, True)
+        span.attributes.update(attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span)
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+tracer = Tracer(
+    settings.TRACING_ENABLED,
+    settings.TRACE_SAMPLE_RATE,
+    FileSpanExporter(
+        settings.TRACE_EXPORT_PATH,
+        settings.TRACE_EXPORT_BATCH_SIZE,
+        settings.TRACE_EXPORT_INTERVAL_SECONDS
+    ),
+    parse_trusted_proxies(settings.TRACE_TRUSTED_PROXIES)
+)
+
+
+def current_traceparent() -> Optional[str]:
+    """traceparent span aktif, untuk diteruskan ke request outbound."""
+    span = _current_span.get()
+    return span.traceparent if span is not None else None
+
+
+def traced(name: str) -> Callable:
+    """Decorator untuk membungkus fungsi sync/async/async generator dalam child span."""
+    def decorator(fn: Callable) -> Callable:
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def generator_wrapper(*args, **kwargs):
+                parent = _current_span.get()
+                if parent is None or not parent.sampled:
+                    async for item in fn(*args, **kwargs):
+                        yield item
+                    return
+                # Span aktif hanya di-set selama satu langkah iterasi: consumer berjalan di antara yield,
+                # dan ContextVar harus di-reset di langkah yang sama dengan set-nya
+                span = Span(name, parent.trace_id, parent.span_id, True)
+                items = fn(*args, **kwargs)
+                count = 0
+                try:
+                    while True:
+                        token = _current_span.set(span)
+                        try:
+                            item = await items.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            _current_span.reset(token)
+                        count += 1
+                        yield item
+                except BaseException as e:
+                    span.error = type(e).__name__
+                    raise
+                finally:
+                    await items.aclose()
+                    span.attributes["items"] = count
+                    tracer.finish(span)
+            return generator_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                parent = _current_span.get()
+                if parent is None or not parent.sampled:
+                    return await fn(*args, **kwargs)
+                with tracer.span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None or not parent.sampled:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_class(prefix: str) -> Callable[[type], type]:
+    """Class decorator: setiap method async (termasuk async generator) publik dibungkus span '<prefix>.<method>'."""
+    def decorator(cls: type) -> type:
+        for attr, value in list(vars(cls).items()):
+            if not attr.startswith("_") and (inspect.iscoroutinefunction(value) or inspect.isasyncgenfunction(value)):
+                setattr(cls, attr, traced(f"{prefix}.{attr}")(value))
+        return cls
+    return decorator
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: root span per request dan header traceparent di response."""
+
+    def __init__(self, app, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        client = scope.get("client")
+        span = self.tracer.start_root(
+            f"{scope['method']} {scope['path']}",
+            traceparent,
+            trust_sampled=self.tracer.is_trusted(client[0] if client else None)
+        )
+        span.attributes["http.method"] = scope["method"]
+        span.attributes["http.target"] = scope["path"]
+        token = _current_span.set(span)
+
+        async def send_with_traceparent(message):
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"traceparent", span.traceparent.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_traceparent)
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self.tracer.finish(span)
@@ -1,41 +1,77 @@
-"""Manajemen koneksi database menggunakan Prisma Client."""
-from prisma import Prisma
+"""Manajemen koneksi database dan pemilihan storage backend berdasarkan DATABASE_URL.
+
+- mysql://...            -> Prisma Client (AuthRepository)
+- sqlite:///path/auth.db -> SQLite embedded (SQLiteAuthRepository)
+- memory://              -> In-memory (MemoryAuthRepository), untuk test dan benchmark
+"""
+from __future__ import annotations
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import TYPE_CHECKING, AsyncGenerator
+from app.config.env import settings
 import logging
 
+if TYPE_CHECKING:
+    from prisma import Prisma
+    from app.modules.auth.auth.storage import AuthStorage
+
 logger = logging.getLogger(__name__)
 
-# Instance global Prisma client (singleton pattern)
+# Instance global Prisma client (singleton pattern), hanya untuk backend MySQL
 prisma_client: Prisma | None = None
 
+# Instance global storage backend yang dipakai repository
+storage: AuthStorage | None = None
+
+
+def _create_storage(url: str) -> AuthStorage:
+    """Membuat storage backend sesuai scheme DATABASE_URL."""
+    # Import di dalam fungsi untuk menghindari circular import dengan app.modules.auth
+    scheme = url.split(":", 1)[0].lower()
+    if scheme == "sqlite":
+        from app.modules.auth.storage.sqlite import SQLiteAuthRepository
+        return SQLiteAuthRepository(url.split("://", 1)[1].removeprefix("/") or ":memory:")
+    if scheme == "memory":
+        from app.modules.auth.storage.memory import MemoryAuthRepository
+        return MemoryAuthRepository()
+    from app.modules.auth.auth.repository import AuthRepository  # type: ignore
+    return AuthRepository(get_prisma())
+
 
 async def connect_db() -> None:
     """Membuka koneksi ke database (dipanggil saat startup)."""
-    global prisma_client
-    if prisma_client is None:
+    global prisma_client, storage
+    if storage is not None:
+        return
+    scheme = settings.DATABASE_URL.split(":", 1)[0].lower()
+    if scheme not in ("sqlite", "memory") and prisma_client is None:
+        from prisma import Prisma
         prisma_client = Prisma()
         await prisma_client.connect()
-        logger.info("Database connected")
+    storage = _create_storage(settings.DATABASE_URL)
+    await storage.connect()
+    logger.info(f"Database connected ({type(storage).__name__})")
 
 
 async def disconnect_db() -> None:
     """Menutup koneksi database (dipanggil saat shutdown)."""
-    global prisma_client
+    global prisma_client, storage
+    if storage is not None:
+        await storage.disconnect()
+        storage = None
     if prisma_client is not None:
         await prisma_client.disconnect()
         prisma_client = None
-        logger.info("Database disconnected")
+    logger.info("Database disconnected")
 
 
 @asynccontextmanager
-async def get_db() -> AsyncGenerator[Prisma, None]:
-    """Dependency injection untuk mendapatkan Prisma client di FastAPI routes."""
-    global prisma_client
-    if prisma_client is None:
+async def get_db() -> AsyncGenerator[AuthStorage, None]:
+    """Dependency injection untuk mendapatkan storage backend di FastAPI routes."""
+    global storage
+    if storage is None:
         await connect_db()
     try:
-        yield prisma_client
+        yield storage
     finally:
         pass  # Lifecycle dikelola oleh lifespan di main.py
 
@@ -47,3 +83,10 @@ def get_prisma() -> Prisma:
         raise RuntimeError("Database not connected. Call connect_db() first.")
     return prisma_client
 
+
+def get_storage() -> AuthStorage:
+    """Mendapatkan storage backend yang sudah terhubung."""
+    global storage
+    if storage is None:
+        raise RuntimeError("Database not connected. Call connect_db() first.")
+    return storage
@@ -4,11 +4,13 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional
 from app.config.env import settings
+from app.common.tracing import traced
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@traced("email.send_email")
 async def send_email(
     to_email: str,
     subject: str,
@@ -114,3 +116,41 @@ def create_reset_password_email(reset_link: str) -> tuple[str, str]:
     
     return subject, html_content
 
+
+
+def create_magic_link_email(login_link: str) -> tuple[str, str]:
+    """Membuat template email untuk login magic link."""
+    subject = "Your Login Link"
+    
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .button {{ display: inline-block; padding: 12px 24px; background-color: #007bff; 
+                      color: white; text-decoration: none; border-radius: 4px; margin: 20px 0; }}
+            .button:hover {{ background-color: #0056b3; }}
+            .footer {{ margin-top: 30px; font-size: 12px; color: #666; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h2>Log In</h2>
+            <p>Click the button below to log in. The link can only be used once:</p>
+            <a href="{login_link}" class="button">Log In</a>
+            <p>Or copy and paste this link into your browser:</p>
+            <p style="word-break: break-all; color: #666;">{login_link}</p>
+            <p>This link will expire in {settings.MAGIC_LINK_EXPIRE_MINUTES} minutes.</p>
+            <p>If you didn't request this, please ignore this email.</p>
+            <div class="footer">
+                <p>This is an automated email, please do not reply.</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+    
+    return subject, html_content
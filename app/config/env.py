@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     # JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
+    JWT_CRYPTO_BACKEND: str = "hmac"  # hmac (stdlib, HS*) atau pyjwt (butuh package PyJWT, mendukung RS*/ES*)
+    JWT_PUBLIC_KEY: Optional[str] = None  # PEM untuk verify RS*/ES*/PS*; kosong = diturunkan dari JWT_SECRET_KEY
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
@@ -32,13 +34,72 @@ class Settings(BaseSettings):
     # App
     APP_NAME: str = "Auth Service"
     RESET_TOKEN_EXPIRE_MINUTES: int = 15
+    RESET_TOKEN_REUSE_WINDOW_MINUTES: int = 2  # Request ulang dalam window ini tidak mengirim email lagi
+    RESET_TOKEN_MAX_LIFETIME_MINUTES: int = 60  # Token yang dikirim ulang tidak diperpanjang melewati createdAt + ini
+    MAGIC_LINK_EXPIRE_MINUTES: int = 10
+    MAGIC_LINK_SECRET: Optional[str] = None  # Kosong = diturunkan dari JWT_SECRET_KEY
     FRONTEND_URL: str = "http://localhost:3000"
     
     # CORS
     CORS_ORIGINS: str = "*"  # Comma-separated list atau "*" untuk semua
+    CORS_ORIGIN_REGEX: Optional[str] = None  # Mis. https://.*\.example\.com
+    CORS_MAX_AGE: int = 600  # Detik browser boleh cache hasil preflight
+    
+    # Rate limiting
+    RATE_LIMIT_ENABLED: bool = True
     
     # Security
     BCRYPT_ROUNDS: int = 12
+    DEACTIVATED_USERS_POLL_SECONDS: int = 30
+    USERNAME_INDEX_POLL_SECONDS: int = 30
+    BREACHED_PASSWORDS_PATH: Optional[str] = None  # Index dari app.cli.build_breach_index
+    
+    # Readiness
+    READINESS_CACHE_SECONDS: float = 5.0
+    
+    # Database resilience
+    DB_QUERY_TIMEOUT_SECONDS: float = 2.0
+    DB_OPERATION_TIMEOUTS: dict[str, float] = {
+        "create_users_bulk": 30.0,
+        "get_existing_emails": 10.0,
+        "get_existing_usernames": 10.0,
+        "get_users_updated_since": 10.0,
+        "get_inactive_user_ids": 30.0,
+    }  # Override per method repository, format env JSON
+    DB_BREAKER_FAILURE_THRESHOLD: int = 5
+    DB_BREAKER_RESET_SECONDS: float = 10.0
+    
+    # Idempotency
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+    IDEMPOTENCY_BACKEND_URL: Optional[str] = None  # Contoh: redis://localhost:6379/0 (shared antar worker)
+    
+    # Tracing
+    TRACING_ENABLED: bool = False
+    TRACE_SAMPLE_RATE: float = 0.1  # Dipakai untuk request tanpa traceparent atau dari peer yang tidak dipercaya
+    TRACE_TRUSTED_PROXIES: str = ""  # IP/CIDR dipisah koma yang flag sampled traceparent-nya diikuti
+    TRACE_EXPORT_PATH: str = "traces.jsonl"
+    TRACE_EXPORT_BATCH_SIZE: int = 512
+    TRACE_EXPORT_INTERVAL_SECONDS: float = 5.0
+    
+    # Audit log
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_LOG_PATH: str = "logs/audit.jsonl"
+    AUDIT_LOG_MAX_BYTES: int = 50 * 1024 * 1024  # Rotasi setelah ukuran ini (0 = tanpa rotasi)
+    AUDIT_LOG_BACKUP_COUNT: int = 10
+    AUDIT_LOG_BATCH_SIZE: int = 512
+    AUDIT_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_LOG_QUEUE_SIZE: int = 10000  # Event yang menunggu ditulis; lebih dari ini dibuang (dropped)
+    
+    # Profiling
+    PROFILE_SAMPLE_EVERY: int = 0  # 0 = hanya via header X-Profile (berisi ADMIN_API_KEY)
+    PROFILE_INTERVAL_MS: float = 2.0
+    PROFILE_DIR: str = "profiles"
+    PROFILE_KEEP_SLOWEST: int = 20
+    
+    # Admin
+    ADMIN_API_KEY: Optional[str] = None  # Kosong = endpoint admin dinonaktifkan
+    EXPORT_BATCH_SIZE: int = 1000
     
     class Config:
         env_file = str(BASE_DIR / ".env")
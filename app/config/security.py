@@ -1,15 +1,38 @@
 """Modul keamanan untuk password hashing dan JWT token management."""
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import base64
+import binascii
+import hmac
 import bcrypt
 from app.config.env import settings
+from app.config.token_codec import TokenCodec, TokenError
+from app.common.tracing import traced
 import secrets
+import time
 
 # Menggunakan bcrypt langsung (passlib memiliki masalah kompatibilitas)
 BCRYPT_ROUNDS = settings.BCRYPT_ROUNDS
 
+# Codec JWT dibuat sekali saat startup: key dan header sudah disiapkan
+token_codec = TokenCodec.create(
+    settings.JWT_SECRET_KEY,
+    settings.JWT_ALGORITHM,
+    settings.JWT_CRYPTO_BACKEND,
+    settings.JWT_PUBLIC_KEY
+)
 
+# Key terpisah dari JWT agar token magic link tidak bisa dipakai sebagai JWT (dan sebaliknya)
+MAGIC_LINK_KEY = (
+    settings.MAGIC_LINK_SECRET.encode("utf-8") if settings.MAGIC_LINK_SECRET
+    else hmac.digest(settings.JWT_SECRET_KEY.encode("utf-8"), b"magic-link", "sha256")
+)
+
+ACCESS_TOKEN_TTL_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+REFRESH_TOKEN_TTL_SECONDS = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+
+@traced("security.verify_password")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Memverifikasi password plain text terhadap hash yang tersimpan."""
     try:
@@ -20,6 +43,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False  # Mencegah information leakage
 
 
+@traced("security.get_password_hash")
 def get_password_hash(password: str) -> str:
     """Menghash password menggunakan bcrypt dengan salt otomatis."""
     password_bytes = password.encode('utf-8')
@@ -28,50 +52,62 @@ def get_password_hash(password: str) -> str:
     return hashed.decode('utf-8')
 
 
+@traced("security.create_access_token")
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Membuat JWT access token untuk autentikasi user."""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(
-        to_encode, 
-        settings.JWT_SECRET_KEY, 
-        algorithm=settings.JWT_ALGORITHM
-    )
-    return encoded_jwt
+    ttl = int(expires_delta.total_seconds()) if expires_delta else ACCESS_TOKEN_TTL_SECONDS
+    return token_codec.encode({**data, "exp": int(time.time()) + ttl, "type": "access"})
 
 
+@traced("security.create_refresh_token")
 def create_refresh_token(data: dict) -> str:
     """Membuat JWT refresh token untuk memperbarui access token."""
-    to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM
-    )
-    return encoded_jwt
+    return token_codec.encode({**data, "exp": int(time.time()) + REFRESH_TOKEN_TTL_SECONDS, "type": "refresh"})
 
 
+@traced("security.verify_token")
 def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
     """Memverifikasi dan decode JWT token."""
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        if payload.get("type") != token_type:
-            return None
-        return payload
-    except JWTError:
+        payload = token_codec.decode(token)
+    except TokenError:
+        return None
+    if payload.get("type") != token_type:
         return None
+    return payload
 
 
 def generate_reset_token() -> str:
     """Generate secure random token untuk reset password (URL-safe)."""
     return secrets.token_urlsafe(32)
+
+
+def _magic_link_signature(user_id: int, expires_at: int, updated_at: datetime) -> bytes:
+    # Nonce = updatedAt user: tidak ikut di token, dihitung ulang dari database saat consume
+    nonce = round(updated_at.timestamp() * 1_000_000)
+    return hmac.digest(MAGIC_LINK_KEY, f"{user_id}.{expires_at}.{nonce}".encode(), "sha256")
+
+
+def create_magic_link_token(user_id: int, updated_at: datetime) -> str:
+    """Membuat token magic link stateless: user_id.exp.HMAC(user_id, exp, nonce updatedAt)."""
+    expires_at = int(time.time()) + settings.MAGIC_LINK_EXPIRE_MINUTES * 60
+    signature = base64.urlsafe_b64encode(_magic_link_signature(user_id, expires_at, updated_at)).rstrip(b"=")
+    return f"{user_id}.{expires_at}.{signature.decode()}"
+
+
+def parse_magic_link_token(token: str) -> Optional[tuple[int, int, bytes]]:
+    """Memecah token magic link menjadi (user_id, exp, signature); None jika format salah atau expired."""
+    try:
+        user_id, expires_at, signature = token.split(".")
+        user_id, expires_at = int(user_id), int(expires_at)
+        signature = base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4))
+    except (ValueError, binascii.Error):
+        return None
+    if expires_at < time.time():
+        return None
+    return user_id, expires_at, signature
+
+
+def verify_magic_link_signature(user_id: int, expires_at: int, signature: bytes, updated_at: datetime) -> bool:
+    """Cek signature terhadap updatedAt user saat ini (berubah setelah link dipakai atau user di-update)."""
+    return hmac.compare_digest(_magic_link_signature(user_id, expires_at, updated_at), signature)
@@ -0,0 +1,187 @@
+"""JWT codec yang disiapkan sekali saat startup (key dan header segment sudah di-encode)."""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from calendar import timegm
+from datetime import datetime
+from typing import Any, Optional
+
+
+class TokenError(Exception):
+    """Token tidak valid: format salah, signature salah, atau sudah expired."""
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+    except (binascii.Error, ValueError) as e:
+        raise TokenError("Invalid base64 segment") from e
+
+
+def _json_default(value: Any) -> Any:
+    # Kompatibel dengan python-jose: datetime di claims menjadi NumericDate
+    if isinstance(value, datetime):
+        return timegm(value.utctimetuple())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class CryptoBackend:
+    """Interface backend kriptografi untuk sign/verify signing input JWT."""
+
+    def sign(self, message: bytes) -> bytes:
+        raise NotImplementedError
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        raise NotImplementedError
+
+
+class HMACBackend(CryptoBackend):
+    """Backend HS256/HS384/HS512 memakai hmac C one-shot dari stdlib."""
+
+    DIGESTS = {"HS256": "sha256", "HS384": "sha384", "HS512": "sha512"}
+
+    def __init__(self, secret: str, algorithm: str, public_key: Optional[str] = None):
+        if algorithm not in self.DIGESTS:
+            raise ValueError(f"HMAC backend does not support {algorithm}")
+        if public_key:
+            raise ValueError("JWT_PUBLIC_KEY is only used with asymmetric algorithms (RS*/ES*/PS*)")
+        self._key = secret.encode("utf-8")
+        self._digest = self.DIGESTS[algorithm]
+        # Validasi nama digest sekali di awal
+        hashlib.new(self._digest)
+
+    def sign(self, message: bytes) -> bytes:
+        return hmac.digest(self._key, message, self._digest)
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(hmac.digest(self._key, message, self._digest), signature)
+
+
+class PyJWTBackend(CryptoBackend):
+    """Backend memakai algoritma PyJWT (HS*, RS*, ES*, PS*) dengan key sign/verify yang di-prepare sekali.
+
+    Untuk algoritma asimetris `secret` adalah PEM private key (public key diturunkan darinya jika
+    `public_key` kosong) atau PEM public key saja untuk instance yang hanya memverifikasi token.
+    """
+
+    def __init__(self, secret: str, algorithm: str, public_key: Optional[str] = None):
+        try:
+            from jwt.algorithms import get_default_algorithms
+        except ImportError as e:
+            raise RuntimeError("JWT_CRYPTO_BACKEND=pyjwt requires the 'PyJWT' package") from e
+        algorithms = get_default_algorithms()
+        if algorithm not in algorithms:
+            raise ValueError(f"PyJWT backend does not support {algorithm}")
+        self._algorithm = algorithms[algorithm]
+        key = self._algorithm.prepare_key(secret)
+        if hasattr(key, "public_key"):
+            # Private key asimetris: tidak punya verify(), pakai public key pasangannya
+            self._sign_key: Optional[Any] = key
+            self._verify_key = key.public_key()
+        elif hasattr(key, "verify"):
+            # Public key saja: instance ini hanya bisa memverifikasi
+            self._sign_key = None
+            self._verify_key = key
+        else:
+            # HS*: key bytes yang sama untuk sign dan verify
+            self._sign_key = self._verify_key = key
+        if public_key:
+            if self._sign_key is self._verify_key:
+                raise ValueError("JWT_PUBLIC_KEY is only used with asymmetric algorithms (RS*/ES*/PS*)")
+            self._verify_key = self._algorithm.prepare_key(public_key)
+
+    def sign(self, message: bytes) -> bytes:
+        if self._sign_key is None:
+            raise RuntimeError("JWT_SECRET_KEY is a public key; this instance can only verify tokens")
+        return self._algorithm.sign(message, self._sign_key)
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        return self._algorithm.verify(message, self._verify_key, signature)
+
+
+CRYPTO_BACKENDS = {
+    "hmac": HMACBackend,
+    "pyjwt": PyJWTBackend,
+}
+
+
+class TokenCodec:
+    """Encode/decode JWT compact serialization dengan header segment yang sudah dihitung di awal."""
+
+    def __init__(self, backend: CryptoBackend, algorithm: str):
+        self.backend = backend
+        self.algorithm = algorithm
+        header = json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":"), sort_keys=True)
+        self._header_segment = _b64url_encode(header.encode("utf-8"))
+        self._signing_prefix = self._header_segment + b"."
+
+    @classmethod
+    def create(
+        cls,
+        secret: str,
+        algorithm: str,
+        backend: str = "hmac",
+        public_key: Optional[str] = None
+    ) -> "TokenCodec":
+        """Membuat codec dengan backend berdasarkan nama (hmac atau pyjwt)."""
+        if backend not in CRYPTO_BACKENDS:
+            raise ValueError(f"Unknown JWT crypto backend: {backend}")
+        return cls(CRYPTO_BACKENDS[backend](secret, algorithm, public_key), algorithm)
+
+    def encode(self, claims: dict) -> str:
+        """Membuat token dari claims (exp boleh int atau datetime)."""
+        payload = json.dumps(claims, separators=(",", ":"), default=_json_default).encode("utf-8")
+        signing_input = self._signing_prefix + _b64url_encode(payload)
+        signature = _b64url_encode(self.backend.sign(signing_input))
+        return (signing_input + b"." + signature).decode("ascii")
+
+    def decode(self, token: str, now: Optional[float] = None) -> dict:
+        """Verifikasi signature dan waktu (exp/nbf), lalu mengembalikan claims."""
+        try:
+            header_segment, payload_segment, signature_segment = token.encode("ascii").split(b".")
+        except (UnicodeEncodeError, ValueError) as e:
+            raise TokenError("Malformed token") from e
+        if header_segment != self._header_segment:
+            # Header dengan serialisasi berbeda (mis. dari library lain) tetap diterima jika alg cocok
+            try:
+                header = json.loads(_b64url_decode(header_segment))
+            except ValueError as e:
+                raise TokenError("Invalid header") from e
+            if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+                raise TokenError("Algorithm not allowed")
+        signing_input = header_segment + b"." + payload_segment
+        signature = _b64url_decode(signature_segment)
+        try:
+            verified = self.backend.verify(signing_input, signature)
+        except Exception as e:
+            # Error library kripto (mis. panjang signature ECDSA salah) tetap berarti token tidak valid
+            raise TokenError("Signature verification failed") from e
+        if not verified:
+            raise TokenError("Signature verification failed")
+        try:
+            claims = json.loads(_b64url_decode(payload_segment))
+        except ValueError as e:
+            raise TokenError("Invalid payload") from e
+        if not isinstance(claims, dict):
+            raise TokenError("Invalid payload")
+        now = time.time() if now is None else now
+        exp = claims.get("exp")
+        if exp is not None:
+            if not isinstance(exp, (int, float)):
+                raise TokenError("Invalid exp claim")
+            if now > exp:
+                raise TokenError("Token has expired")
+        nbf = claims.get("nbf")
+        if nbf is not None:
+            if not isinstance(nbf, (int, float)):
+                raise TokenError("Invalid nbf claim")
+            if now < nbf:
+                raise TokenError("Token is not yet valid")
+        return claims
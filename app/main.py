@@ -1,14 +1,29 @@
 """Main application entry point untuk Authentication Service."""
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from app.config.database import connect_db, disconnect_db
+from app.config.database import connect_db, disconnect_db, get_storage
+from app.common.deactivated_users import deactivated_users
+from app.common.tracing import TracingMiddleware, tracer
+from app.common.profiling import ProfilingMiddleware
+from app.common.middleware import (
+    CORSMiddleware,
+    ErrorHandlingMiddleware,
+    MetricsMiddleware,
+    RateLimitMiddleware
+)
+from app.common.readiness import readiness
+from app.common.audit import audit_log
+from app.common.breached_passwords import load_breached_password_index
+from app.config.security import get_password_hash, token_codec
 from app.config.env import settings
 import app.modules.auth
-from app.modules.auth.auth.router import router as auth_router  # type: ignore
+from app.modules.auth.auth.router import router as auth_router, rate_limits  # type: ignore
+from app.modules.auth.auth.username_index import username_index  # type: ignore
+from app.modules.auth.oauth.google import prefetch_google_certs
+import app.modules.admin
+from app.modules.admin.admin.router import router as admin_router  # type: ignore
+import asyncio
 import logging
 
 logging.basicConfig(
@@ -17,17 +32,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Inisialisasi rate limiter
-limiter = Limiter(key_func=get_remote_address)
+
+async def warm_up(app: FastAPI) -> None:
+    """Memanaskan jalur yang lambat di request pertama: DB, bcrypt, JWT, OpenAPI, Google certs."""
+    steps = {
+        "database": get_storage().ping,
+        # Thread pool default yang juga dipakai hashing di request path ikut dibuat di sini
+        "bcrypt": lambda: asyncio.to_thread(get_password_hash, "warm-up-password"),
+        "jwt": lambda: token_codec.decode(token_codec.encode({"sub": 0, "type": "warmup"})),
+        "openapi": app.openapi,
+    }
+    if settings.GOOGLE_CLIENT_ID:
+        steps["google_certs"] = prefetch_google_certs
+    await readiness.warm_up(steps)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Context manager untuk lifecycle aplikasi."""
     logger.info("Starting application...")
+    # Fail fast: index yang hilang/rusak menghentikan startup, bukan gagal di setiap register/reset
+    load_breached_password_index()
     await connect_db()
+    try:
+        await deactivated_users.load(get_storage())
+    except Exception as e:
+        # Scan penuh yang lambat tidak menggagalkan startup: poller mengulang load dan /ready menunggu hasilnya
+        logger.error(f"Failed to load deactivated users, retrying in background: {e}")
+    poller = asyncio.create_task(deactivated_users.run_polling(
+        get_storage,
+        settings.DEACTIVATED_USERS_POLL_SECONDS
+    ))
+    # Index username dimuat di background; sebelum selesai, cek ketersediaan langsung ke database
+    username_poller = asyncio.create_task(username_index.run_polling(
+        get_storage,
+        settings.USERNAME_INDEX_POLL_SECONDS
+    ))
+    # Warm-up berjalan di background: /health langsung hidup, /ready menunggu warm-up selesai
+    warmup = asyncio.create_task(warm_up(app))
     yield
     logger.info("Shutting down application...")
+    warmup.cancel()
+    poller.cancel()
+    username_poller.cancel()
+    tracer.shutdown()
+    audit_log.shutdown()
     await disconnect_db()
 
 
@@ -38,26 +87,30 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Setup rate limiter
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-# Set limiter untuk router (setelah app dibuat)
-# Limiter di router harus menggunakan state yang sama dengan app
-from app.modules.auth.auth.router import limiter as router_limiter
-router_limiter.state = app.state
+# Middleware pure ASGI; add_middleware menaruh yang terakhir ditambahkan di posisi terluar:
+# Tracing -> Profiling -> Metrics -> CORS -> ErrorHandling -> RateLimit -> app
+app.add_middleware(RateLimitMiddleware, limits=rate_limits, enabled=settings.RATE_LIMIT_ENABLED)
+app.add_middleware(ErrorHandlingMiddleware)
 
-# Konfigurasi CORS dari environment variable
-cors_origins = settings.CORS_ORIGINS.split(",") if settings.CORS_ORIGINS != "*" else ["*"]
+# Origin di-parse sekali; preflight di-cache browser selama CORS_MAX_AGE
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[origin.strip() for origin in cors_origins],
+    allow_origins=settings.CORS_ORIGINS.split(","),
+    allow_origin_regex=settings.CORS_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=settings.CORS_MAX_AGE
 )
 
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+
+# Tracing dipasang terakhir agar menjadi middleware terluar (root span mencakup CORS)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 app.include_router(auth_router)
+app.include_router(admin_router)
 
 
 @app.get("/")
@@ -76,6 +129,19 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: siap setelah warm-up selesai, daftar user nonaktif dimuat, dan database menjawab."""
+    result = await readiness.check(get_storage().ping)
+    # Sebelum bitmap dimuat, access token milik user nonaktif belum bisa ditolak
+    result["deactivated_users_loaded"] = deactivated_users.loaded
+    result["ready"] = result["ready"] and deactivated_users.loaded
+    return JSONResponse(
+        status_code=200 if result["ready"] else 503,
+        content={"status": "ready" if result["ready"] else "not_ready", **result}
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,32 @@
+# Admin module
+import importlib.util
+import sys
+from pathlib import Path
+
+# Register dot-named modules so they can be imported as app.modules.admin.admin.*
+_admin_dir = Path(__file__).parent
+
+# List of dot-named modules to register (order matters - dependencies first)
+_admin_modules = [
+    "router"       # Depends on auth.repository
+]
+
+# First pass: Register all modules in sys.modules (without executing)
+_modules = {}
+for module_name in _admin_modules:
+    module_file = _admin_dir / f"admin.{module_name}.py"
+    if module_file.exists():
+        spec = importlib.util.spec_from_file_location(
+            f"app.modules.admin.admin.{module_name}",
+            module_file
+        )
+        if spec and spec.loader:
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[f"app.modules.admin.admin.{module_name}"] = module
+            _modules[module_name] = (spec, module)
+
+# Second pass: Execute modules in dependency order
+for module_name in _admin_modules:
+    if module_name in _modules:
+        spec, module = _modules[module_name]
+        spec.loader.exec_module(module)
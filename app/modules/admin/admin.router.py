@@ -0,0 +1,107 @@
+"""Router untuk admin endpoints."""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from app.modules.auth.auth.storage import AuthStorage
+from app.common.dependencies import get_db, require_admin
+from app.common.singleflight import singleflight_stats
+from app.common.idempotency import idempotency_store
+from app.common.deactivated_users import deactivated_users
+from app.common.profiling import profile_store
+from app.common.circuit_breaker import breaker_stats
+from app.common.middleware import rate_limiter, request_metrics
+from app.common.audit import audit_log
+from app.modules.auth.auth.username_index import username_index
+from app.config.env import settings
+from typing import Annotated, AsyncIterator, Literal
+from datetime import datetime
+import csv
+import io
+import json
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+EXPORT_FIELDS = ["id", "email", "username", "googleId", "isActive", "createdAt"]
+
+
+def _export_row(user) -> list:
+    """Mengambil kolom export dari satu user."""
+    return [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in (getattr(user, field) for field in EXPORT_FIELDS)
+    ]
+
+
+async def _stream_ndjson(repo: AuthStorage, after_id: int) -> AsyncIterator[str]:
+    """Menghasilkan export NDJSON, satu chunk per batch query."""
+    lines = []
+    async for user in repo.iter_users(batch_size=settings.EXPORT_BATCH_SIZE, after_id=after_id):
+        lines.append(json.dumps(dict(zip(EXPORT_FIELDS, _export_row(user)))))
+        if len(lines) >= settings.EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def _stream_csv(repo: AuthStorage, after_id: int) -> AsyncIterator[str]:
+    """Menghasilkan export CSV dengan header, satu chunk per batch query."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    rows = 0
+    async for user in repo.iter_users(batch_size=settings.EXPORT_BATCH_SIZE, after_id=after_id):
+        writer.writerow(_export_row(user))
+        rows += 1
+        if rows >= settings.EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/users/export")
+async def export_users(
+    repo: Annotated[AuthStorage, Depends(get_db)],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    after_id: Annotated[int, Query(ge=0)] = 0
+):
+    """Streaming export seluruh user (NDJSON atau CSV), bisa dilanjutkan dengan after_id."""
+    if format == "csv":
+        return StreamingResponse(
+            _stream_csv(repo, after_id),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=users.csv"}
+        )
+    return StreamingResponse(_stream_ndjson(repo, after_id), media_type="application/x-ndjson")
+
+
+@router.get("/stats")
+async def stats():
+    """Statistik internal service (single-flight, idempotency, dll)."""
+    return {
+        "singleflight": singleflight_stats(),
+        "idempotency": idempotency_store.stats(),
+        "deactivated_users": deactivated_users.stats(),
+        "circuit_breakers": breaker_stats(),
+        "rate_limit": rate_limiter.stats(),
+        "requests": request_metrics.stats(),
+        "audit_log": audit_log.writer.stats(),
+        "username_index": username_index.stats()
+    }
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """Daftar profile request paling lambat yang tersimpan di memory."""
+    return [record.summary() for record in profile_store.slowest()]
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """Profile dalam format collapsed-stack (untuk speedscope/flamegraph)."""
+    record = profile_store.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return record.collapsed()
@@ -9,9 +9,11 @@ _auth_dir = Path(__file__).parent
 # List of dot-named modules to register (order matters - dependencies first)
 _auth_modules = [
     "schema",      # No dependencies on other auth.* modules
-    "repository",  # No dependencies on other auth.* modules
+    "storage",     # No dependencies on other auth.* modules
+    "repository",  # Depends on storage
+    "username_index",  # Depends on storage
     "utils",       # Depends on repository
-    "service",     # Depends on repository, utils
+    "service",     # Depends on repository, utils, username_index
     "router"       # Depends on service, schema
 ]
 
@@ -1,20 +1,68 @@
-"""Repository layer untuk data access authentication."""
-from prisma import Prisma
-from typing import Optional
-from datetime import datetime
-from prisma.models import User, PasswordResetToken
+"""Repository layer untuk data access authentication (backend Prisma/MySQL)."""
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+from datetime import datetime, timedelta, timezone
+import re
+from app.modules.auth.auth.storage import AuthStorage, DuplicateUserError
 from app.common.exceptions import UserNotFoundException
+from app.common.singleflight import get_singleflight
+from app.common.tracing import traced_class
+from app.common.circuit_breaker import guarded_class
 import logging
 
+if TYPE_CHECKING:
+    # Prisma hanya di-import untuk type hints agar backend lain tidak butuh client yang di-generate
+    from prisma import Prisma
+    from prisma.models import User, PasswordResetToken
+
 logger = logging.getLogger(__name__)
 
+# Lookup identik yang berjalan bersamaan (reconnect storm) berbagi satu query
+_lookups = get_singleflight("repository")
+
+
+def _domain_errors() -> tuple[type[BaseException], ...]:
+    """Error Prisma yang berasal dari data (bukan database down), tidak membuka breaker."""
+    try:
+        from prisma.errors import DataError
+    except ImportError:
+        return (DuplicateUserError,)
+    return (DataError, DuplicateUserError)
+
+
+def _unique_violation() -> tuple[type[BaseException], ...]:
+    """UniqueViolationError Prisma; tuple kosong (tidak menangkap apa pun) jika client belum di-generate."""
+    try:
+        from prisma.errors import UniqueViolationError
+    except ImportError:
+        return ()
+    return (UniqueViolationError,)
+
+
+_UNIQUE_VIOLATION = _unique_violation()
+# MySQL melaporkan nama index (mis. `users_google_id_key`), jadi cocokkan nama kolom di mana saja dalam pesan
+_UNIQUE_FIELD = re.compile(r"(email|username|googleId|google_id)")
+
+
+def _duplicate_user(error: BaseException) -> DuplicateUserError:
+    match = _UNIQUE_FIELD.search(str(error))
+    if match is None:
+        return DuplicateUserError()
+    return DuplicateUserError("googleId" if match.group(1) == "google_id" else match.group(1))
 
-class AuthRepository:
+
+@traced_class("repository")
+@guarded_class("database", ignored=_domain_errors())
+class AuthRepository(AuthStorage):
     """Repository class untuk mengelola data access authentication."""
     
     def __init__(self, db: Prisma):
         self.db = db
     
+    async def ping(self) -> None:
+        """Query ringan untuk readiness probe"""
+        await self.db.query_raw("SELECT 1")
+    
     async def create_user(
         self,
         email: str,
@@ -33,6 +81,8 @@ class AuthRepository:
                 }
             )
             return user
+        except _UNIQUE_VIOLATION as e:
+            raise _duplicate_user(e) from e
         except Exception as e:
             logger.error(f"Error creating user: {e}")
             raise
@@ -45,20 +95,19 @@ class AuthRepository:
         """Get user by username"""
         return await self.db.user.find_unique(where={"username": username})
     
-    async def get_user_by_identifier(self, identifier: str) -> Optional[User]:
-        """Mencari user berdasarkan email atau username."""
-        user = await self.get_user_by_email(identifier)
-        if user:
-            return user
-        return await self.get_user_by_username(identifier)
-    
     async def get_user_by_google_id(self, google_id: str) -> Optional[User]:
         """Get user by Google ID"""
-        return await self.db.user.find_unique(where={"googleId": google_id})
+        return await _lookups.do(
+            ("get_user_by_google_id", google_id),
+            lambda: self.db.user.find_unique(where={"googleId": google_id})
+        )
     
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return await self.db.user.find_unique(where={"id": user_id})
+        return await _lookups.do(
+            ("get_user_by_id", user_id),
+            lambda: self.db.user.find_unique(where={"id": user_id})
+        )
     
     async def update_user_password(self, user_id: int, password_hash: str) -> User:
         """Update user password"""
@@ -71,16 +120,23 @@ class AuthRepository:
         self,
         user_id: int,
         token: str,
-        expires_at: datetime
+        expires_at: datetime,
+        supersede_id: Optional[int] = None
     ) -> PasswordResetToken:
-        """Create password reset token"""
-        return await self.db.passwordresettoken.create(
-            data={
-                "token": token,
-                "userId": user_id,
-                "expiresAt": expires_at,
-            }
-        )
+        """Create password reset token; token supersede_id (jika ada) ditandai used dalam transaksi yang sama."""
+        data = {
+            "token": token,
+            "userId": user_id,
+            "expiresAt": expires_at,
+        }
+        if supersede_id is None:
+            return await self.db.passwordresettoken.create(data=data)
+        async with self.db.tx() as tx:
+            await tx.passwordresettoken.update_many(
+                where={"id": supersede_id, "used": False},
+                data={"used": True}
+            )
+            return await tx.passwordresettoken.create(data=data)
     
     async def get_reset_token(self, token: str) -> Optional[PasswordResetToken]:
         """Get password reset token"""
@@ -93,20 +149,84 @@ class AuthRepository:
             data={"used": True}
         )
     
-    async def user_exists_by_email(self, email: str) -> bool:
-        """Check if user exists by email"""
-        user = await self.get_user_by_email(email)
-        return user is not None
+    async def get_active_reset_token(self, user_id: int, now: datetime) -> Optional[PasswordResetToken]:
+        """Reset token user yang belum dipakai dan belum expired (expiresAt paling akhir)."""
+        return await self.db.passwordresettoken.find_first(
+            where={"userId": user_id, "used": False, "expiresAt": {"gt": now}},
+            order={"expiresAt": "desc"}
+        )
+    
+    async def extend_reset_token(self, token_id: int, expires_at: datetime, sent_at: datetime) -> bool:
+        """Memperpanjang token yang belum dipakai dan mencatat waktu kirim ulang; False jika token sudah dipakai."""
+        # update_many agar kondisi used=False ikut di WHERE (compare-and-set)
+        count = await self.db.passwordresettoken.update_many(
+            where={"id": token_id, "used": False},
+            data={"expiresAt": expires_at, "lastSentAt": sent_at}
+        )
+        return count > 0
     
-    async def user_exists_by_username(self, username: str) -> bool:
-        """Check if user exists by username"""
-        user = await self.get_user_by_username(username)
-        return user is not None
+    async def consume_user_nonce(self, user_id: int, updated_at: datetime) -> bool:
+        """Memajukan updatedAt hanya jika masih sama dengan updated_at (compare-and-set); False jika sudah berubah."""
+        count = await self.db.user.update_many(
+            where={"id": user_id, "updatedAt": updated_at},
+            # MySQL DATETIME(3): nilai baru minimal 1 ms setelah nilai lama agar pasti berbeda
+            data={"updatedAt": max(datetime.now(timezone.utc), updated_at + timedelta(milliseconds=1))}
+        )
+        return count > 0
     
     async def update_user_google_id(self, user_id: int, google_id: str) -> User:
         """Update user Google ID"""
-        return await self.db.user.update(
-            where={"id": user_id},
-            data={"googleId": google_id}
+        try:
+            return await self.db.user.update(
+                where={"id": user_id},
+                data={"googleId": google_id}
+            )
+        except _UNIQUE_VIOLATION as e:
+            raise _duplicate_user(e) from e
+    
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """Mengembalikan subset email yang sudah terdaftar (satu query untuk banyak email)."""
+        if not emails:
+            return set()
+        users = await self.db.user.find_many(where={"email": {"in": emails}})
+        return {user.email for user in users}
+    
+    async def get_existing_usernames(self, usernames: list[str]) -> set[str]:
+        """Mengembalikan subset username yang sudah terdaftar (satu query untuk banyak username)."""
+        if not usernames:
+            return set()
+        users = await self.db.user.find_many(where={"username": {"in": usernames}})
+        return {user.username for user in users}
+    
+    async def create_users_bulk(self, users: list[dict]) -> int:
+        """Insert banyak user sekaligus, mengembalikan jumlah baris yang benar-benar masuk."""
+        if not users:
+            return 0
+        return await self.db.user.create_many(data=users, skip_duplicates=True)
+    
+    async def iter_users(self, batch_size: int = 1000, after_id: int = 0) -> AsyncIterator[User]:
+        """Iterasi seluruh tabel users dengan keyset pagination (memory tetap flat)."""
+        last_id = after_id
+        while True:
+            users = await self.db.user.find_many(
+                where={"id": {"gt": last_id}},
+                order={"id": "asc"},
+                take=batch_size
+            )
+            for user in users:
+                yield user
+            if len(users) < batch_size:
+                return
+            last_id = users[-1].id
+    
+    async def get_inactive_user_ids(self) -> list[int]:
+        """Mengambil ID semua user yang tidak aktif."""
+        users = await self.db.user.find_many(where={"isActive": False})
+        return [user.id for user in users]
+    
+    async def get_users_updated_since(self, since: datetime) -> list[User]:
+        """Mengambil user yang berubah sejak waktu tertentu (untuk polling inkremental)."""
+        return await self.db.user.find_many(
+            where={"updatedAt": {"gte": since}},
+            order={"updatedAt": "asc"}
         )
-
@@ -1,48 +1,64 @@
 """Router untuk authentication endpoints."""
-from fastapi import APIRouter, Depends, Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Query, Request
 from app.modules.auth.auth.schema import (
     RegisterRequest,
     LoginRequest,
     GoogleLoginRequest,
     ResetPasswordRequest,
     ResetPasswordConfirm,
-    RefreshTokenRequest
+    RefreshTokenRequest,
+    MagicLinkRequest,
+    MagicLinkConsume,
+    UsernameAvailabilityResponse
 )
 from app.modules.auth.auth.service import AuthService
-from app.modules.auth.auth.repository import AuthRepository
+from app.modules.auth.auth.storage import AuthStorage
 from app.common.response import BaseResponse, TokenResponse, MessageResponse
 from app.common.dependencies import get_db
-from prisma import Prisma
-from typing import Annotated
+from app.common.idempotency import idempotency_store, request_fingerprint
+from typing import Annotated, Optional
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-# Limiter instance - akan di-set state-nya dari app.state di main.py
-# State akan di-set setelah app dibuat untuk menghindari circular import
-limiter = Limiter(key_func=get_remote_address)
+# Rate limit per IP, diterapkan oleh RateLimitMiddleware di main.py
+rate_limits = {
+    f"{router.prefix}/register": "5/minute",
+    f"{router.prefix}/login": "5/minute",
+    f"{router.prefix}/reset/request": "3/minute",
+    f"{router.prefix}/magic/request": "3/minute",
+    f"{router.prefix}/magic/consume": "10/minute",
+    # Dipanggil saat user mengetik, jadi limit lebih longgar
+    f"{router.prefix}/username-available": "60/minute",
+}
 
+IdempotencyKey = Annotated[Optional[str], Header(alias="Idempotency-Key", max_length=255)]
 
-def get_auth_service(db: Annotated[Prisma, Depends(get_db)]) -> AuthService:
+
+def get_auth_service(repo: Annotated[AuthStorage, Depends(get_db)], req: Request) -> AuthService:
     """Dependency injection untuk mendapatkan AuthService instance."""
-    repo = AuthRepository(db)
-    return AuthService(repo)
+    return AuthService(repo, req.client.host if req.client else None)
 
 
-@limiter.limit("5/minute")
 @router.post("/register", response_model=BaseResponse[dict])
 async def register(
     request: RegisterRequest,
     service: Annotated[AuthService, Depends(get_auth_service)],
-    req: Request
+    idempotency_key: IdempotencyKey = None
 ):
     """Register a new user."""
-    result = await service.register(
-        email=request.email,
-        username=request.username,
-        password=request.password
-    )
+    async def do_register() -> dict:
+        return await service.register(
+            email=request.email,
+            username=request.username,
+            password=request.password
+        )
+    
+    if idempotency_key:
+        result = await idempotency_store.run(
+            "register", idempotency_key, request_fingerprint(request), do_register
+        )
+    else:
+        result = await do_register()
     return BaseResponse(
         success=True,
         message="User registered successfully",
@@ -50,12 +66,24 @@ async def register(
     )
 
 
-@limiter.limit("5/minute")
+@router.get("/username-available", response_model=BaseResponse[UsernameAvailabilityResponse])
+async def username_available(
+    service: Annotated[AuthService, Depends(get_auth_service)],
+    username: str = Query(..., min_length=3, max_length=50, pattern=r"^\w+$")
+):
+    """Check whether a username is still available (with suggestions if taken)."""
+    result = await service.check_username_available(username)
+    return BaseResponse(
+        success=True,
+        message="Username is available" if result["available"] else "Username is already taken",
+        data=UsernameAvailabilityResponse(**result)
+    )
+
+
 @router.post("/login", response_model=BaseResponse[TokenResponse])
 async def login(
     request: LoginRequest,
-    service: Annotated[AuthService, Depends(get_auth_service)],
-    req: Request
+    service: Annotated[AuthService, Depends(get_auth_service)]
 ):
     """Login with email/username and password."""
     token_response = await service.login(
@@ -83,15 +111,51 @@ async def login_with_google(
     )
 
 
-@limiter.limit("3/minute")
+@router.post("/magic/request", response_model=BaseResponse[MessageResponse])
+async def request_magic_link(
+    request: MagicLinkRequest,
+    background_tasks: BackgroundTasks,
+    service: Annotated[AuthService, Depends(get_auth_service)]
+):
+    """Request a passwordless login link by email."""
+    result = await service.request_magic_link(request.email, background_tasks)
+    return BaseResponse(
+        success=True,
+        message=result["message"],
+        data=MessageResponse(message=result["message"])
+    )
+
+
+@router.post("/magic/consume", response_model=BaseResponse[TokenResponse])
+async def consume_magic_link(
+    request: MagicLinkConsume,
+    service: Annotated[AuthService, Depends(get_auth_service)]
+):
+    """Login with a magic link token."""
+    token_response = await service.login_with_magic_link(request.token)
+    return BaseResponse(
+        success=True,
+        message="Login successful",
+        data=token_response
+    )
+
+
 @router.post("/reset/request", response_model=BaseResponse[MessageResponse])
 async def request_password_reset(
     request: ResetPasswordRequest,
     service: Annotated[AuthService, Depends(get_auth_service)],
-    req: Request
+    idempotency_key: IdempotencyKey = None
 ):
     """Request password reset."""
-    result = await service.request_password_reset(request.email)
+    async def do_request_reset() -> dict:
+        return await service.request_password_reset(request.email)
+    
+    if idempotency_key:
+        result = await idempotency_store.run(
+            "reset_request", idempotency_key, request_fingerprint(request), do_request_reset
+        )
+    else:
+        result = await do_request_reset()
     return BaseResponse(
         success=True,
         message=result["message"],
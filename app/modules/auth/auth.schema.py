@@ -1,5 +1,13 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional
+from app.common.breached_passwords import is_breached_password
+
+
+def validate_not_breached(v: str) -> str:
+    """Menolak password yang ada di corpus password bocor (BREACHED_PASSWORDS_PATH)."""
+    if is_breached_password(v):
+        raise ValueError('This password has appeared in a data breach, please choose a different password')
+    return v
 
 
 class RegisterRequest(BaseModel):
@@ -15,6 +23,11 @@ class RegisterRequest(BaseModel):
         if not all(c.isalnum() or c == '_' for c in v):
             raise ValueError('Username must contain only letters, numbers, and underscores')
         return v
+    
+    @field_validator('password')
+    @classmethod
+    def validate_password(cls, v: str) -> str:
+        return validate_not_breached(v)
 
 
 class LoginRequest(BaseModel):
@@ -37,9 +50,30 @@ class ResetPasswordConfirm(BaseModel):
     """Confirm password reset"""
     token: str
     new_password: str = Field(..., min_length=8, max_length=100)
+    
+    @field_validator('new_password')
+    @classmethod
+    def validate_new_password(cls, v: str) -> str:
+        return validate_not_breached(v)
+
+
+class MagicLinkRequest(BaseModel):
+    """Request magic link login"""
+    email: EmailStr
+
+
+class MagicLinkConsume(BaseModel):
+    """Consume magic link token"""
+    token: str = Field(..., max_length=255)
 
 
 class RefreshTokenRequest(BaseModel):
     """Refresh token request"""
     refresh_token: str
 
+
+class UsernameAvailabilityResponse(BaseModel):
+    """Hasil cek ketersediaan username"""
+    username: str
+    available: bool
+    suggestions: list[str] = []
@@ -1,39 +1,50 @@
 """Service layer untuk business logic authentication."""
+import asyncio
 from typing import Optional
+from fastapi import BackgroundTasks
 from datetime import datetime, timedelta, timezone
 from app.config.security import (
     verify_password,
     create_access_token,
     create_refresh_token,
-    verify_token
+    verify_token,
+    create_magic_link_token,
+    parse_magic_link_token,
+    verify_magic_link_signature
 )
 from app.config.env import settings
-from app.modules.auth.auth.repository import AuthRepository
+from app.modules.auth.auth.storage import AuthStorage, DuplicateUserError
+from app.modules.auth.auth.username_index import username_index
 from app.modules.auth.oauth.google import verify_google_token, extract_google_user_data
 from app.modules.auth.auth.utils import (
     validate_user_not_exists,
     hash_password,
     create_reset_token_data,
-    send_reset_email
+    send_reset_email,
+    send_magic_link_email
 )
 from app.common.exceptions import (
     InvalidCredentialsException,
     InactiveUserException,
     InvalidTokenException,
     UserNotFoundException,
+    UserAlreadyExistsException,
     GoogleOAuthException
 )
 from app.common.response import TokenResponse
-import logging
+from app.common.tracing import traced_class
+from app.common.audit import audit_log
 
-logger = logging.getLogger(__name__)
+USERNAME_MAX_LENGTH = 50
 
 
+@traced_class("service")
 class AuthService:
     """Service class untuk mengelola business logic authentication."""
     
-    def __init__(self, repo: AuthRepository):
+    def __init__(self, repo: AuthStorage, client_ip: Optional[str] = None):
         self.repo = repo
+        self.client_ip = client_ip
     
     async def register(
         self,
@@ -42,31 +53,61 @@ class AuthService:
         password: str
     ) -> dict:
         """Mendaftarkan user baru ke sistem."""
-        await validate_user_not_exists(self.repo, email, username)
-        password_hash = hash_password(password)
-        user = await self.repo.create_user(
-            email=email,
-            username=username,
-            password_hash=password_hash
-        )
-        logger.info(f"User registered: {user.email}")
+        with audit_log.record("register", self.client_ip) as audit:
+            await validate_user_not_exists(self.repo, email, username)
+            # bcrypt di thread pool agar request lain tidak tertahan di event loop
+            password_hash = await asyncio.to_thread(hash_password, password)
+            try:
+                user = await self.repo.create_user(
+                    email=email,
+                    username=username,
+                    password_hash=password_hash
+                )
+            except DuplicateUserError as e:
+                # Register bersamaan lolos validate_user_not_exists; index unik database yang memutuskan
+                raise UserAlreadyExistsException(e.field or "email") from e
+            audit.user_id = user.id
+        username_index.add(user.username)
         return {
             "message": "User registered successfully",
             "user_id": user.id
         }
     
+    async def check_username_available(self, username: str, max_suggestions: int = 3) -> dict:
+        """Cek ketersediaan username dari index; database hanya ditanya jika index menyatakan mungkin dipakai."""
+        if not username_index.might_exist(username) or not await self.repo.user_exists_by_username(username):
+            return {"username": username, "available": True, "suggestions": []}
+        return {
+            "username": username,
+            "available": False,
+            "suggestions": await self._suggest_usernames(username, max_suggestions)
+        }
+    
+    async def _suggest_usernames(self, username: str, limit: int) -> list[str]:
+        """Varian dengan suffix angka yang belum dipakai menurut index, diverifikasi dengan satu query."""
+        base = username[:USERNAME_MAX_LENGTH - 4]
+        candidates = [
+            candidate
+            for i in range(1, 100)
+            for candidate in (f"{base}{i}", f"{base}_{i}")
+            if not username_index.might_exist(candidate)
+        ][:limit * 2]
+        taken = {name.lower() for name in await self.repo.get_existing_usernames(candidates)}
+        return [candidate for candidate in candidates if candidate.lower() not in taken][:limit]
+    
     async def login(self, identifier: str, password: str) -> TokenResponse:
         """Login user dengan email/username dan password."""
-        user = await self.repo.get_user_by_identifier(identifier)
-        if not user or not user.passwordHash:
-            raise InvalidCredentialsException()
-        if not user.isActive:
-            raise InactiveUserException()
-        if not verify_password(password, user.passwordHash):
-            raise InvalidCredentialsException()
-        access_token = create_access_token(data={"sub": user.id})
-        refresh_token = create_refresh_token(data={"sub": user.id})
-        logger.info(f"User logged in: {user.email}")
+        with audit_log.record("login", self.client_ip) as audit:
+            user = await self.repo.get_user_by_identifier(identifier)
+            if not user or not user.passwordHash:
+                raise InvalidCredentialsException()
+            audit.user_id = user.id
+            if not user.isActive:
+                raise InactiveUserException()
+            if not await asyncio.to_thread(verify_password, password, user.passwordHash):
+                raise InvalidCredentialsException()
+            access_token = create_access_token(data={"sub": user.id})
+            refresh_token = create_refresh_token(data={"sub": user.id})
         return TokenResponse(
             access_token=access_token,
             refresh_token=refresh_token
@@ -74,32 +115,38 @@ class AuthService:
     
     async def login_with_google(self, id_token: str) -> TokenResponse:
         """Login atau register user dengan Google OAuth."""
-        user_info = await verify_google_token(id_token)
-        google_id, email, username = extract_google_user_data(user_info)
-        user = await self.repo.get_user_by_google_id(google_id)
-        if user:
-            if not user.isActive:
-                raise InactiveUserException()
-        else:
-            existing_user = await self.repo.get_user_by_email(email)
-            if existing_user:
-                user = await self.repo.update_user_google_id(existing_user.id, google_id)
-                logger.info(f"Google account linked to existing user: {user.email}")
+        with audit_log.record("google_login", self.client_ip) as audit:
+            user_info = await verify_google_token(id_token)
+            google_id, email, username = extract_google_user_data(user_info)
+            user = await self.repo.get_user_by_google_id(google_id)
+            if user:
+                audit.user_id = user.id
+                if not user.isActive:
+                    raise InactiveUserException()
             else:
-                base_username = username
-                counter = 1
-                while await self.repo.user_exists_by_username(username):
-                    username = f"{base_username}_{counter}"
-                    counter += 1
-                user = await self.repo.create_user(
-                    email=email,
-                    username=username,
-                    google_id=google_id
-                )
-                logger.info(f"User auto-registered via Google: {user.email}")
-        access_token = create_access_token(data={"sub": user.id})
-        refresh_token = create_refresh_token(data={"sub": user.id})
-        logger.info(f"User logged in via Google: {user.email}")
+                existing_user = await self.repo.get_user_by_email(email)
+                if existing_user:
+                    user = await self.repo.update_user_google_id(existing_user.id, google_id)
+                    audit.detail = "linked"
+                else:
+                    base_username = username
+                    counter = 1
+                    while await self.repo.user_exists_by_username(username):
+                        username = f"{base_username}_{counter}"
+                        counter += 1
+                    try:
+                        user = await self.repo.create_user(
+                            email=email,
+                            username=username,
+                            google_id=google_id
+                        )
+                    except DuplicateUserError as e:
+                        raise UserAlreadyExistsException(e.field or "email") from e
+                    username_index.add(user.username)
+                    audit.detail = "registered"
+                audit.user_id = user.id
+            access_token = create_access_token(data={"sub": user.id})
+            refresh_token = create_refresh_token(data={"sub": user.id})
         return TokenResponse(
             access_token=access_token,
             refresh_token=refresh_token
@@ -107,40 +154,101 @@ class AuthService:
     
     async def request_password_reset(self, email: str) -> dict:
         """Memproses request reset password (mencegah user enumeration)."""
-        user = await self.repo.get_user_by_email(email)
-        if not user:
-            return {"message": "If the email exists, a reset link has been sent"}
-        token, expires_at = await create_reset_token_data(user.id)
-        await self.repo.create_reset_token(
-            user_id=user.id,
-            token=token,
-            expires_at=expires_at
-        )
-        await send_reset_email(email, token)
-        logger.info(f"Password reset requested for: {email}")
+        with audit_log.record("password_reset_request", self.client_ip) as audit:
+            user = await self.repo.get_user_by_email(email)
+            if not user:
+                audit.detail = "unknown_email"
+                return {"message": "If the email exists, a reset link has been sent"}
+            audit.user_id = user.id
+            token, expires_at = await create_reset_token_data(user.id)
+            now = datetime.now(timezone.utc)
+            active = await self.repo.get_active_reset_token(user.id, now)
+            if active is None:
+                await self.repo.create_reset_token(user_id=user.id, token=token, expires_at=expires_at)
+                audit.detail = "issued"
+            elif now - active.lastSentAt < timedelta(minutes=settings.RESET_TOKEN_REUSE_WINDOW_MINUTES):
+                # Link yang sama baru saja dikirim: tidak ada write maupun email
+                audit.detail = "suppressed"
+                return {"message": "If the email exists, a reset link has been sent"}
+            elif (
+                expires_at <= active.createdAt + timedelta(minutes=settings.RESET_TOKEN_MAX_LIFETIME_MINUTES)
+                and await self.repo.extend_reset_token(active.id, expires_at, now)
+            ):
+                token = active.token
+                audit.detail = "resent"
+            else:
+                # Batas umur token tercapai (atau token baru saja dipakai): ganti dengan token baru
+                await self.repo.create_reset_token(
+                    user_id=user.id,
+                    token=token,
+                    expires_at=expires_at,
+                    supersede_id=active.id
+                )
+                audit.detail = "rotated"
+            await send_reset_email(email, token)
         return {"message": "If the email exists, a reset link has been sent"}
     
+    async def request_magic_link(self, email: str, background_tasks: BackgroundTasks) -> dict:
+        """Mengirim link login tanpa password (stateless: tidak ada bcrypt maupun write ke database).
+
+        Email dikirim setelah response (background task) agar waktu respons email terdaftar dan
+        tidak terdaftar sama; SMTP round-trip tidak bisa dipakai untuk enumerasi user.
+        """
+        with audit_log.record("magic_link_request", self.client_ip) as audit:
+            user = await self.repo.get_user_by_email(email)
+            if not user or not user.isActive:
+                audit.detail = "unknown_email" if not user else "inactive"
+                return {"message": "If the email exists, a login link has been sent"}
+            audit.user_id = user.id
+            token = create_magic_link_token(user.id, user.updatedAt)
+            background_tasks.add_task(send_magic_link_email, email, token)
+        return {"message": "If the email exists, a login link has been sent"}
+    
+    async def login_with_magic_link(self, token: str) -> TokenResponse:
+        """Login dengan token magic link; sekali pakai karena updatedAt dimajukan saat dipakai."""
+        with audit_log.record("magic_link_login", self.client_ip) as audit:
+            parsed = parse_magic_link_token(token)
+            if parsed is None:
+                raise InvalidTokenException("Invalid or expired login link")
+            user_id, expires_at, signature = parsed
+            user = await self.repo.get_user_by_id(user_id)
+            if not user or not verify_magic_link_signature(user_id, expires_at, signature, user.updatedAt):
+                raise InvalidTokenException("Invalid or expired login link")
+            audit.user_id = user.id
+            if not user.isActive:
+                raise InactiveUserException()
+            # Compare-and-set: dari request bersamaan dengan link yang sama hanya satu yang menang
+            if not await self.repo.consume_user_nonce(user.id, user.updatedAt):
+                raise InvalidTokenException("Login link has already been used")
+            access_token = create_access_token(data={"sub": user.id})
+            refresh_token = create_refresh_token(data={"sub": user.id})
+        return TokenResponse(
+            access_token=access_token,
+            refresh_token=refresh_token
+        )
+    
     async def confirm_password_reset(
         self,
         token: str,
         new_password: str
     ) -> dict:
         """Mengkonfirmasi dan menyelesaikan proses reset password."""
-        reset_token = await self.repo.get_reset_token(token)
-        if not reset_token:
-            raise InvalidTokenException("Invalid reset token")
-        if reset_token.used:
-            raise InvalidTokenException("Reset token has already been used")
-        current_time = datetime.now(timezone.utc)
-        if current_time > reset_token.expiresAt:
-            raise InvalidTokenException("Reset token has expired")
-        user = await self.repo.get_user_by_id(reset_token.userId)
-        if not user:
-            raise UserNotFoundException()
-        password_hash = hash_password(new_password)
-        await self.repo.update_user_password(user.id, password_hash)
-        await self.repo.mark_token_as_used(reset_token.id)
-        logger.info(f"Password reset confirmed for: {user.email}")
+        with audit_log.record("password_reset", self.client_ip) as audit:
+            reset_token = await self.repo.get_reset_token(token)
+            if not reset_token:
+                raise InvalidTokenException("Invalid reset token")
+            audit.user_id = reset_token.userId
+            if reset_token.used:
+                raise InvalidTokenException("Reset token has already been used")
+            current_time = datetime.now(timezone.utc)
+            if current_time > reset_token.expiresAt:
+                raise InvalidTokenException("Reset token has expired")
+            user = await self.repo.get_user_by_id(reset_token.userId)
+            if not user:
+                raise UserNotFoundException()
+            password_hash = await asyncio.to_thread(hash_password, new_password)
+            await self.repo.update_user_password(user.id, password_hash)
+            await self.repo.mark_token_as_used(reset_token.id)
         return {"message": "Password reset successfully"}
     
     async def refresh_access_token(self, refresh_token: str) -> TokenResponse:
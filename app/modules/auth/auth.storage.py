@@ -0,0 +1,157 @@
+"""Interface storage untuk data access authentication (diimplementasikan oleh setiap backend)."""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+
+class DuplicateUserError(Exception):
+    """User dengan email/username/googleId yang sama sudah ada (dipetakan dari error unik tiap backend)."""
+
+    def __init__(self, field: Optional[str] = None):
+        super().__init__(f"Unique constraint failed on the {field or 'unknown'} field")
+        self.field = field
+
+
+@dataclass(frozen=True)
+class UserRecord:
+    """Representasi user untuk backend non-Prisma (field sama dengan prisma.models.User)."""
+    id: int
+    email: str
+    username: str
+    passwordHash: Optional[str]
+    googleId: Optional[str]
+    isActive: bool
+    createdAt: datetime
+    updatedAt: datetime
+
+
+@dataclass(frozen=True)
+class ResetTokenRecord:
+    """Representasi reset token untuk backend non-Prisma (field sama dengan prisma.models.PasswordResetToken)."""
+    id: int
+    token: str
+    userId: int
+    expiresAt: datetime
+    used: bool
+    createdAt: datetime
+    lastSentAt: datetime
+
+
+class AuthStorage(ABC):
+    """Kontrak data access authentication, dipilih berdasarkan DATABASE_URL."""
+
+    async def connect(self) -> None:
+        """Membuka resource backend (dipanggil saat startup)."""
+
+    async def disconnect(self) -> None:
+        """Menutup resource backend (dipanggil saat shutdown)."""
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """Query ringan untuk memastikan backend menjawab (readiness probe)."""
+
+    @abstractmethod
+    async def create_user(
+        self,
+        email: str,
+        username: str,
+        password_hash: Optional[str] = None,
+        google_id: Optional[str] = None
+    ) -> UserRecord:
+        """Create a new user; DuplicateUserError jika email/username/googleId sudah dipakai."""
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> Optional[UserRecord]:
+        """Get user by email"""
+
+    @abstractmethod
+    async def get_user_by_username(self, username: str) -> Optional[UserRecord]:
+        """Get user by username"""
+
+    @abstractmethod
+    async def get_user_by_google_id(self, google_id: str) -> Optional[UserRecord]:
+        """Get user by Google ID"""
+
+    @abstractmethod
+    async def get_user_by_id(self, user_id: int) -> Optional[UserRecord]:
+        """Get user by ID"""
+
+    @abstractmethod
+    async def update_user_password(self, user_id: int, password_hash: str) -> UserRecord:
+        """Update user password"""
+
+    @abstractmethod
+    async def update_user_google_id(self, user_id: int, google_id: str) -> UserRecord:
+        """Update user Google ID; DuplicateUserError jika googleId sudah dipakai user lain."""
+
+    @abstractmethod
+    async def create_reset_token(
+        self,
+        user_id: int,
+        token: str,
+        expires_at: datetime,
+        supersede_id: Optional[int] = None
+    ) -> ResetTokenRecord:
+        """Create password reset token; token supersede_id (jika ada) ditandai used dalam transaksi yang sama."""
+
+    @abstractmethod
+    async def get_reset_token(self, token: str) -> Optional[ResetTokenRecord]:
+        """Get password reset token"""
+
+    @abstractmethod
+    async def mark_token_as_used(self, token_id: int) -> ResetTokenRecord:
+        """Mark reset token as used"""
+
+    @abstractmethod
+    async def get_active_reset_token(self, user_id: int, now: datetime) -> Optional[ResetTokenRecord]:
+        """Reset token user yang belum dipakai dan belum expired (expiresAt paling akhir)."""
+
+    @abstractmethod
+    async def extend_reset_token(self, token_id: int, expires_at: datetime, sent_at: datetime) -> bool:
+        """Memperpanjang token yang belum dipakai dan mencatat waktu kirim ulang; False jika token sudah dipakai."""
+
+    @abstractmethod
+    async def consume_user_nonce(self, user_id: int, updated_at: datetime) -> bool:
+        """Memajukan updatedAt hanya jika masih sama dengan updated_at (compare-and-set); False jika sudah berubah."""
+
+    @abstractmethod
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """Mengembalikan subset email yang sudah terdaftar."""
+
+    @abstractmethod
+    async def get_existing_usernames(self, usernames: list[str]) -> set[str]:
+        """Mengembalikan subset username yang sudah terdaftar."""
+
+    @abstractmethod
+    async def create_users_bulk(self, users: list[dict]) -> int:
+        """Insert banyak user sekaligus, mengembalikan jumlah baris yang benar-benar masuk."""
+
+    @abstractmethod
+    def iter_users(self, batch_size: int = 1000, after_id: int = 0) -> AsyncIterator[UserRecord]:
+        """Iterasi seluruh user dengan keyset pagination."""
+
+    @abstractmethod
+    async def get_inactive_user_ids(self) -> list[int]:
+        """Mengambil ID semua user yang tidak aktif."""
+
+    @abstractmethod
+    async def get_users_updated_since(self, since: datetime) -> list[UserRecord]:
+        """Mengambil user yang berubah sejak waktu tertentu."""
+
+    async def get_user_by_identifier(self, identifier: str) -> Optional[UserRecord]:
+        """Mencari user berdasarkan email atau username."""
+        user = await self.get_user_by_email(identifier)
+        if user:
+            return user
+        return await self.get_user_by_username(identifier)
+
+    async def user_exists_by_email(self, email: str) -> bool:
+        """Check if user exists by email"""
+        user = await self.get_user_by_email(email)
+        return user is not None
+
+    async def user_exists_by_username(self, username: str) -> bool:
+        """Check if user exists by username"""
+        user = await self.get_user_by_username(username)
+        return user is not None
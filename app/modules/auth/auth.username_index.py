@@ -0,0 +1,134 @@
+"""Index in-memory username yang sudah dipakai untuk cek ketersediaan tanpa query per ketikan."""
+import asyncio
+import hashlib
+import math
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+from app.modules.auth.auth.storage import AuthStorage
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sama dengan polling deactivated users: menutup selisih jam antara app dan database
+POLL_OVERLAP = timedelta(seconds=60)
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+MIN_CAPACITY = 1024
+
+
+def _key(username: str) -> str:
+    # Unique index MySQL case-insensitive, jadi "Alice" dan "alice" dianggap sama
+    return username.lower()
+
+
+class BloomFilter:
+    """Bloom filter bytearray dengan double hashing dari satu digest blake2b."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = BLOOM_FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        num_bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self.num_bits = (num_bits + 7) // 8 * 8
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray(self.num_bits // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class UsernameIndex:
+    """Sorted array username (lowercase) dengan Bloom filter di depannya untuk negatif cepat."""
+
+    def __init__(self):
+        self._sorted: list[str] = []
+        self._bloom = BloomFilter(MIN_CAPACITY)
+        self.watermark: Optional[datetime] = None
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def _contains_key(self, key: str) -> bool:
+        index = bisect_left(self._sorted, key)
+        return index < len(self._sorted) and self._sorted[index] == key
+
+    def add(self, username: str) -> None:
+        """Change hook: dipanggil setelah user dibuat."""
+        key = _key(username)
+        if self._contains_key(key):
+            return
+        insort(self._sorted, key)
+        if len(self._sorted) > self._bloom.capacity:
+            self._rebuild_bloom()
+        else:
+            self._bloom.add(key)
+
+    def _rebuild_bloom(self) -> None:
+        # Kapasitas 2x agar insert berikutnya tidak langsung memicu rebuild lagi
+        bloom = BloomFilter(max(MIN_CAPACITY, len(self._sorted) * 2))
+        for key in self._sorted:
+            bloom.add(key)
+        self._bloom = bloom
+
+    def might_exist(self, username: str) -> bool:
+        """False berarti pasti belum dipakai (menurut index); True perlu diverifikasi ke database."""
+        if not self.loaded:
+            return True
+        key = _key(username)
+        return self._bloom.might_contain(key) and self._contains_key(key)
+
+    async def load(self, repo: AuthStorage, batch_size: int = 1000) -> None:
+        """Memuat semua username lewat keyset pagination (dipanggil saat startup)."""
+        started_at = datetime.now(timezone.utc)
+        keys = {_key(user.username) async for user in repo.iter_users(batch_size=batch_size)}
+        # Index baru dipasang sekaligus; add() dari request yang berjalan selama load ikut digabung
+        self._sorted = sorted(keys.union(self._sorted))
+        self._rebuild_bloom()
+        self.watermark = started_at
+        self.loaded = True
+        logger.info(f"Loaded {len(self._sorted)} usernames into index")
+
+    async def refresh(self, repo: AuthStorage) -> int:
+        """Menambahkan username user yang dibuat proses lain (worker lain, import CLI) sejak polling terakhir."""
+        if not self.loaded:
+            await self.load(repo)
+            return len(self._sorted)
+        users = await repo.get_users_updated_since(self.watermark - POLL_OVERLAP)
+        for user in users:
+            self.add(user.username)
+            if user.updatedAt > self.watermark:
+                self.watermark = user.updatedAt
+        return len(users)
+
+    async def run_polling(self, repo_factory: Callable[[], Any], interval: float) -> None:
+        """Load awal lalu refresh setiap interval detik (task background)."""
+        while True:
+            try:
+                await self.refresh(repo_factory())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to refresh username index: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict[str, Any]:
+        """Statistik untuk monitoring."""
+        return {
+            "loaded": self.loaded,
+            "count": len(self._sorted),
+            "bloom_bytes": self._bloom.num_bits // 8,
+            "bloom_hashes": self._bloom.num_hashes,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+        }
+
+
+username_index = UsernameIndex()
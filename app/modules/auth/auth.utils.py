@@ -3,15 +3,15 @@ from typing import Optional
 from datetime import datetime, timedelta, timezone
 from app.config.env import settings
 from app.config.security import generate_reset_token, get_password_hash
-from app.config.email import send_email, create_reset_password_email
-from app.modules.auth.auth.repository import AuthRepository
+from app.config.email import send_email, create_reset_password_email, create_magic_link_email
+from app.modules.auth.auth.storage import AuthStorage
 from app.common.exceptions import UserAlreadyExistsException
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-async def validate_user_not_exists(repo: AuthRepository, email: str, username: str) -> None:
+async def validate_user_not_exists(repo: AuthStorage, email: str, username: str) -> None:
     """Memvalidasi bahwa email dan username belum terdaftar di sistem."""
     email_exists = await repo.user_exists_by_email(email)
     if email_exists:
@@ -52,3 +52,21 @@ async def send_reset_email(email: str, token: str) -> None:
         logger.error(f"Failed to send password reset email to {email}")
         logger.info(f"Reset link for {email}: {reset_link}")  # Fallback untuk development
 
+
+
+async def send_magic_link_email(email: str, token: str) -> None:
+    """Mengirim email login magic link ke user."""
+    login_link = f"{settings.FRONTEND_URL}/magic-login?token={token}"
+    
+    subject, html_content = create_magic_link_email(login_link)
+    success = await send_email(
+        to_email=email,
+        subject=subject,
+        html_content=html_content
+    )
+    
+    if success:
+        logger.info(f"Magic link email sent to {email}")
+    else:
+        # Link tidak di-log: siapa pun yang membaca log bisa login sebagai user ini
+        logger.error(f"Failed to send magic link email to {email}")
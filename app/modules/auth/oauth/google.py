@@ -1,21 +1,85 @@
-from typing import Optional
+from typing import Any, Optional
 from google.auth.transport import requests
+import requests as http
 from google.oauth2 import id_token
 from app.config.env import settings
 from app.common.exceptions import GoogleOAuthException
+from app.common.singleflight import get_singleflight
+from app.common.tracing import traced, current_traceparent
+import asyncio
 import logging
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+# Login Google bersamaan dengan token yang sama cukup diverifikasi sekali
+_verifications = get_singleflight("google_verify")
 
+# URL default id_token.verify_oauth2_token, jadi response-nya bisa di-cache transport di bawah
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def _max_age(cache_control: Optional[str]) -> int:
+    """Nilai max-age dari header Cache-Control (0 jika tidak ada)."""
+    match = _MAX_AGE.search(cache_control or "")
+    return int(match.group(1)) if match else 0
+
+
+class _TracedTransport(requests.Request):
+    """Transport google-auth yang meneruskan traceparent span aktif dan meng-cache certs Google.
+
+    google-auth mengambil certs di setiap verify_oauth2_token; response certs disimpan selama
+    max-age dari Cache-Control, jadi verifikasi hanya ke network saat certs kedaluwarsa.
+    """
+
+    def __init__(self, session: http.Session):
+        super().__init__(session=session)
+        self._certs: Optional[tuple[Any, float]] = None
+
+    def __call__(self, url, method="GET", body=None, headers=None, **kwargs):
+        if method == "GET" and url == GOOGLE_CERTS_URL:
+            cached = self._certs
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+        # asyncio.to_thread menyalin context, jadi span request tetap terlihat di thread worker
+        traceparent = current_traceparent()
+        if traceparent:
+            headers = {**(headers or {}), "traceparent": traceparent}
+        response = super().__call__(url, method=method, body=body, headers=headers, **kwargs)
+        if method == "GET" and url == GOOGLE_CERTS_URL and response.status == 200:
+            max_age = _max_age(response.headers.get("Cache-Control"))
+            if max_age > 0:
+                self._certs = (response, time.monotonic() + max_age)
+        return response
+
+
+# Transport bersama: koneksi TLS dan cache certs dipakai ulang antar verifikasi dan oleh prefetch
+_transport = _TracedTransport(session=http.Session())
+
+
+async def prefetch_google_certs() -> None:
+    """Membuka koneksi dan mengisi cache certs Google lebih awal (warm-up)."""
+    response = await asyncio.to_thread(_transport, GOOGLE_CERTS_URL, method="GET")
+    if response.status != 200:
+        raise RuntimeError(f"Google certs fetch returned {response.status}")
+
+
+@traced("google.verify_google_token")
 async def verify_google_token(id_token_string: str) -> Optional[dict]:
     """Verifikasi Google ID token dan return user info."""
     try:
-        request = requests.Request()
-        user_info = id_token.verify_oauth2_token(
+        # Verifikasi (fetch certs + RSA) blocking, dijalankan di thread agar event loop tidak tertahan
+        user_info = await _verifications.do(
             id_token_string,
-            request,
-            settings.GOOGLE_CLIENT_ID
+            lambda: asyncio.to_thread(
+                id_token.verify_oauth2_token,
+                id_token_string,
+                _transport,
+                settings.GOOGLE_CLIENT_ID
+            )
         )
         if user_info.get('iss') not in ['accounts.google.com', 'https://accounts.google.com']:
             raise ValueError('Wrong issuer')
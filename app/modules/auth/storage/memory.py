@@ -0,0 +1,243 @@
+"""Storage backend in-memory (tanpa database) untuk test, benchmark, dan development."""
+import asyncio
+from bisect import bisect_right
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+from app.modules.auth.auth.storage import AuthStorage, DuplicateUserError, UserRecord, ResetTokenRecord
+from app.common.tracing import traced_class
+
+
+@traced_class("repository")
+class MemoryAuthRepository(AuthStorage):
+    """Repository berbasis dict dengan index unik (email/username case-insensitive seperti MySQL)."""
+
+    def __init__(self):
+        self._users: dict[int, UserRecord] = {}
+        # ID urut naik (autoincrement, tidak ada delete) untuk keyset pagination iter_users
+        self._user_ids: list[int] = []
+        self._by_email: dict[str, int] = {}
+        self._by_username: dict[str, int] = {}
+        self._by_google_id: dict[str, int] = {}
+        self._tokens: dict[int, ResetTokenRecord] = {}
+        self._by_token: dict[str, int] = {}
+        self._tokens_by_user: dict[int, list[int]] = {}
+        self._next_user_id = 1
+        self._next_token_id = 1
+
+    def _check_unique(self, email: str, username: str, google_id: Optional[str]) -> Optional[str]:
+        if email.lower() in self._by_email:
+            return "email"
+        if username.lower() in self._by_username:
+            return "username"
+        if google_id is not None and google_id in self._by_google_id:
+            return "googleId"
+        return None
+
+    def _insert_user(
+        self,
+        email: str,
+        username: str,
+        password_hash: Optional[str],
+        google_id: Optional[str],
+        is_active: bool = True
+    ) -> UserRecord:
+        now = datetime.now(timezone.utc)
+        user = UserRecord(
+            id=self._next_user_id,
+            email=email,
+            username=username,
+            passwordHash=password_hash,
+            googleId=google_id,
+            isActive=is_active,
+            createdAt=now,
+            updatedAt=now,
+        )
+        self._next_user_id += 1
+        self._users[user.id] = user
+        self._user_ids.append(user.id)
+        self._by_email[email.lower()] = user.id
+        self._by_username[username.lower()] = user.id
+        if google_id is not None:
+            self._by_google_id[google_id] = user.id
+        return user
+
+    def _update_user(self, user_id: int, **changes) -> UserRecord:
+        user = self._users.get(user_id)
+        if user is None:
+            raise LookupError(f"User {user_id} not found")
+        # Record immutable: pemanggil lain yang memegang object lama tidak ikut berubah
+        updated = replace(user, updatedAt=datetime.now(timezone.utc), **changes)
+        self._users[user_id] = updated
+        return updated
+
+    async def ping(self) -> None:
+        """Backend in-memory selalu siap"""
+
+    async def create_user(
+        self,
+        email: str,
+        username: str,
+        password_hash: Optional[str] = None,
+        google_id: Optional[str] = None
+    ) -> UserRecord:
+        """Create a new user"""
+        field = self._check_unique(email, username, google_id)
+        if field is not None:
+            raise DuplicateUserError(field)
+        return self._insert_user(email, username, password_hash, google_id)
+
+    async def get_user_by_email(self, email: str) -> Optional[UserRecord]:
+        """Get user by email"""
+        user_id = self._by_email.get(email.lower())
+        return self._users.get(user_id) if user_id is not None else None
+
+    async def get_user_by_username(self, username: str) -> Optional[UserRecord]:
+        """Get user by username"""
+        user_id = self._by_username.get(username.lower())
+        return self._users.get(user_id) if user_id is not None else None
+
+    async def get_user_by_google_id(self, google_id: str) -> Optional[UserRecord]:
+        """Get user by Google ID"""
+        user_id = self._by_google_id.get(google_id)
+        return self._users.get(user_id) if user_id is not None else None
+
+    async def get_user_by_id(self, user_id: int) -> Optional[UserRecord]:
+        """Get user by ID"""
+        return self._users.get(user_id)
+
+    async def update_user_password(self, user_id: int, password_hash: str) -> UserRecord:
+        """Update user password"""
+        return self._update_user(user_id, passwordHash=password_hash)
+
+    async def update_user_google_id(self, user_id: int, google_id: str) -> UserRecord:
+        """Update user Google ID"""
+        old = self._users[user_id].googleId
+        if self._by_google_id.get(google_id, user_id) != user_id:
+            raise DuplicateUserError("googleId")
+        user = self._update_user(user_id, googleId=google_id)
+        if old is not None:
+            self._by_google_id.pop(old, None)
+        self._by_google_id[google_id] = user_id
+        return user
+
+    async def create_reset_token(
+        self,
+        user_id: int,
+        token: str,
+        expires_at: datetime,
+        supersede_id: Optional[int] = None
+    ) -> ResetTokenRecord:
+        """Create password reset token; token supersede_id (jika ada) ditandai used dalam transaksi yang sama."""
+        if supersede_id is not None and supersede_id in self._tokens:
+            self._tokens[supersede_id] = replace(self._tokens[supersede_id], used=True)
+        now = datetime.now(timezone.utc)
+        record = ResetTokenRecord(
+            id=self._next_token_id,
+            token=token,
+            userId=user_id,
+            expiresAt=expires_at,
+            used=False,
+            createdAt=now,
+            lastSentAt=now,
+        )
+        self._next_token_id += 1
+        self._tokens[record.id] = record
+        self._by_token[token] = record.id
+        self._tokens_by_user.setdefault(user_id, []).append(record.id)
+        return record
+
+    async def get_reset_token(self, token: str) -> Optional[ResetTokenRecord]:
+        """Get password reset token"""
+        token_id = self._by_token.get(token)
+        return self._tokens.get(token_id) if token_id is not None else None
+
+    async def mark_token_as_used(self, token_id: int) -> ResetTokenRecord:
+        """Mark reset token as used"""
+        record = replace(self._tokens[token_id], used=True)
+        self._tokens[token_id] = record
+        return record
+
+    async def get_active_reset_token(self, user_id: int, now: datetime) -> Optional[ResetTokenRecord]:
+        """Reset token user yang belum dipakai dan belum expired (expiresAt paling akhir)."""
+        active = [
+            token for token in (self._tokens[i] for i in self._tokens_by_user.get(user_id, ()))
+            if not token.used and token.expiresAt > now
+        ]
+        return max(active, key=lambda token: token.expiresAt, default=None)
+
+    async def extend_reset_token(self, token_id: int, expires_at: datetime, sent_at: datetime) -> bool:
+        """Memperpanjang token yang belum dipakai dan mencatat waktu kirim ulang; False jika token sudah dipakai."""
+        record = self._tokens.get(token_id)
+        if record is None or record.used:
+            return False
+        self._tokens[token_id] = replace(record, expiresAt=expires_at, lastSentAt=sent_at)
+        return True
+
+    async def consume_user_nonce(self, user_id: int, updated_at: datetime) -> bool:
+        """Memajukan updatedAt hanya jika masih sama dengan updated_at (compare-and-set); False jika sudah berubah."""
+        user = self._users.get(user_id)
+        if user is None or user.updatedAt != updated_at:
+            return False
+        # Nilai baru harus berbeda walau clock belum maju (resolusi clock kasar)
+        self._users[user_id] = replace(
+            user, updatedAt=max(datetime.now(timezone.utc), updated_at + timedelta(microseconds=1))
+        )
+        return True
+
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """Mengembalikan subset email yang sudah terdaftar."""
+        return {
+            self._users[self._by_email[email.lower()]].email
+            for email in emails
+            if email.lower() in self._by_email
+        }
+
+    async def get_existing_usernames(self, usernames: list[str]) -> set[str]:
+        """Mengembalikan subset username yang sudah terdaftar."""
+        return {
+            self._users[self._by_username[username.lower()]].username
+            for username in usernames
+            if username.lower() in self._by_username
+        }
+
+    async def create_users_bulk(self, users: list[dict]) -> int:
+        """Insert banyak user sekaligus, duplikat dilewati."""
+        created = 0
+        for user in users:
+            if self._check_unique(user["email"], user["username"], user.get("googleId")) is not None:
+                continue
+            self._insert_user(
+                user["email"],
+                user["username"],
+                user.get("passwordHash"),
+                user.get("googleId"),
+                user.get("isActive", True)
+            )
+            created += 1
+        return created
+
+    async def iter_users(self, batch_size: int = 1000, after_id: int = 0) -> AsyncIterator[UserRecord]:
+        """Iterasi seluruh user dengan keyset pagination (ID autoincrement, jadi urutan insert = urutan ID)."""
+        last_id = after_id
+        while True:
+            start = bisect_right(self._user_ids, last_id)
+            batch = [self._users[user_id] for user_id in self._user_ids[start:start + batch_size]]
+            for user in batch:
+                yield user
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1].id
+            # Titik yield antar batch seperti round-trip database pada backend lain
+            await asyncio.sleep(0)
+
+    async def get_inactive_user_ids(self) -> list[int]:
+        """Mengambil ID semua user yang tidak aktif."""
+        return [user.id for user in self._users.values() if not user.isActive]
+
+    async def get_users_updated_since(self, since: datetime) -> list[UserRecord]:
+        """Mengambil user yang berubah sejak waktu tertentu."""
+        return sorted(
+            (user for user in self._users.values() if user.updatedAt >= since),
+            key=lambda user: user.updatedAt
+        )
@@ -0,0 +1,360 @@
+"""Storage backend SQLite embedded untuk instalasi single-node dan load test lokal."""
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Optional
+from app.modules.auth.auth.storage import AuthStorage, DuplicateUserError, UserRecord, ResetTokenRecord
+from app.common.tracing import traced_class
+from app.common.circuit_breaker import guarded_class
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    email         TEXT    NOT NULL UNIQUE COLLATE NOCASE,
+    username      TEXT    NOT NULL UNIQUE COLLATE NOCASE,
+    password_hash TEXT,
+    google_id     TEXT    UNIQUE,
+    is_active     INTEGER NOT NULL DEFAULT 1,
+    created_at    TEXT    NOT NULL,
+    updated_at    TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_updated_at ON users (updated_at);
+CREATE TABLE IF NOT EXISTS password_reset_tokens (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    token        TEXT    NOT NULL UNIQUE,
+    user_id      INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    expires_at   TEXT    NOT NULL,
+    used         INTEGER NOT NULL DEFAULT 0,
+    created_at   TEXT    NOT NULL,
+    last_sent_at TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS password_reset_tokens_user_id ON password_reset_tokens (user_id);
+"""
+
+# Kolom yang ditambahkan setelah tabel pertama kali dibuat (database lama di-ALTER saat startup).
+# Token lama dianggap dibuat/dikirim di epoch: tidak di-suppress dan tidak diperpanjang lagi.
+TOKEN_MIGRATIONS = {
+    "created_at": "ALTER TABLE password_reset_tokens ADD COLUMN created_at TEXT NOT NULL "
+                  "DEFAULT '1970-01-01 00:00:00.000000+00:00'",
+    "last_sent_at": "ALTER TABLE password_reset_tokens ADD COLUMN last_sent_at TEXT NOT NULL "
+                    "DEFAULT '1970-01-01 00:00:00.000000+00:00'",
+}
+
+USER_COLUMNS = "id, email, username, password_hash, google_id, is_active, created_at, updated_at"
+TOKEN_COLUMNS = "id, token, user_id, expires_at, used, created_at, last_sent_at"
+
+# Kolom pada pesan "UNIQUE constraint failed: users.<kolom>" -> nama field DuplicateUserError
+UNIQUE_FIELDS = {"users.email": "email", "users.username": "username", "users.google_id": "googleId"}
+
+# Batas parameter per statement (SQLITE_MAX_VARIABLE_NUMBER lama = 999)
+MAX_PARAMS = 900
+
+
+def _to_db_time(value: datetime) -> str:
+    """Format waktu seragam (UTC, mikrodetik) supaya perbandingan string = perbandingan waktu."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(sep=" ", timespec="microseconds")
+
+
+def _now() -> str:
+    return _to_db_time(datetime.now(timezone.utc))
+
+
+def _duplicate_user(error: sqlite3.IntegrityError) -> DuplicateUserError:
+    message = str(error)
+    field = next((name for column, name in UNIQUE_FIELDS.items() if column in message), None)
+    return DuplicateUserError(field)
+
+
+def _user(row: Optional[tuple]) -> Optional[UserRecord]:
+    if row is None:
+        return None
+    return UserRecord(
+        id=row[0],
+        email=row[1],
+        username=row[2],
+        passwordHash=row[3],
+        googleId=row[4],
+        isActive=bool(row[5]),
+        createdAt=datetime.fromisoformat(row[6]),
+        updatedAt=datetime.fromisoformat(row[7]),
+    )
+
+
+def _token(row: Optional[tuple]) -> Optional[ResetTokenRecord]:
+    if row is None:
+        return None
+    return ResetTokenRecord(
+        id=row[0],
+        token=row[1],
+        userId=row[2],
+        expiresAt=datetime.fromisoformat(row[3]),
+        used=bool(row[4]),
+        createdAt=datetime.fromisoformat(row[5]),
+        lastSentAt=datetime.fromisoformat(row[6]),
+    )
+
+
+@traced_class("repository")
+@guarded_class("database", ignored=(sqlite3.IntegrityError, DuplicateUserError))
+class SQLiteAuthRepository(AuthStorage):
+    """Repository berbasis sqlite3 (WAL mode, statement cache) yang dijalankan di satu thread khusus."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        # Satu thread = satu koneksi; query tidak memblokir event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _open(self) -> None:
+        # cached_statements: statement yang sama dipakai ulang (prepared) tanpa parse ulang
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(password_reset_tokens)")}
+        for column, statement in TOKEN_MIGRATIONS.items():
+            if column not in columns:
+                conn.execute(statement)
+        self._conn = conn
+
+    async def connect(self) -> None:
+        await self._run(self._open)
+        logger.info(f"SQLite storage opened at {self.path}")
+
+    async def disconnect(self) -> None:
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=True)
+
+    def _interrupt(self) -> None:
+        """Dipanggil guarded_class saat timeout: membatalkan statement yang sedang berjalan di thread worker.
+
+        Tanpa ini thread tunggal tetap menjalankan query yang stall dan semua query berikutnya ikut antre.
+        Statement yang di-interrupt di-rollback, tapi write yang selesai tepat sebelum interrupt tetap commit.
+        """
+        if self._conn is not None:
+            self._conn.interrupt()
+
+    async def _fetchone(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        # fetchall agar statement (termasuk RETURNING) selesai dan tidak menahan lock
+        rows = await self._run(lambda: self._conn.execute(sql, params).fetchall())
+        return rows[0] if rows else None
+
+    async def _fetchall(self, sql: str, params: tuple = ()) -> list[tuple]:
+        return await self._run(lambda: self._conn.execute(sql, params).fetchall())
+
+    async def _update_user(self, user_id: int, column: str, value: Any) -> UserRecord:
+        def update() -> Optional[tuple]:
+            try:
+                self._conn.execute(
+                    f"UPDATE users SET {column} = ?, updated_at = ? WHERE id = ?",
+                    (value, _now(), user_id)
+                )
+            except sqlite3.IntegrityError as e:
+                raise _duplicate_user(e) from e
+            return self._conn.execute(
+                f"SELECT {USER_COLUMNS} FROM users WHERE id = ?", (user_id,)
+            ).fetchone()
+        return _user(await self._run(update))
+
+    async def ping(self) -> None:
+        """Query ringan untuk readiness probe"""
+        await self._fetchone("SELECT 1")
+
+    async def create_user(
+        self,
+        email: str,
+        username: str,
+        password_hash: Optional[str] = None,
+        google_id: Optional[str] = None
+    ) -> UserRecord:
+        """Create a new user"""
+        now = _now()
+        try:
+            row = await self._fetchone(
+                f"INSERT INTO users (email, username, password_hash, google_id, is_active, created_at, updated_at) "
+                f"VALUES (?, ?, ?, ?, 1, ?, ?) RETURNING {USER_COLUMNS}",
+                (email, username, password_hash, google_id, now, now)
+            )
+        except sqlite3.IntegrityError as e:
+            raise _duplicate_user(e) from e
+        return _user(row)
+
+    async def get_user_by_email(self, email: str) -> Optional[UserRecord]:
+        """Get user by email"""
+        return _user(await self._fetchone(f"SELECT {USER_COLUMNS} FROM users WHERE email = ?", (email,)))
+
+    async def get_user_by_username(self, username: str) -> Optional[UserRecord]:
+        """Get user by username"""
+        return _user(await self._fetchone(f"SELECT {USER_COLUMNS} FROM users WHERE username = ?", (username,)))
+
+    async def get_user_by_google_id(self, google_id: str) -> Optional[UserRecord]:
+        """Get user by Google ID"""
+        return _user(await self._fetchone(f"SELECT {USER_COLUMNS} FROM users WHERE google_id = ?", (google_id,)))
+
+    async def get_user_by_id(self, user_id: int) -> Optional[UserRecord]:
+        """Get user by ID"""
+        return _user(await self._fetchone(f"SELECT {USER_COLUMNS} FROM users WHERE id = ?", (user_id,)))
+
+    async def update_user_password(self, user_id: int, password_hash: str) -> UserRecord:
+        """Update user password"""
+        return await self._update_user(user_id, "password_hash", password_hash)
+
+    async def update_user_google_id(self, user_id: int, google_id: str) -> UserRecord:
+        """Update user Google ID"""
+        return await self._update_user(user_id, "google_id", google_id)
+
+    async def create_reset_token(
+        self,
+        user_id: int,
+        token: str,
+        expires_at: datetime,
+        supersede_id: Optional[int] = None
+    ) -> ResetTokenRecord:
+        """Create password reset token; token supersede_id (jika ada) ditandai used dalam transaksi yang sama."""
+        now = _now()
+
+        def insert() -> tuple:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                if supersede_id is not None:
+                    self._conn.execute("UPDATE password_reset_tokens SET used = 1 WHERE id = ?", (supersede_id,))
+                return self._conn.execute(
+                    f"INSERT INTO password_reset_tokens (token, user_id, expires_at, used, created_at, last_sent_at) "
+                    f"VALUES (?, ?, ?, 0, ?, ?) RETURNING {TOKEN_COLUMNS}",
+                    (token, user_id, _to_db_time(expires_at), now, now)
+                ).fetchall()[0]
+        return _token(await self._run(insert))
+
+    async def get_reset_token(self, token: str) -> Optional[ResetTokenRecord]:
+        """Get password reset token"""
+        return _token(await self._fetchone(
+            f"SELECT {TOKEN_COLUMNS} FROM password_reset_tokens WHERE token = ?", (token,)
+        ))
+
+    async def mark_token_as_used(self, token_id: int) -> ResetTokenRecord:
+        """Mark reset token as used"""
+        return _token(await self._fetchone(
+            f"UPDATE password_reset_tokens SET used = 1 WHERE id = ? RETURNING {TOKEN_COLUMNS}", (token_id,)
+        ))
+
+    async def get_active_reset_token(self, user_id: int, now: datetime) -> Optional[ResetTokenRecord]:
+        """Reset token user yang belum dipakai dan belum expired (expiresAt paling akhir)."""
+        return _token(await self._fetchone(
+            f"SELECT {TOKEN_COLUMNS} FROM password_reset_tokens "
+            f"WHERE user_id = ? AND used = 0 AND expires_at > ? ORDER BY expires_at DESC LIMIT 1",
+            (user_id, _to_db_time(now))
+        ))
+
+    async def extend_reset_token(self, token_id: int, expires_at: datetime, sent_at: datetime) -> bool:
+        """Memperpanjang token yang belum dipakai dan mencatat waktu kirim ulang; False jika token sudah dipakai."""
+        return await self._run(lambda: self._conn.execute(
+            "UPDATE password_reset_tokens SET expires_at = ?, last_sent_at = ? WHERE id = ? AND used = 0",
+            (_to_db_time(expires_at), _to_db_time(sent_at), token_id)
+        ).rowcount > 0)
+
+    async def consume_user_nonce(self, user_id: int, updated_at: datetime) -> bool:
+        """Memajukan updatedAt hanya jika masih sama dengan updated_at (compare-and-set); False jika sudah berubah."""
+        return await self._run(lambda: self._conn.execute(
+            "UPDATE users SET updated_at = ? WHERE id = ? AND updated_at = ?",
+            (
+                # Nilai baru harus berbeda walau clock belum maju (resolusi clock kasar)
+                _to_db_time(max(datetime.now(timezone.utc), updated_at + timedelta(microseconds=1))),
+                user_id,
+                _to_db_time(updated_at)
+            )
+        ).rowcount > 0)
+
+    async def _existing(self, column: str, values: list[str]) -> set[str]:
+        found = set()
+        for start in range(0, len(values), MAX_PARAMS):
+            chunk = values[start:start + MAX_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = await self._fetchall(
+                f"SELECT {column} FROM users WHERE {column} IN ({placeholders})", tuple(chunk)
+            )
+            found.update(row[0] for row in rows)
+        return found
+
+    async def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """Mengembalikan subset email yang sudah terdaftar."""
+        return await self._existing("email", emails)
+
+    async def get_existing_usernames(self, usernames: list[str]) -> set[str]:
+        """Mengembalikan subset username yang sudah terdaftar."""
+        return await self._existing("username", usernames)
+
+    async def create_users_bulk(self, users: list[dict]) -> int:
+        """Insert banyak user sekaligus dalam satu transaksi, duplikat dilewati."""
+        if not users:
+            return 0
+        now = _now()
+        params = [
+            (
+                user["email"],
+                user["username"],
+                user.get("passwordHash"),
+                user.get("googleId"),
+                int(user.get("isActive", True)),
+                now,
+                now
+            )
+            for user in users
+        ]
+
+        def insert() -> int:
+            before = self._conn.total_changes
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO users "
+                    "(email, username, password_hash, google_id, is_active, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    params
+                )
+            return self._conn.total_changes - before
+        return await self._run(insert)
+
+    async def iter_users(self, batch_size: int = 1000, after_id: int = 0) -> AsyncIterator[UserRecord]:
+        """Iterasi seluruh user dengan keyset pagination."""
+        last_id = after_id
+        while True:
+            rows = await self._fetchall(
+                f"SELECT {USER_COLUMNS} FROM users WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            )
+            for row in rows:
+                yield _user(row)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    async def get_inactive_user_ids(self) -> list[int]:
+        """Mengambil ID semua user yang tidak aktif."""
+        return [row[0] for row in await self._fetchall("SELECT id FROM users WHERE is_active = 0")]
+
+    async def get_users_updated_since(self, since: datetime) -> list[UserRecord]:
+        """Mengambil user yang berubah sejak waktu tertentu."""
+        rows = await self._fetchall(
+            f"SELECT {USER_COLUMNS} FROM users WHERE updated_at >= ? ORDER BY updated_at",
+            (_to_db_time(since),)
+        )
+        return [_user(row) for row in rows]
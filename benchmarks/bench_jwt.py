@@ -0,0 +1,75 @@
+"""Microbenchmark JWT: jalur lama python-jose vs TokenCodec.
+
+Jalankan dari root directory:
+    python -m benchmarks.bench_jwt [--number 20000]
+"""
+import argparse
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from app.config.token_codec import TokenCodec
+
+SECRET = "benchmark-secret-key-with-at-least-32-chars"
+ALGORITHM = "HS256"
+
+
+def jose_cases():
+    """Jalur lama: jwt.encode/decode python-jose per panggilan."""
+    from jose import jwt
+
+    def encode():
+        to_encode = {"sub": 42}.copy()
+        to_encode.update({"exp": datetime.now(timezone.utc) + timedelta(minutes=15), "type": "access"})
+        return jwt.encode(to_encode, SECRET, algorithm=ALGORITHM)
+
+    token = encode()
+
+    def decode():
+        # verify_sub dimatikan agar sub integer (seperti di service) bisa dibandingkan apa adanya
+        return jwt.decode(token, SECRET, algorithms=[ALGORITHM], options={"verify_sub": False})
+
+    return encode, decode
+
+
+def codec_cases(backend: str):
+    """Jalur baru: TokenCodec yang disiapkan sekali."""
+    codec = TokenCodec.create(SECRET, ALGORITHM, backend)
+
+    def encode():
+        return codec.encode({"sub": 42, "exp": int(time.time()) + 900, "type": "access"})
+
+    token = encode()
+
+    def decode():
+        return codec.decode(token)
+
+    return encode, decode
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    cases = {
+        "python-jose": jose_cases,
+        "codec[hmac]": lambda: codec_cases("hmac"),
+        "codec[pyjwt]": lambda: codec_cases("pyjwt"),
+    }
+    print(f"{'implementation':<16}{'encode us/op':>14}{'decode us/op':>14}")
+    for name, factory in cases.items():
+        try:
+            encode, decode = factory()
+        except (ImportError, RuntimeError) as e:
+            print(f"{name:<16}{'skipped':>14}  ({e})")
+            continue
+        results = []
+        for fn in (encode, decode):
+            best = min(timeit.repeat(fn, number=args.number, repeat=5))
+            results.append(best / args.number * 1e6)
+        print(f"{name:<16}{results[0]:>14.2f}{results[1]:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Microbenchmark overhead middleware per request (tanpa network, ASGI dipanggil langsung).
+
+Jalankan dari root directory:
+    python -m benchmarks.bench_middleware [--number 20000]
+"""
+import argparse
+import asyncio
+import time
+
+from app.common.middleware import (
+    CORSMiddleware,
+    ErrorHandlingMiddleware,
+    FixedWindowLimiter,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    RequestMetrics
+)
+
+ORIGIN = b"https://app.example.com"
+CORS_OPTIONS = {
+    "allow_origins": ["https://app.example.com", "https://admin.example.com"],
+    "allow_credentials": True,
+    "allow_methods": ["*"],
+    "allow_headers": ["*"],
+}
+
+
+async def endpoint(scope, receive, send):
+    """App paling ringan: response JSON statis."""
+    scope["endpoint"] = endpoint
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def make_scope(method: str = "POST", headers: list = ()) -> dict:
+    return {
+        "type": "http",
+        "method": method,
+        "path": "/auth/login",
+        "headers": [(b"host", b"api.example.com"), *headers],
+        "client": ("10.0.0.1", 50000),
+    }
+
+
+SIMPLE = [(b"origin", ORIGIN), (b"content-type", b"application/json")]
+PREFLIGHT = [
+    (b"origin", ORIGIN),
+    (b"access-control-request-method", b"POST"),
+    (b"access-control-request-headers", b"content-type, authorization"),
+]
+
+
+def stack(*layers):
+    app = endpoint
+    for layer in reversed(layers):
+        app = layer(app)
+    return app
+
+
+def cases() -> dict:
+    # Limit sangat tinggi agar yang diukur jalur "lolos", bukan response 429
+    rate_limit = lambda app: RateLimitMiddleware(app, {"/auth/login": "1000000000/day"}, FixedWindowLimiter())
+    cors = lambda app: CORSMiddleware(app, **CORS_OPTIONS)
+    metrics = lambda app: MetricsMiddleware(app, RequestMetrics())
+    full = (metrics, cors, ErrorHandlingMiddleware, rate_limit)
+    result = {
+        "bare": (endpoint, SIMPLE, "POST"),
+        "cors": (stack(cors), SIMPLE, "POST"),
+        "rate_limit": (stack(rate_limit), SIMPLE, "POST"),
+        "metrics": (stack(metrics), SIMPLE, "POST"),
+        "error_handling": (stack(ErrorHandlingMiddleware), SIMPLE, "POST"),
+        "full_stack": (stack(*full), SIMPLE, "POST"),
+        "full_stack preflight": (stack(*full), PREFLIGHT, "OPTIONS"),
+    }
+    try:
+        from starlette.middleware.cors import CORSMiddleware as StarletteCORS
+    except ImportError:
+        return result
+    starlette_cors = lambda app: StarletteCORS(app, **CORS_OPTIONS)
+    result["starlette cors"] = (stack(starlette_cors), SIMPLE, "POST")
+    result["starlette cors preflight"] = (stack(starlette_cors), PREFLIGHT, "OPTIONS")
+    return result
+
+
+async def run(app, headers, method: str, number: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(number):
+            await app(make_scope(method, headers), receive, send)
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {name: asyncio.run(run(app, headers, method, args.number)) for name, (app, headers, method) in cases().items()}
+    baseline = results["bare"]
+    print(f"{'stack':<26}{'us/request':>12}{'overhead us':>13}")
+    for name, us in results.items():
+        print(f"{name:<26}{us:>12.2f}{us - baseline:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Soak test memory: menjalankan flow auth berulang terhadap app ASGI dan mencari alokasi yang terus tumbuh.
+
+App dipanggil langsung (tanpa network) dengan DATABASE_URL=memory://, verifikasi Google diganti
+stub lokal, dan SMTP tidak dikonfigurasi. Setelah fase warm-up (cache, LRU, dan tabel mencapai
+ukuran steady state), tracemalloc dan RSS di-snapshot setiap interval. Exit code 1 jika memory
+yang tertahan per request melebihi budget.
+
+Jalankan dari root directory:
+    python -m benchmarks.soak_memory [--requests 200000] [--budget-bytes 64]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Optional
+
+# Dihapus di main() setelah lifespan selesai (writer audit sudah menutup file)
+_tmp_dir = tempfile.TemporaryDirectory(prefix="auth-soak-")
+# Harus di-set sebelum app diimport karena settings dibaca saat import
+os.environ.update({
+    "DATABASE_URL": "memory://",
+    "JWT_SECRET_KEY": "soak-test-secret-key-with-at-least-32-chars",
+    "BCRYPT_ROUNDS": "4",
+    "TRACING_ENABLED": "false",
+    "PROFILE_SAMPLE_EVERY": "0",
+    "AUDIT_LOG_PATH": os.path.join(_tmp_dir.name, "audit.jsonl"),
+    "IDEMPOTENCY_MAX_ENTRIES": "1000",
+})
+for _name in (
+    "IDEMPOTENCY_BACKEND_URL", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM_EMAIL",
+    "GOOGLE_CLIENT_ID", "BREACHED_PASSWORDS_PATH",
+):
+    os.environ.pop(_name, None)
+
+import logging  # noqa: E402
+
+from app.main import app, lifespan  # noqa: E402
+from app.common.middleware import rate_limiter  # noqa: E402
+
+# Modul dot-named hanya terdaftar di sys.modules (lihat app/modules/auth/__init__.py)
+auth_service = sys.modules["app.modules.auth.auth.service"]
+
+PASSWORD = "soak-password-123"
+
+
+async def fake_verify_google_token(id_token_string: str) -> Optional[dict]:
+    """Stand-in verifikasi Google: token berbentuk 'google-<n>'."""
+    n = id_token_string.rsplit("-", 1)[1]
+    return {"sub": f"google-sub-{n}", "email": f"google{n}@example.com", "name": f"Google User {n}"}
+
+
+class SimulatedClock:
+    """Clock rate limiter yang maju tetap per request (window dan sweep berjalan seperti traffic berjam-jam)."""
+
+    def __init__(self, step_seconds: float):
+        self.step_seconds = step_seconds
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def tick(self) -> None:
+        self.now += self.step_seconds
+
+
+class SoakClient:
+    """Memanggil app ASGI langsung dengan IP client yang bervariasi."""
+
+    def __init__(self, ip_pool: int, clock: SimulatedClock):
+        self.ip_pool = ip_pool
+        self.clock = clock
+        self.status_counts: dict[int, int] = {}
+        self.requests = 0
+
+    async def request(self, method: str, path: str, body: Optional[dict] = None, headers: dict = None,
+                      query: str = "") -> tuple[int, Any]:
+        payload = json.dumps(body).encode() if body is not None else b""
+        raw_headers = [(b"host", b"soak.test"), (b"content-type", b"application/json"),
+                       (b"content-length", str(len(payload)).encode())]
+        raw_headers += [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+        n = random.randrange(self.ip_pool)
+        ip = f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": (ip, random.randrange(1024, 65535)),
+            "server": ("soak.test", 80),
+        }
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+
+        status = 0
+        chunks = []
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await app(scope, receive, send)
+        self.clock.tick()
+        self.requests += 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        body = b"".join(chunks)
+        try:
+            return status, json.loads(body) if body else None
+        except ValueError:
+            return status, None
+
+
+class Workload:
+    """Campuran flow login, refresh, Google, reset, cek username, dan 404 atas pool user yang tetap."""
+
+    def __init__(self, client: SoakClient, users: int, google_users: int):
+        self.client = client
+        self.users = users
+        self.google_users = google_users
+        self.refresh_tokens: dict[int, str] = {}
+
+    async def setup(self) -> None:
+        # Tanpa user password, login/refresh/reset hanya menghasilkan 401/422 dan tidak ikut diukur
+        for i in range(self.users):
+            status, body = await self.client.request("POST", "/auth/register", {
+                "email": f"user{i}@example.com", "username": f"soak_user_{i}", "password": PASSWORD
+            })
+            if status != 200:
+                raise RuntimeError(f"Setup failed: register user{i} returned {status}: {body}")
+
+    async def login(self) -> None:
+        i = random.randrange(self.users)
+        status, body = await self.client.request("POST", "/auth/login", {
+            "identifier": f"soak_user_{i}", "password": PASSWORD
+        })
+        if status == 200:
+            self.refresh_tokens[i] = body["data"]["refresh_token"]
+
+    async def refresh(self) -> None:
+        if not self.refresh_tokens:
+            return await self.login()
+        i = random.choice(list(self.refresh_tokens))
+        status, body = await self.client.request("POST", "/auth/refresh", {"refresh_token": self.refresh_tokens[i]})
+        if status == 200:
+            self.refresh_tokens[i] = body["data"]["refresh_token"]
+
+    async def google(self) -> None:
+        await self.client.request("POST", "/auth/google", {"id_token": f"google-{random.randrange(self.google_users)}"})
+
+    async def reset(self) -> None:
+        # Idempotency-Key acak: store harus tetap dibatasi IDEMPOTENCY_MAX_ENTRIES
+        await self.client.request(
+            "POST", "/auth/reset/request", {"email": f"user{random.randrange(self.users)}@example.com"},
+            headers={"Idempotency-Key": f"soak-{random.getrandbits(64):x}"}
+        )
+
+    async def username_available(self) -> None:
+        name = f"soak_user_{random.randrange(self.users * 2)}"
+        await self.client.request("GET", "/auth/username-available", query=f"username={name}")
+
+    async def not_found(self) -> None:
+        # Path acak tidak boleh menambah key di metrics per route
+        await self.client.request("GET", f"/scan/{random.getrandbits(32):x}")
+
+    def flows(self):
+        weighted = [
+            (self.login, 4), (self.refresh, 3), (self.google, 2), (self.reset, 2),
+            (self.username_available, 3), (self.not_found, 1),
+        ]
+        return [flow for flow, weight in weighted for _ in range(weight)]
+
+
+def rss_bytes() -> int:
+    """RSS saat ini (Linux /proc); fallback ke peak RSS dari resource."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+
+
+def traced_total(snapshot: tracemalloc.Snapshot) -> int:
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+async def run(args: argparse.Namespace) -> int:
+    random.seed(args.seed)
+    auth_service.verify_google_token = fake_verify_google_token
+    clock = SimulatedClock(args.simulated_ms_per_request / 1000)
+    rate_limiter.use_clock(clock)
+    # Root logger saja; logger audit tidak propagate sehingga event audit tetap ikut diukur
+    logging.getLogger().setLevel(logging.ERROR)
+
+    client = SoakClient(args.ip_pool, clock)
+    workload = Workload(client, args.users, args.google_users)
+    flows = workload.flows()
+
+    async with lifespan(app):
+        await workload.setup()
+        for _ in range(args.warmup):
+            await random.choice(flows)()
+        # Beri waktu task background (load index, poller) dan writer audit untuk mengejar
+        await asyncio.sleep(1.0)
+
+        tracemalloc.start(args.frames)
+        baseline = take_snapshot()
+        baseline_traced = traced_total(baseline)
+        baseline_rss = rss_bytes()
+        baseline_requests = client.requests
+        started = time.monotonic()
+        print(f"{'requests':>10}{'rss MB':>10}{'traced MB':>11}{'B/req traced':>14}{'B/req rss':>11}{'req/s':>9}")
+
+        done = 0
+        while done < args.requests:
+            for _ in range(min(args.interval, args.requests - done)):
+                await random.choice(flows)()
+            done = client.requests - baseline_requests
+            await asyncio.sleep(0)
+            snapshot = take_snapshot()
+            traced = traced_total(snapshot)
+            rss = rss_bytes()
+            elapsed = time.monotonic() - started
+            print(
+                f"{done:>10}{rss / 2**20:>10.1f}{traced / 2**20:>11.2f}"
+                f"{(traced - baseline_traced) / done:>14.1f}{(rss - baseline_rss) / done:>11.1f}"
+                f"{done / elapsed:>9.0f}"
+            )
+
+        final = take_snapshot()
+        tracemalloc.stop()
+
+    retained_per_request = (traced_total(final) - baseline_traced) / done
+    print(f"\nsimulated traffic: {clock.now / 3600:.1f} h, status codes: {dict(sorted(client.status_counts.items()))}")
+    print(f"top {args.top} growing allocation sites since baseline:")
+    for stat in final.compare_to(baseline, "traceback")[:args.top]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        print(f"  {stat.size_diff / 1024:>10.1f} KiB {stat.count_diff:>+8} blocks  {frame.filename}:{frame.lineno}")
+        for extra in stat.traceback[1:args.frames]:
+            print(f"  {'':>29}  <- {extra.filename}:{extra.lineno}")
+
+    print(f"\nretained per request: {retained_per_request:.1f} bytes (budget {args.budget_bytes})")
+    if retained_per_request > args.budget_bytes:
+        print("FAIL: retained memory per request exceeds budget")
+        return 1
+    print("OK")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000, help="Jumlah request setelah warm-up")
+    parser.add_argument("--warmup", type=int, default=5000, help="Request sebelum baseline snapshot")
+    parser.add_argument("--interval", type=int, default=20000, help="Request per snapshot")
+    parser.add_argument("--users", type=int, default=200, help="Jumlah user password")
+    parser.add_argument("--google-users", type=int, default=100, help="Jumlah identitas Google")
+    parser.add_argument("--ip-pool", type=int, default=50000, help="Jumlah IP client berbeda")
+    parser.add_argument("--simulated-ms-per-request", type=float, default=50.0,
+                        help="Waktu simulasi per request untuk clock rate limiter")
+    parser.add_argument("--budget-bytes", type=float, default=64.0, help="Batas memory tertahan per request")
+    parser.add_argument("--top", type=int, default=10, help="Jumlah site alokasi yang ditampilkan")
+    parser.add_argument("--frames", type=int, default=3, help="Kedalaman traceback tracemalloc")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    try:
+        sys.exit(asyncio.run(run(args)))
+    finally:
+        _tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Konfigurasi pytest: settings minimal di-set sebelum modul app diimport."""
+import os
+import tempfile
+
+# Settings dibaca saat import, jadi harus ada sebelum test mengimport app.*
+os.environ.setdefault("DATABASE_URL", "memory://")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-with-at-least-32-chars")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("TRACING_ENABLED", "false")
+os.environ.setdefault("PROFILE_SAMPLE_EVERY", "0")
+os.environ.setdefault("AUDIT_LOG_ENABLED", "false")
+os.environ.setdefault("AUDIT_LOG_PATH", os.path.join(tempfile.mkdtemp(prefix="auth-test-"), "audit.jsonl"))
+for _name in ("SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM_EMAIL", "BREACHED_PASSWORDS_PATH"):
+    os.environ.pop(_name, None)
+
+import asyncio  # noqa: E402
+import sys  # noqa: E402
+
+import pytest  # noqa: E402
+
+
+def auth_module(name: str):
+    """Modul dot-named (auth.service, auth.storage, ...) hanya terdaftar di sys.modules."""
+    import app.modules.auth  # noqa: F401
+    return sys.modules[f"app.modules.auth.auth.{name}"]
+
+
+@pytest.fixture
+def run():
+    """Menjalankan coroutine di event loop baru (tanpa plugin pytest-asyncio)."""
+    return asyncio.run
+
+
+@pytest.fixture
+def memory_repo():
+    from app.modules.auth.storage.memory import MemoryAuthRepository
+    return MemoryAuthRepository()
+
+
+@pytest.fixture
+def sent_emails(monkeypatch):
+    """Mencatat email reset/magic link yang dikirim service alih-alih memanggil SMTP."""
+    service = auth_module("service")
+    sent: list[tuple[str, str, str]] = []
+
+    async def send_reset_email(email: str, token: str) -> None:
+        sent.append(("reset", email, token))
+
+    async def send_magic_link_email(email: str, token: str) -> None:
+        sent.append(("magic", email, token))
+
+    monkeypatch.setattr(service, "send_reset_email", send_reset_email)
+    monkeypatch.setattr(service, "send_magic_link_email", send_magic_link_email)
+    return sent
+
+
+@pytest.fixture
+def auth_service(memory_repo, sent_emails):
+    return auth_module("service").AuthService(memory_repo, "203.0.113.7")
@@ -0,0 +1,53 @@
+"""Test audit log: queue terbatas saat writer stall, event yang tidak muat dihitung sebagai dropped."""
+import json
+
+import pytest
+
+from app.common.audit import AuditFileWriter, AuditLog
+
+
+@pytest.fixture
+def make_audit(tmp_path):
+    created = []
+
+    def make(queue_size: int) -> AuditLog:
+        writer = AuditFileWriter(str(tmp_path / "audit.jsonl"), 0, 0, 512, 0.05, queue_size)
+        audit = AuditLog(True, writer)
+        created.append(audit)
+        return audit
+
+    yield make
+    for audit in created:
+        audit.shutdown()
+        audit.close()
+
+
+def _emit(audit: AuditLog, count: int) -> None:
+    for i in range(count):
+        with audit.record("login", "203.0.113.7", user_id=i):
+            pass
+
+
+def test_events_are_written(make_audit, tmp_path):
+    audit = make_audit(queue_size=100)
+    _emit(audit, 3)
+    audit.shutdown()
+    lines = (tmp_path / "audit.jsonl").read_text().splitlines()
+    assert [json.loads(line)["user_id"] for line in lines] == [0, 1, 2]
+    assert audit.writer.stats() == {"written": 3, "dropped": 0}
+
+
+def test_full_queue_drops_events_without_blocking(make_audit, tmp_path, monkeypatch):
+    audit = make_audit(queue_size=2)
+    # Writer stall: thread tidak menguras queue
+    monkeypatch.setattr(audit.writer, "start", lambda: None)
+    _emit(audit, 5)
+    assert audit.writer.queue.qsize() == 2
+    assert audit.writer.dropped == 3
+
+    monkeypatch.undo()
+    audit.writer.start()
+    audit.shutdown()
+    lines = (tmp_path / "audit.jsonl").read_text().splitlines()
+    assert [json.loads(line)["user_id"] for line in lines] == [0, 1]
+    assert audit.writer.stats() == {"written": 2, "dropped": 3}
@@ -0,0 +1,174 @@
+"""Test index password bocor: MD4/NTLM, binary search di index, dan file rusak."""
+import hashlib
+import struct
+
+import pytest
+
+from app.cli.build_breach_index import main as build_breach_index
+from app.common import breached_passwords
+from app.common.breached_passwords import (
+    HEADER,
+    BreachedIndexError,
+    BreachedPasswordIndex,
+    _md4,
+    _ntlm,
+)
+from app.config.env import settings
+
+# RFC 1320 appendix A.5
+MD4_VECTORS = [
+    (b"", "31d6cfe0d16ae931b73c59d7e0c089c0"),
+    (b"a", "bde52cb31de33e46245e05fbdbd6fb24"),
+    (b"abc", "a448017aaf21d8525fc10ae87aa6729d"),
+    (b"message digest", "d9130a8164549fe818874806e1c7014b"),
+    (b"abcdefghijklmnopqrstuvwxyz", "d79e1c308aa5bbcdeea8ed63df412da9"),
+    (b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789", "043f8582f241db351ce627e153e7f0e4"),
+    (b"1234567890" * 8, "e33b4ddc9c38f2199c3e7b164fcc0536"),
+]
+
+BREACHED = [f"breached-{i}" for i in range(50)]
+
+
+@pytest.mark.parametrize("data, expected", MD4_VECTORS)
+def test_md4_rfc1320_vectors(data, expected):
+    assert _md4(data).hex() == expected
+
+
+def test_ntlm():
+    assert _ntlm("password").hex() == "8846f7eaee8fb117ad06bdd830b7586c"
+    assert _ntlm("").hex() == "31d6cfe0d16ae931b73c59d7e0c089c0"
+
+
+def _build(tmp_path, passwords, bloom: bool = True, kind: str = "sha1") -> str:
+    dump = tmp_path / "dump.txt"
+    if kind == "sha1":
+        hashes = [hashlib.sha1(p.encode()).hexdigest() for p in passwords]
+    else:
+        hashes = [_ntlm(p).hex() for p in passwords]
+    # Duplikat dan huruf kecil harus dinormalisasi oleh builder
+    lines = [f"{h.upper()}:{i + 1}" for i, h in enumerate(hashes)] + [f"{hashes[0]}:1"]
+    dump.write_text("\n".join(lines) + "\n")
+    output = str(tmp_path / "breached.idx")
+    args = [str(dump), output, "--chunk-records", "7", "--kind", kind]
+    if not bloom:
+        args += ["--bloom-fpr", "0"]
+    assert build_breach_index(args) == 0
+    return output
+
+
+def _records(path: str) -> list[bytes]:
+    with open(path, "rb") as f:
+        data = f.read()
+    _, _, _, prefix_length, _, count = HEADER.unpack_from(data)
+    return [data[HEADER.size + i * prefix_length:HEADER.size + (i + 1) * prefix_length] for i in range(count)]
+
+
+@pytest.mark.parametrize("bloom", [True, False])
+@pytest.mark.parametrize("kind", ["sha1", "ntlm"])
+def test_index_hits_and_misses(tmp_path, bloom, kind):
+    path = _build(tmp_path, BREACHED, bloom=bloom, kind=kind)
+    index = BreachedPasswordIndex(path, f"{path}.bloom" if bloom else None)
+    try:
+        assert index.count == len(BREACHED)
+        assert all(password in index for password in BREACHED)
+        assert not any(f"safe-{i}" in index for i in range(200))
+    finally:
+        index.close()
+
+
+def test_index_boundaries(tmp_path):
+    path = _build(tmp_path, BREACHED, bloom=False)
+    records = _records(path)
+    assert records == sorted(set(records))
+    index = BreachedPasswordIndex(path)
+    try:
+        assert index.contains_prefix(records[0])
+        assert index.contains_prefix(records[-1])
+        assert index.contains_prefix(records[len(records) // 2])
+        assert not index.contains_prefix(b"\x00" * 8)
+        assert not index.contains_prefix(b"\xff" * 8)
+        # Tepat di antara dua record yang bertetangga
+        between = (int.from_bytes(records[0], "big") + 1).to_bytes(8, "big")
+        if between != records[1]:
+            assert not index.contains_prefix(between)
+    finally:
+        index.close()
+
+
+def test_single_record_and_empty_index(tmp_path):
+    path = _build(tmp_path, ["only-one"], bloom=False)
+    index = BreachedPasswordIndex(path)
+    assert "only-one" in index and "other" not in index
+    index.close()
+
+    empty = tmp_path / "empty.idx"
+    empty.write_bytes(HEADER.pack(b"BRPW", 1, 0, 8, 0, 0))
+    index = BreachedPasswordIndex(str(empty))
+    assert "only-one" not in index
+    index.close()
+
+
+def _corrupt_cases(tmp_path, path: str) -> dict[str, str]:
+    with open(path, "rb") as f:
+        data = f.read()
+    cases = {
+        "missing": str(tmp_path / "missing.idx"),
+        "empty": b"",
+        "short_header": data[:HEADER.size - 1],
+        "bad_magic": b"XXXX" + data[4:],
+        "truncated": data[:-1],
+        "bad_kind": data[:5] + struct.pack("<B", 9) + data[6:],
+    }
+    paths = {}
+    for name, content in cases.items():
+        if isinstance(content, str):
+            paths[name] = content
+            continue
+        target = tmp_path / f"{name}.idx"
+        target.write_bytes(content)
+        paths[name] = str(target)
+    return paths
+
+
+def test_corrupt_index_raises_internal_error(tmp_path):
+    path = _build(tmp_path, BREACHED, bloom=False)
+    for name, corrupt_path in _corrupt_cases(tmp_path, path).items():
+        with pytest.raises(BreachedIndexError) as excinfo:
+            BreachedPasswordIndex(corrupt_path)
+        # Bukan ValueError: pydantic tidak boleh mengubahnya menjadi pesan validasi
+        assert not isinstance(excinfo.value, ValueError), name
+
+
+def test_truncated_bloom_raises_internal_error(tmp_path):
+    path = _build(tmp_path, BREACHED)
+    bloom_path = f"{path}.bloom"
+    with open(bloom_path, "rb") as f:
+        data = f.read()
+    with open(bloom_path, "wb") as f:
+        f.write(data[:-1])
+    with pytest.raises(BreachedIndexError):
+        BreachedPasswordIndex(path, bloom_path)
+
+
+def test_load_once_and_check(tmp_path, monkeypatch):
+    path = _build(tmp_path, BREACHED)
+    monkeypatch.setattr(breached_passwords, "_index", None)
+    monkeypatch.setattr(settings, "BREACHED_PASSWORDS_PATH", path)
+    assert not breached_passwords.is_breached_password(BREACHED[0])  # belum dimuat
+
+    index = breached_passwords.load_breached_password_index()
+    assert index.bloom is not None
+    assert breached_passwords.load_breached_password_index() is index
+    assert breached_passwords.is_breached_password(BREACHED[0])
+    assert not breached_passwords.is_breached_password("correct horse battery staple")
+    index.close()
+
+
+def test_load_fails_fast_on_corrupt_index(tmp_path, monkeypatch):
+    corrupt = tmp_path / "corrupt.idx"
+    corrupt.write_bytes(b"not an index at all")
+    monkeypatch.setattr(breached_passwords, "_index", None)
+    monkeypatch.setattr(settings, "BREACHED_PASSWORDS_PATH", str(corrupt))
+    with pytest.raises(BreachedIndexError):
+        breached_passwords.load_breached_password_index()
+    assert not breached_passwords.is_breached_password("anything")
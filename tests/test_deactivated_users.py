@@ -0,0 +1,78 @@
+"""Test bitmap user nonaktif."""
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.common.deactivated_users import DeactivatedUserSet
+
+
+@pytest.mark.parametrize("user_id", [0, 1, 7, 8, 9, 15, 16, 1023, 1024, 10**6])
+def test_mark_and_unmark_edge_ids(user_id):
+    bits = DeactivatedUserSet()
+    bits.mark(user_id, False)
+    assert user_id in bits
+    assert len(bits) == 1
+    for neighbour in (user_id - 1, user_id + 1):
+        assert neighbour not in bits
+    bits.mark(user_id, True)
+    assert user_id not in bits
+    assert len(bits) == 0
+
+
+def test_empty_set_and_ids_beyond_bitmap():
+    bits = DeactivatedUserSet()
+    assert 0 not in bits
+    bits.mark(3, False)
+    assert 8 not in bits
+    assert 10**9 not in bits
+
+
+def test_negative_ids():
+    bits = DeactivatedUserSet()
+    bits.mark(7, False)  # bit terakhir byte pertama, yang terbaca bila index -1 lolos
+    bits.mark(15, False)
+    assert -1 not in bits
+    assert -9 not in bits
+    with pytest.raises(ValueError):
+        bits.mark(-1, False)
+    with pytest.raises(ValueError):
+        bits.mark(-1, True)
+    assert len(bits) == 2
+
+
+def test_mark_is_idempotent():
+    bits = DeactivatedUserSet()
+    bits.mark(5, False)
+    bits.mark(5, False)
+    assert len(bits) == 1
+    bits.mark(5, True)
+    bits.mark(5, True)
+    bits.mark(6, True)
+    assert len(bits) == 0
+
+
+class FakeRepo:
+    def __init__(self, inactive, updated):
+        self.inactive = inactive
+        self.updated = updated
+
+    async def get_inactive_user_ids(self):
+        return self.inactive
+
+    async def get_users_updated_since(self, since):
+        return [user for user in self.updated if user.updatedAt >= since]
+
+
+def test_load_and_refresh(run):
+    bits = DeactivatedUserSet()
+    now = datetime.now(timezone.utc)
+    run(bits.load(FakeRepo([2, 9], [])))
+    assert 2 in bits and 9 in bits and len(bits) == 2
+    updated = [
+        SimpleNamespace(id=2, isActive=True, updatedAt=now + timedelta(seconds=1)),
+        SimpleNamespace(id=4, isActive=False, updatedAt=now + timedelta(seconds=2)),
+    ]
+    assert run(bits.refresh(FakeRepo([], updated))) == 2
+    assert 2 not in bits and 4 in bits and 9 in bits
+    assert bits.watermark == now + timedelta(seconds=2)
@@ -0,0 +1,68 @@
+"""Test transport Google: certs di-cache sesuai Cache-Control dan dipakai bersama oleh prefetch."""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.auth")
+from requests.structures import CaseInsensitiveDict  # noqa: E402
+
+from app.modules.auth.oauth import google  # noqa: E402
+
+
+class FakeSession:
+    def __init__(self, cache_control: str = "public, max-age=3600, must-revalidate"):
+        self.calls = []
+        self.cache_control = cache_control
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs.get("headers")))
+        return SimpleNamespace(
+            status_code=200,
+            headers=CaseInsensitiveDict({"Cache-Control": self.cache_control}),
+            content=b'{"kid": "cert"}',
+        )
+
+    def close(self):
+        pass
+
+
+def test_certs_cached_for_max_age(monkeypatch):
+    session = FakeSession()
+    transport = google._TracedTransport(session)
+    now = [1000.0]
+    monkeypatch.setattr(google.time, "monotonic", lambda: now[0])
+
+    first = transport(google.GOOGLE_CERTS_URL, method="GET")
+    assert transport(google.GOOGLE_CERTS_URL, method="GET") is first
+    assert len(session.calls) == 1
+
+    now[0] += 3601
+    transport(google.GOOGLE_CERTS_URL, method="GET")
+    assert len(session.calls) == 2
+
+
+def test_certs_without_max_age_are_not_cached():
+    session = FakeSession(cache_control="no-cache")
+    transport = google._TracedTransport(session)
+    transport(google.GOOGLE_CERTS_URL, method="GET")
+    transport(google.GOOGLE_CERTS_URL, method="GET")
+    assert len(session.calls) == 2
+
+
+def test_other_urls_are_not_cached():
+    session = FakeSession()
+    transport = google._TracedTransport(session)
+    transport("https://example.com/other", method="GET")
+    transport("https://example.com/other", method="GET")
+    assert len(session.calls) == 2
+
+
+def test_prefetch_fills_cache_used_by_verify(run, monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(google, "_transport", google._TracedTransport(session))
+    run(google.prefetch_google_certs())
+    # verify_oauth2_token memanggil transport dengan URL certs default google-auth
+    from google.oauth2 import id_token
+    assert id_token._GOOGLE_OAUTH2_CERTS_URL == google.GOOGLE_CERTS_URL
+    assert id_token._fetch_certs(google._transport, google.GOOGLE_CERTS_URL) == {"kid": "cert"}
+    assert len(session.calls) == 1
@@ -0,0 +1,152 @@
+"""Test import user massal: dedupe di dalam file dan terhadap database, hashing, reject file."""
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.cli import import_users
+from app.cli.import_users import UserImporter, batched, read_rows
+from app.config.security import get_password_hash, verify_password
+
+
+@pytest.fixture
+def pool():
+    # Thread pool cukup untuk test; CLI memakai ProcessPoolExecutor dengan interface yang sama
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+@pytest.fixture
+def rejects():
+    return io.StringIO()
+
+
+@pytest.fixture
+def importer(memory_repo, pool, rejects):
+    return UserImporter(memory_repo, pool, rejects)
+
+
+def _rows(*rows: dict) -> list[tuple[int, dict]]:
+    return list(enumerate(rows, start=2))
+
+
+def _rejected(rejects: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in rejects.getvalue().splitlines()]
+
+
+def test_duplicates_within_input_are_rejected(run, importer, memory_repo, rejects):
+    run(importer.import_batch(_rows(
+        {"email": "alice@example.com", "username": "alice", "password": "password-alice"},
+        {"email": "ALICE@example.com", "username": "alice2", "password": "password-alice"},
+        {"email": "bob@example.com", "username": "Alice", "password": "password-bob1"},
+    )))
+    assert importer.inserted == 1 and importer.rejected == 2
+    assert [(r["line"], r["reason"]) for r in _rejected(rejects)] == [
+        (3, "Duplicate email in input"),
+        (4, "Duplicate username in input"),
+    ]
+    assert run(memory_repo.get_user_by_email("bob@example.com")) is None
+
+
+def test_duplicates_across_batches_are_rejected(run, importer, memory_repo, rejects):
+    rows = _rows(
+        {"email": "alice@example.com", "username": "alice", "password": "password-alice"},
+        {"email": "carol@example.com", "username": "carol", "password": "password-carol"},
+        {"email": "Alice@Example.com", "username": "alice_b", "password": "password-alice"},
+    )
+    for batch in batched(iter(rows), 2):
+        run(importer.import_batch(batch))
+    assert importer.inserted == 2 and importer.rejected == 1
+    assert _rejected(rejects)[0]["reason"] == "Duplicate email in input"
+
+
+def test_existing_users_are_rejected(run, importer, memory_repo, rejects):
+    run(memory_repo.create_user("Alice@Example.com", "Alice", "hash"))
+    run(importer.import_batch(_rows(
+        {"email": "alice@example.com", "username": "alice_new", "password": "password-alice"},
+        {"email": "other@example.com", "username": "ALICE", "password": "password-other"},
+        {"email": "dave@example.com", "username": "dave", "password": "password-dave"},
+    )))
+    assert importer.inserted == 1 and importer.rejected == 2
+    assert [r["reason"] for r in _rejected(rejects)] == [
+        "User with this email already exists",
+        "User with this username already exists",
+    ]
+    assert run(memory_repo.get_user_by_username("dave")) is not None
+
+
+def test_concurrent_duplicate_is_skipped_by_insert(run, importer, memory_repo, monkeypatch):
+    dedupe = importer.dedupe_existing
+
+    async def racing_dedupe(valid):
+        fresh = await dedupe(valid)
+        # User lain masuk di antara dedupe dan create_many
+        await memory_repo.create_user("erin@example.com", "erin_other", "hash")
+        return fresh
+
+    monkeypatch.setattr(importer, "dedupe_existing", racing_dedupe)
+    run(importer.import_batch(_rows(
+        {"email": "erin@example.com", "username": "erin", "password": "password-erin"},
+        {"email": "frank@example.com", "username": "frank", "password": "password-frank"},
+    )))
+    assert importer.inserted == 1
+    assert run(memory_repo.get_user_by_username("erin")) is None
+
+
+def test_passwords_hashed_and_existing_hashes_kept(run, importer, memory_repo, rejects):
+    existing_hash = get_password_hash("imported-secret")
+    run(importer.import_batch(_rows(
+        {"email": "gina@example.com", "username": "gina", "password": "plain-secret"},
+        {"email": "hank@example.com", "username": "hank", "password_hash": existing_hash},
+        {"email": "ivy@example.com", "username": "ivy", "google_id": "g-ivy", "is_active": "false"},
+        {"email": "jack@example.com", "username": "jack"},
+        {"email": "kim@example.com", "username": "kim", "password_hash": "not-bcrypt"},
+    )))
+    gina = run(memory_repo.get_user_by_username("gina"))
+    assert verify_password("plain-secret", gina.passwordHash)
+    assert run(memory_repo.get_user_by_username("hank")).passwordHash == existing_hash
+    ivy = run(memory_repo.get_user_by_username("ivy"))
+    assert ivy.googleId == "g-ivy" and ivy.passwordHash is None and not ivy.isActive
+    reasons = [r["reason"] for r in _rejected(rejects)]
+    assert reasons[0] == "password, password_hash or google_id is required"
+    assert "password_hash" in reasons[1]
+    assert "not-bcrypt" not in rejects.getvalue() and "plain-secret" not in rejects.getvalue()
+
+
+def test_dry_run_inserts_nothing(run, memory_repo, pool):
+    importer = UserImporter(memory_repo, pool, dry_run=True)
+    run(importer.import_batch(_rows({"email": "liam@example.com", "username": "liam", "password": "password-liam"})))
+    assert importer.inserted == 1
+    assert run(memory_repo.get_user_by_email("liam@example.com")) is None
+
+
+def test_read_rows_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text("email,username,password\nmia@example.com,mia,\n", encoding="utf-8")
+    assert list(read_rows(csv_path, "csv")) == [(2, {"email": "mia@example.com", "username": "mia"})]
+
+    jsonl_path = tmp_path / "users.jsonl"
+    jsonl_path.write_text('{"email": "ned@example.com"}\n\nnot json\n', encoding="utf-8")
+    rows = list(read_rows(jsonl_path, "jsonl"))
+    assert rows[0] == (1, {"email": "ned@example.com"})
+    assert rows[1][0] == 3 and rows[1][1]["__error__"].startswith("Invalid JSON")
+
+
+def test_main_imports_file_and_writes_rejects(run, tmp_path, monkeypatch):
+    from app.config import database
+    from app.modules.auth.storage.memory import MemoryAuthRepository
+
+    repo = MemoryAuthRepository()
+    monkeypatch.setattr(database, "_create_storage", lambda url: repo)
+    source = tmp_path / "users.jsonl"
+    source.write_text("\n".join(json.dumps(row) for row in [
+        {"email": "omar@example.com", "username": "omar", "password": "password-omar"},
+        {"email": "OMAR@example.com", "username": "omar2", "password": "password-omar"},
+    ]) + "\n", encoding="utf-8")
+    rejects_path = tmp_path / "rejects.jsonl"
+
+    code = import_users.main([str(source), "--rejects", str(rejects_path), "--batch-size", "1", "--workers", "1"])
+    assert code == 2
+    assert [r["line"] for r in _rejected(io.StringIO(rejects_path.read_text()))] == [2]
+    assert run(repo.get_user_by_email("omar@example.com")) is not None
@@ -0,0 +1,107 @@
+"""Test magic link: sekali pakai, aman terhadap consume bersamaan, batal setelah reset password dan expired."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks
+
+from app.common.exceptions import InvalidTokenException
+from app.config import security
+
+
+@pytest.fixture
+def user(run, memory_repo):
+    return run(memory_repo.create_user("alice@example.com", "alice", "hash"))
+
+
+@pytest.fixture
+def request_link(run, auth_service, sent_emails):
+    """Request magic link, menjalankan background task pengiriman, lalu mengembalikan token dari email."""
+    def request(email: str) -> str:
+        tasks = BackgroundTasks()
+        run(auth_service.request_magic_link(email, tasks))
+        assert not any(kind == "magic" for kind, _, _ in sent_emails)  # belum terkirim sebelum response
+        run(tasks())
+        kind, to, token = sent_emails.pop()
+        assert (kind, to) == ("magic", email)
+        return token
+    return request
+
+
+def test_link_works_once(run, auth_service, request_link, user):
+    token = request_link(user.email)
+    tokens = run(auth_service.login_with_magic_link(token))
+    assert tokens.access_token and tokens.refresh_token
+    with pytest.raises(InvalidTokenException):
+        run(auth_service.login_with_magic_link(token))
+
+
+def test_concurrent_consume_only_one_wins(run, auth_service, memory_repo, request_link, user, monkeypatch):
+    token = request_link(user.email)
+    get_user_by_id = memory_repo.get_user_by_id
+
+    async def interleaved(user_id):
+        # Kedua request membaca updatedAt yang sama sebelum salah satunya melakukan compare-and-set
+        found = await get_user_by_id(user_id)
+        await asyncio.sleep(0)
+        return found
+
+    monkeypatch.setattr(memory_repo, "get_user_by_id", interleaved)
+
+    async def consume_twice():
+        return await asyncio.gather(
+            auth_service.login_with_magic_link(token),
+            auth_service.login_with_magic_link(token),
+            return_exceptions=True
+        )
+
+    results = run(consume_twice())
+    failures = [r for r in results if isinstance(r, InvalidTokenException)]
+    assert len(failures) == 1
+    assert failures[0].detail == "Login link has already been used"
+    assert sum(1 for r in results if not isinstance(r, BaseException)) == 1
+
+
+def test_link_invalid_after_password_reset(run, auth_service, memory_repo, request_link, sent_emails, user):
+    token = request_link(user.email)
+    run(auth_service.request_password_reset(user.email))
+    _, _, reset_token = sent_emails.pop()
+    run(auth_service.confirm_password_reset(reset_token, "a-new-Passw0rd-for-alice"))
+    with pytest.raises(InvalidTokenException):
+        run(auth_service.login_with_magic_link(token))
+
+
+def test_link_invalid_after_expiry(run, auth_service, request_link, user, monkeypatch):
+    token = request_link(user.email)
+    expired = time.time() + security.settings.MAGIC_LINK_EXPIRE_MINUTES * 60 + 1
+    monkeypatch.setattr(security, "time", SimpleNamespace(time=lambda: expired))
+    with pytest.raises(InvalidTokenException):
+        run(auth_service.login_with_magic_link(token))
+
+
+@pytest.mark.parametrize("active", [False, None])
+def test_unknown_or_inactive_email_schedules_nothing(run, auth_service, memory_repo, sent_emails, active):
+    if active is not None:
+        run(memory_repo.create_users_bulk([
+            {"email": "bob@example.com", "username": "bob", "passwordHash": None, "isActive": active}
+        ]))
+    tasks = BackgroundTasks()
+    result = run(auth_service.request_magic_link("bob@example.com", tasks))
+    assert "login link" in result["message"]
+    run(tasks())
+    assert sent_emails == []
+
+
+def test_failed_send_does_not_log_link(run, monkeypatch, caplog):
+    from tests.conftest import auth_module
+    utils = auth_module("utils")
+
+    async def fail(**kwargs):
+        return False
+
+    monkeypatch.setattr(utils, "send_email", fail)
+    with caplog.at_level("DEBUG"):
+        run(utils.send_magic_link_email("alice@example.com", "1.2.secret-signature"))
+    assert "secret-signature" not in caplog.text
+    assert "Failed to send magic link email" in caplog.text
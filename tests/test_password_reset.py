@@ -0,0 +1,94 @@
+"""Test penggabungan request reset password ke token yang masih berlaku (suppress, resend, rotate, issue)."""
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config.env import settings
+
+
+@pytest.fixture
+def user(run, memory_repo):
+    return run(memory_repo.create_user("alice@example.com", "alice", "hash"))
+
+
+def _age_token(repo, token_id: int, created_ago: timedelta, sent_ago: timedelta) -> None:
+    """Memundurkan createdAt/lastSentAt token (simulasi waktu berlalu)."""
+    now = datetime.now(timezone.utc)
+    record = repo._tokens[token_id]
+    repo._tokens[token_id] = replace(record, createdAt=now - created_ago, lastSentAt=now - sent_ago)
+
+
+def _tokens(repo, user_id: int):
+    return [repo._tokens[i] for i in repo._tokens_by_user.get(user_id, [])]
+
+
+def test_first_request_issues_token(run, auth_service, memory_repo, sent_emails, user):
+    run(auth_service.request_password_reset(user.email))
+    tokens = _tokens(memory_repo, user.id)
+    assert len(tokens) == 1 and not tokens[0].used
+    assert sent_emails == [("reset", user.email, tokens[0].token)]
+
+
+def test_unknown_email_sends_nothing(run, auth_service, memory_repo, sent_emails):
+    result = run(auth_service.request_password_reset("nobody@example.com"))
+    assert "reset link" in result["message"]
+    assert sent_emails == [] and memory_repo._tokens == {}
+
+
+def test_repeat_within_window_is_suppressed(run, auth_service, memory_repo, sent_emails, user):
+    run(auth_service.request_password_reset(user.email))
+    before = _tokens(memory_repo, user.id)
+    run(auth_service.request_password_reset(user.email))
+    assert _tokens(memory_repo, user.id) == before
+    assert len(sent_emails) == 1
+
+
+def test_repeat_after_window_resends_same_token(run, auth_service, memory_repo, sent_emails, user):
+    run(auth_service.request_password_reset(user.email))
+    token = _tokens(memory_repo, user.id)[0]
+    window = timedelta(minutes=settings.RESET_TOKEN_REUSE_WINDOW_MINUTES)
+    _age_token(memory_repo, token.id, created_ago=window * 2, sent_ago=window * 2)
+
+    run(auth_service.request_password_reset(user.email))
+    tokens = _tokens(memory_repo, user.id)
+    assert len(tokens) == 1
+    assert tokens[0].expiresAt > token.expiresAt
+    assert datetime.now(timezone.utc) - tokens[0].lastSentAt < window
+    assert [email[2] for email in sent_emails] == [token.token, token.token]
+
+
+def test_token_past_max_lifetime_is_rotated(run, auth_service, memory_repo, sent_emails, user):
+    run(auth_service.request_password_reset(user.email))
+    old = _tokens(memory_repo, user.id)[0]
+    max_lifetime = timedelta(minutes=settings.RESET_TOKEN_MAX_LIFETIME_MINUTES)
+    window = timedelta(minutes=settings.RESET_TOKEN_REUSE_WINDOW_MINUTES)
+    _age_token(memory_repo, old.id, created_ago=max_lifetime, sent_ago=window * 2)
+
+    run(auth_service.request_password_reset(user.email))
+    old_after, new = _tokens(memory_repo, user.id)
+    assert old_after.used and not new.used
+    assert new.token != old.token
+    assert sent_emails[-1] == ("reset", user.email, new.token)
+
+
+def test_used_token_leads_to_new_token(run, auth_service, memory_repo, sent_emails, user):
+    run(auth_service.request_password_reset(user.email))
+    first = _tokens(memory_repo, user.id)[0]
+    run(memory_repo.mark_token_as_used(first.id))
+
+    run(auth_service.request_password_reset(user.email))
+    tokens = _tokens(memory_repo, user.id)
+    assert len(tokens) == 2 and tokens[1].token != first.token and not tokens[1].used
+
+
+def test_at_most_one_live_token(run, auth_service, memory_repo, sent_emails, user):
+    window = timedelta(minutes=settings.RESET_TOKEN_REUSE_WINDOW_MINUTES)
+    max_lifetime = timedelta(minutes=settings.RESET_TOKEN_MAX_LIFETIME_MINUTES)
+    for i in range(6):
+        run(auth_service.request_password_reset(user.email))
+        latest = _tokens(memory_repo, user.id)[-1]
+        created_ago = max_lifetime if i % 2 else window * 2
+        _age_token(memory_repo, latest.id, created_ago=created_ago, sent_ago=window * 2)
+    live = [token for token in _tokens(memory_repo, user.id) if not token.used]
+    assert len(live) == 1
@@ -0,0 +1,56 @@
+"""Test profiling: hanya K profile paling lambat yang disimpan, di memory maupun di PROFILE_DIR."""
+import os
+from collections import Counter
+
+from app.common.profiling import ProfileRecord, ProfileStore, ProfilingMiddleware
+
+
+def _record(duration_ms: float) -> ProfileRecord:
+    return ProfileRecord("GET", "/x", duration_ms, Counter({"main;handler": 1}), f"{duration_ms}.collapsed")
+
+
+def test_store_keeps_slowest_and_reports_eviction():
+    store = ProfileStore(keep=2)
+    a, b, c, d = _record(5), _record(1), _record(10), _record(3)
+    assert store.add(a) == (True, None)
+    assert store.add(b) == (True, None)
+    assert store.add(c) == (True, b)
+    assert store.add(d) == (False, None)
+    assert store.slowest() == [c, a]
+
+
+def test_store_with_zero_keep_stores_nothing():
+    store = ProfileStore(keep=0)
+    assert store.add(_record(5)) == (False, None)
+    assert store.slowest() == []
+
+
+def _middleware(tmp_path, keep: int) -> ProfilingMiddleware:
+    async def app(scope, receive, send):
+        pass
+
+    middleware = ProfilingMiddleware(app, ProfileStore(keep))
+    middleware.output_dir = str(tmp_path / "profiles")
+    return middleware
+
+
+def test_only_kept_profiles_have_files(run, tmp_path):
+    middleware = _middleware(tmp_path, keep=2)
+    for duration_ms in (5, 1, 10, 3, 7):
+        run(middleware._save("GET", "/auth/login", duration_ms, Counter({"main;login": 2})))
+    files = sorted(os.listdir(tmp_path / "profiles"))
+    assert [record.duration_ms for record in middleware.store.slowest()] == [10, 7]
+    assert sorted(os.path.basename(record.filename) for record in middleware.store.slowest()) == files
+    with open(middleware.store.slowest()[0].filename, encoding="utf-8") as f:
+        assert f.read() == "main;login 2\n"
+
+
+def test_sampled_request_is_profiled_and_released(run, tmp_path):
+    middleware = _middleware(tmp_path, keep=5)
+    middleware.sample_every = 1
+    scope = {"type": "http", "method": "GET", "path": "/health", "headers": []}
+    run(middleware(scope, None, None))
+    run(middleware(scope, None, None))
+    assert not middleware._active
+    assert len(middleware.store.slowest()) == 2
+    assert len(os.listdir(tmp_path / "profiles")) == 2
@@ -0,0 +1,42 @@
+"""Test startup: load user nonaktif yang lambat tidak menggagalkan lifespan."""
+import asyncio
+import json
+
+from app.common.circuit_breaker import get_breaker
+from app.common.deactivated_users import deactivated_users
+from app.config.env import settings
+from app.config.database import get_storage
+from app.modules.auth.storage.memory import MemoryAuthRepository
+
+
+def test_inactive_user_scan_has_startup_timeout():
+    assert settings.DB_OPERATION_TIMEOUTS["get_inactive_user_ids"] > settings.DB_QUERY_TIMEOUT_SECONDS
+
+
+def test_slow_inactive_scan_does_not_abort_lifespan(run, monkeypatch):
+    from app.main import app, lifespan, ready
+
+    monkeypatch.setattr(deactivated_users, "loaded", False)
+    monkeypatch.setattr(deactivated_users, "watermark", None)
+    breaker = get_breaker("test-startup")
+    original_scan = MemoryAuthRepository.get_inactive_user_ids
+
+    async def slow_scan(self):
+        # Deadline yang sama dengan guarded_class: timeout menjadi ServiceUnavailableException
+        return await breaker.call(lambda: asyncio.sleep(1.0, result=[]), 0.01)
+
+    monkeypatch.setattr(MemoryAuthRepository, "get_inactive_user_ids", slow_scan)
+
+    async def scenario():
+        async with lifespan(app):
+            assert not deactivated_users.loaded
+            response = await ready()
+            body = json.loads(response.body)
+            assert response.status_code == 503 and body["deactivated_users_loaded"] is False
+
+            # Scan kembali normal: refresh di poller memuat ulang daftar
+            monkeypatch.setattr(MemoryAuthRepository, "get_inactive_user_ids", original_scan)
+            await deactivated_users.refresh(get_storage())
+            assert deactivated_users.loaded
+
+    run(scenario())
@@ -0,0 +1,181 @@
+"""Paritas perilaku storage backend: memory, SQLite, dan Prisma (MySQL, hanya jika TEST_MYSQL_DATABASE_URL di-set)."""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tests.conftest import auth_module
+
+
+def _memory(tmp_path):
+    from app.modules.auth.storage.memory import MemoryAuthRepository
+    return MemoryAuthRepository(), None
+
+
+def _sqlite(tmp_path):
+    from app.modules.auth.storage.sqlite import SQLiteAuthRepository
+    return SQLiteAuthRepository(str(tmp_path / "auth.db")), None
+
+
+def _prisma(tmp_path):
+    url = os.environ.get("TEST_MYSQL_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_MYSQL_DATABASE_URL not set")
+    prisma = pytest.importorskip("prisma")
+    client = prisma.Prisma(datasource={"url": url})
+    return auth_module("repository").AuthRepository(client), client
+
+
+@pytest.fixture(params=[_memory, _sqlite, _prisma], ids=["memory", "sqlite", "prisma"])
+def with_storage(request, tmp_path):
+    """Menjalankan scenario(repo) dalam satu event loop dengan backend yang sudah connect."""
+    repo, client = request.param(tmp_path)
+
+    def run(scenario):
+        async def main():
+            if client is not None:
+                await client.connect()
+            await repo.connect()
+            try:
+                return await scenario(repo)
+            finally:
+                await repo.disconnect()
+                if client is not None:
+                    await client.disconnect()
+        return asyncio.run(main())
+
+    return run
+
+
+def _name() -> str:
+    # Unik per test agar aman dijalankan ulang terhadap database MySQL yang sama
+    return f"u{uuid.uuid4().hex[:12]}"
+
+
+def test_create_and_lookup(with_storage):
+    async def scenario(repo):
+        name = _name()
+        user = await repo.create_user(f"{name}@example.com", name, password_hash="hash")
+        assert (await repo.get_user_by_id(user.id)).email == f"{name}@example.com"
+        assert (await repo.get_user_by_email(f"{name.upper()}@EXAMPLE.COM")).id == user.id
+        assert (await repo.get_user_by_username(name.upper())).id == user.id
+        assert (await repo.get_user_by_identifier(name)).id == user.id
+        assert user.isActive and user.googleId is None and user.passwordHash == "hash"
+        assert await repo.get_user_by_email(f"missing-{name}@example.com") is None
+        assert await repo.get_user_by_id(user.id + 10**6) is None
+    with_storage(scenario)
+
+
+@pytest.mark.parametrize("field", ["email", "username", "googleId"])
+def test_create_duplicate_raises_duplicate_user_error(with_storage, field):
+    storage = auth_module("storage")
+
+    async def scenario(repo):
+        name, other = _name(), _name()
+        await repo.create_user(f"{name}@example.com", name, google_id=f"g-{name}")
+        duplicate = {
+            "email": (f"{name.upper()}@example.com", other, None),
+            "username": (f"{other}@example.com", name.upper(), None),
+            "googleId": (f"{other}@example.com", other, f"g-{name}"),
+        }[field]
+        with pytest.raises(storage.DuplicateUserError) as error:
+            await repo.create_user(duplicate[0], duplicate[1], google_id=duplicate[2])
+        assert error.value.field == field
+        assert await repo.get_user_by_email(f"{other}@example.com") is None
+    with_storage(scenario)
+
+
+def test_update_google_id_duplicate(with_storage):
+    storage = auth_module("storage")
+
+    async def scenario(repo):
+        first, second = _name(), _name()
+        await repo.create_user(f"{first}@example.com", first, google_id=f"g-{first}")
+        user = await repo.create_user(f"{second}@example.com", second)
+        with pytest.raises(storage.DuplicateUserError) as error:
+            await repo.update_user_google_id(user.id, f"g-{first}")
+        assert error.value.field == "googleId"
+        linked = await repo.update_user_google_id(user.id, f"g-{second}")
+        assert linked.googleId == f"g-{second}"
+        assert (await repo.get_user_by_google_id(f"g-{second}")).id == user.id
+    with_storage(scenario)
+
+
+def test_iter_users_keyset_batches(with_storage):
+    async def scenario(repo):
+        created = [await repo.create_user(f"{n}@example.com", n) for n in (_name() for _ in range(5))]
+        ids = {user.id for user in created}
+        seen = []
+        late = None
+        async for user in repo.iter_users(batch_size=2, after_id=created[0].id - 1):
+            if user.id in ids or (late is not None and user.id == late.id):
+                seen.append(user.id)
+            if len(seen) == 2 and late is None:
+                # Batch berikutnya diambil setelah insert ini, jadi user baru ikut terbaca
+                name = _name()
+                late = await repo.create_user(f"{name}@example.com", name)
+        assert seen == [user.id for user in created] + [late.id]
+
+        tail = [user.id async for user in repo.iter_users(batch_size=2, after_id=created[2].id) if user.id in ids]
+        assert tail == [created[3].id, created[4].id]
+    with_storage(scenario)
+
+
+def test_bulk_create_skips_duplicates(with_storage):
+    async def scenario(repo):
+        existing, new_a, new_b = _name(), _name(), _name()
+        await repo.create_user(f"{existing}@example.com", existing)
+        rows = [
+            {"email": f"{existing}@example.com", "username": _name(), "passwordHash": None, "isActive": True},
+            {"email": f"{new_a}@example.com", "username": new_a, "passwordHash": None, "isActive": True},
+            {"email": f"{new_b}@example.com", "username": new_b, "passwordHash": None, "isActive": False},
+        ]
+        assert await repo.create_users_bulk(rows) == 2
+        assert await repo.get_existing_emails(
+            [f"{existing}@example.com", f"{new_a}@example.com", f"missing-{new_a}@example.com"]
+        ) == {f"{existing}@example.com", f"{new_a}@example.com"}
+        assert await repo.get_existing_usernames([new_b, f"missing{new_b}"]) == {new_b}
+        inactive = await repo.get_user_by_username(new_b)
+        assert not inactive.isActive
+        assert inactive.id in await repo.get_inactive_user_ids()
+    with_storage(scenario)
+
+
+def test_consume_user_nonce_compare_and_set(with_storage):
+    async def scenario(repo):
+        name = _name()
+        user = await repo.create_user(f"{name}@example.com", name)
+        assert await repo.consume_user_nonce(user.id, user.updatedAt)
+        assert not await repo.consume_user_nonce(user.id, user.updatedAt)
+        updated = await repo.get_user_by_id(user.id)
+        assert updated.updatedAt > user.updatedAt
+        assert any(u.id == user.id for u in await repo.get_users_updated_since(updated.updatedAt))
+    with_storage(scenario)
+
+
+def test_reset_token_lifecycle(with_storage):
+    async def scenario(repo):
+        name = _name()
+        user = await repo.create_user(f"{name}@example.com", name)
+        now = datetime.now(timezone.utc)
+        first = await repo.create_reset_token(user.id, f"t1-{name}", now + timedelta(minutes=15))
+        assert (await repo.get_active_reset_token(user.id, now)).id == first.id
+
+        sent_at = now + timedelta(minutes=5)
+        assert await repo.extend_reset_token(first.id, now + timedelta(minutes=30), sent_at)
+        extended = await repo.get_reset_token(f"t1-{name}")
+        assert extended.expiresAt == now + timedelta(minutes=30)
+        assert extended.lastSentAt == sent_at
+
+        second = await repo.create_reset_token(
+            user.id, f"t2-{name}", now + timedelta(minutes=15), supersede_id=first.id
+        )
+        assert (await repo.get_reset_token(f"t1-{name}")).used
+        assert not await repo.extend_reset_token(first.id, now + timedelta(minutes=60), now)
+        assert (await repo.get_active_reset_token(user.id, now)).id == second.id
+
+        await repo.mark_token_as_used(second.id)
+        assert await repo.get_active_reset_token(user.id, now) is None
+    with_storage(scenario)
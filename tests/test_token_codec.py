@@ -0,0 +1,114 @@
+"""Test TokenCodec: round-trip, interop dengan python-jose, dan error selalu TokenError."""
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config.token_codec import TokenCodec, TokenError
+
+SECRET = "test-secret-key-with-at-least-32-chars"
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS384", "HS512"])
+def test_hmac_round_trip(algorithm):
+    codec = TokenCodec.create(SECRET, algorithm)
+    claims = {"sub": 42, "exp": int(time.time()) + 60, "type": "access"}
+    assert codec.decode(codec.encode(claims)) == claims
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS384", "HS512"])
+def test_jose_interop(algorithm):
+    jwt = pytest.importorskip("jose.jwt")
+    codec = TokenCodec.create(SECRET, algorithm)
+    exp = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+    jose_token = jwt.encode({"sub": "42", "exp": exp, "type": "access"}, SECRET, algorithm=algorithm)
+    assert codec.decode(jose_token)["sub"] == "42"
+
+    codec_token = codec.encode({"sub": "42", "exp": exp, "type": "refresh"})
+    claims = jwt.decode(codec_token, SECRET, algorithms=[algorithm])
+    assert claims["type"] == "refresh"
+    assert claims["exp"] == int(exp.timestamp())
+
+
+def test_rejects_expired_and_not_yet_valid():
+    codec = TokenCodec.create(SECRET, "HS256")
+    now = time.time()
+    with pytest.raises(TokenError):
+        codec.decode(codec.encode({"sub": 1, "exp": int(now) - 1}), now=now)
+    with pytest.raises(TokenError):
+        codec.decode(codec.encode({"sub": 1, "nbf": int(now) + 60}), now=now)
+
+
+@pytest.mark.parametrize("token", ["", "a.b", "a.b.c.d", "ä.b.c", "!!!.@@@.###"])
+def test_rejects_malformed(token):
+    with pytest.raises(TokenError):
+        TokenCodec.create(SECRET, "HS256").decode(token)
+
+
+def test_rejects_tampered_signature_and_other_key():
+    codec = TokenCodec.create(SECRET, "HS256")
+    token = codec.encode({"sub": 1})
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, ("A" if signature[0] != "A" else "B") + signature[1:]])
+    with pytest.raises(TokenError):
+        codec.decode(tampered)
+    with pytest.raises(TokenError):
+        TokenCodec.create(SECRET + "-other", "HS256").decode(token)
+
+
+def test_rejects_algorithm_mismatch():
+    token = TokenCodec.create(SECRET, "HS512").encode({"sub": 1})
+    with pytest.raises(TokenError):
+        TokenCodec.create(SECRET, "HS256").decode(token)
+
+
+def test_hmac_backend_rejects_public_key():
+    with pytest.raises(ValueError):
+        TokenCodec.create(SECRET, "HS256", public_key="unused")
+
+
+def _pem_pair(algorithm: str) -> tuple[str, str]:
+    pytest.importorskip("jwt")
+    serialization = pytest.importorskip("cryptography.hazmat.primitives.serialization")
+    if algorithm.startswith("ES"):
+        from cryptography.hazmat.primitives.asymmetric import ec
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "PS256", "ES256"])
+def test_pyjwt_asymmetric_private_key_signs_and_verifies(algorithm):
+    private_pem, public_pem = _pem_pair(algorithm)
+    signer = TokenCodec.create(private_pem, algorithm, "pyjwt")
+    token = signer.encode({"sub": 7})
+    assert signer.decode(token)["sub"] == 7
+
+    verifier = TokenCodec.create(public_pem, algorithm, "pyjwt")
+    assert verifier.decode(token)["sub"] == 7
+    with pytest.raises(RuntimeError):
+        verifier.encode({"sub": 7})
+
+    explicit = TokenCodec.create(private_pem, algorithm, "pyjwt", public_key=public_pem)
+    assert explicit.decode(token)["sub"] == 7
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256"])
+def test_pyjwt_backend_errors_become_token_error(algorithm):
+    private_pem, _ = _pem_pair(algorithm)
+    codec = TokenCodec.create(private_pem, algorithm, "pyjwt")
+    header, payload, _ = codec.encode({"sub": 1}).split(".")
+    with pytest.raises(TokenError):
+        codec.decode(f"{header}.{payload}.AAAA")